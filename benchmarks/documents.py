@@ -0,0 +1,51 @@
+from datetime import datetime
+
+
+def generate_document(users_count: int, project_id: int = 1) -> dict:
+    """
+    Generate a realistic project document, as dumped by DocumentSchema
+
+    Keyword arguments:
+    users_count -- The number of users in the project
+    project_id -- The id of the project
+
+    Returns:
+    document -- The project document
+    """
+    return {
+        "project": {
+            "projectId": project_id,
+            "status": "PUBLISHED",
+            "name": f"Mapping project {project_id} - Região Norte",
+            "shortDescription": (
+                "Map buildings and roads to support the response to the floods. "
+                "Ensure every building is mapped as a closed way and tagged "
+                "building=yes, and connect all the roads to the existing network."
+            ),
+            "changesetComment": f"#hotosm-project-{project_id} #floods #missingmaps",
+            "author": "project_manager",
+            "url": f"https://tasks.hotosm.org/projects/{project_id}",
+            "created": datetime.strftime(
+                datetime(2020, 7, 30, 10, 54, 25, 449637), "%Y-%m-%dT%H:%M:%S.%fZ"
+            ),
+            "externalSource": {
+                "imagery": "tms[1,22]:https://{switch:a,b,c}.tiles.example.com/{zoom}/{x}/{y}.png",
+                "license": "Imagery licensed for OSM tracing only",
+                "instructions": "Trace all buildings.\nDo not map rivers.\n",
+                "perTaskInstructions": "Task {x}, {y} at zoom {z}",
+            },
+            "users": [
+                {"userId": user_id, "userName": f"mapper_{user_id}_ção"}
+                for user_id in range(1, users_count + 1)
+            ],
+        },
+        "organisation": {
+            "name": "HOT",
+            "url": "https://www.hotosm.org/",
+            "description": (
+                "HOT is an international team dedicated to humanitarian action "
+                "and community development through open mapping."
+            ),
+        },
+        "platform": {"name": "HOT Tasking Manager", "url": "https://tasks.hotosm.org/"},
+    }
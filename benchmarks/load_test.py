@@ -0,0 +1,378 @@
+"""
+Load test the report endpoints against a local stand-in of the MediaWiki API
+and a local bare git remote. Create and update reports are sent at several
+concurrency levels, and the requests per second, latency percentiles, errors
+and wiki API calls or git pushes per report are printed for each backend.
+
+Run with `python manage.py load_test`, which serves the application of
+manage.py on a local port with its wiki and git settings replaced.
+"""
+import json
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+import git
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from benchmarks.documents import generate_document
+from server.services.metrics_service import metrics
+
+
+class FakeWiki:
+    """
+    In-memory stand-in of the MediaWiki API actions used by MediaWikiService,
+    counting the calls of each action
+    """
+
+    def __init__(self):
+        self.pages = {}
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.get_handler())
+        self.server.daemon_threads = True
+        self.endpoint = f"http://127.0.0.1:{self.server.server_port}/api.php"
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    @staticmethod
+    def normalise_title(title: str) -> str:
+        title = title.replace("_", " ").strip()
+        return title[:1].upper() + title[1:]
+
+    def call(self, params: dict) -> dict:
+        """
+        Run a MediaWiki API action
+
+        Keyword arguments:
+        params -- Dict with the query and form parameters of the request
+
+        Returns:
+        data -- The JSON response of the action
+        """
+        action = params.get("action")
+        with self.lock:
+            self.calls[action] += 1
+            if action == "query":
+                token_type = params.get("type", "csrf")
+                return {"query": {"tokens": {f"{token_type}token": "token+\\"}}}
+            if action == "login":
+                return {"login": {"result": "Success"}}
+            if action == "checktoken":
+                return {"checktoken": {"result": "valid"}}
+            if action == "parse":
+                title = self.normalise_title(params["page"])
+                if title not in self.pages:
+                    return {"error": {"code": "missingtitle"}}
+                return {"parse": {"wikitext": {"*": self.pages[title]}}}
+            if action == "edit":
+                title = self.normalise_title(params["title"])
+                if "createonly" in params and title in self.pages:
+                    return {"error": {"code": "articleexists"}}
+                if "nocreate" in params and title not in self.pages:
+                    return {"error": {"code": "missingtitle"}}
+                self.pages[title] = params["text"]
+                return {"edit": {"result": "Success", "title": title}}
+            if action == "move":
+                old_title = self.normalise_title(params["from"])
+                new_title = self.normalise_title(params["to"])
+                if old_title == new_title:
+                    return {"error": {"code": "selfmove"}}
+                self.pages[new_title] = self.pages.pop(old_title)
+                self.pages[old_title] = f"#REDIRECT [[{new_title}]]"
+                return {"move": {"from": old_title, "to": new_title}}
+            return {"error": {"code": "badvalue"}}
+
+    def get_handler(self):
+        wiki = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.respond({})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.respond(parse_qs(self.rfile.read(length).decode("utf-8")))
+
+            def respond(self, form: dict):
+                params = {
+                    key: values[0]
+                    for key, values in {
+                        **parse_qs(urlsplit(self.path).query),
+                        **form,
+                    }.items()
+                }
+                data = wiki.call(params)
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if "error" in data:
+                    self.send_header("MediaWiki-API-Error", data["error"]["code"])
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def create_report_repository(directory: str) -> str:
+    """
+    Create a bare git remote and a clone of it with an initial commit
+
+    Keyword arguments:
+    directory -- The directory of the repositories
+
+    Returns:
+    report_file_dir -- The directory of the clone
+    """
+    remote_dir = f"{directory}/remote.git"
+    report_file_dir = f"{directory}/reports"
+    git.Repo.init(remote_dir, bare=True)
+    repo = git.Repo.clone_from(remote_dir, report_file_dir)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Load test")
+        config.set_value("user", "email", "load-test@example.com")
+    with open(f"{report_file_dir}/README.md", "w") as readme:
+        readme.write("Load test reports\n")
+    repo.index.add(["README.md"])
+    repo.index.commit("Initial commit")
+    repo.git.push("--set-upstream", "origin", repo.active_branch.name)
+    return report_file_dir
+
+
+def generate_reports(backend: str, reports: int, first_project_id: int) -> list:
+    """
+    Generate a stream of create reports followed by update reports of the
+    same projects
+
+    Keyword arguments:
+    backend -- The backend of the reports, "wiki" or "git"
+    reports -- The number of reports
+    first_project_id -- The id of the first project of the reports
+
+    Returns:
+    reports -- List of dicts with the method, path and JSON of each request
+    """
+    created_reports = (reports + 1) // 2
+    stream = []
+    for number in range(created_reports):
+        document = generate_document(10, first_project_id + number)
+        document["organisation"]["name"] = f"Organisation {number % 10}"
+        # Dates of project pages are parsed back with the day as the month
+        document["project"]["created"] = "2020-07-10T10:54:25.449637Z"
+        stream.append({"method": "POST", "path": f"/{backend}/", "json": document})
+    for number in range(reports - created_reports):
+        document = stream[number]["json"]
+        if backend == "wiki":
+            path = (
+                f"/wiki/{quote(document['organisation']['name'])}/"
+                f"{quote(document['project']['name'])}/"
+            )
+        else:
+            path = (
+                f"/git/{quote(document['platform']['name'])}/"
+                f"{quote(document['organisation']['name'])}/"
+                f"{document['project']['projectId']}/"
+            )
+        update = {"project": {"shortDescription": f"Updated description {number}"}}
+        stream.append({"method": "PATCH", "path": path, "json": update})
+    return stream
+
+
+def load_reports(file_path: str) -> list:
+    """
+    Load a recorded stream of reports, a JSON object with the method, path
+    and JSON data of a request on each line
+
+    Keyword arguments:
+    file_path -- The path of the file with the reports
+
+    Returns:
+    reports -- List of dicts with the method, path and JSON of each request
+    """
+    with open(file_path) as reports_file:
+        return [json.loads(line) for line in reports_file if line.strip()]
+
+
+def percentile(latencies: list, fraction: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def send_reports(base_url: str, token: str, stream: list, concurrency: int) -> dict:
+    """
+    Send a stream of reports with a number of concurrent clients. Creates
+    are sent before the updates of the same projects
+
+    Keyword arguments:
+    base_url -- The URL of the application
+    token -- The authorization token of the application
+    stream -- List of dicts with the method, path and JSON of each request
+    concurrency -- The number of concurrent clients
+
+    Returns:
+    results -- Dict with the throughput, latency percentiles and errors
+    """
+    session = requests.Session()
+    session.mount(
+        "http://",
+        requests.adapters.HTTPAdapter(pool_maxsize=concurrency, pool_block=True),
+    )
+    headers = {"Authorization": f"Token {token}"}
+
+    def send(report: dict) -> tuple:
+        started_at = time.perf_counter()
+        try:
+            response = session.request(
+                report["method"],
+                f"{base_url}{report['path']}",
+                json=report["json"],
+                headers=headers,
+            )
+            status = response.status_code
+        except requests.RequestException:
+            status = None
+        return time.perf_counter() - started_at, status
+
+    creates = [report for report in stream if report["method"] == "POST"]
+    updates = [report for report in stream if report["method"] != "POST"]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        responses = list(executor.map(send, creates))
+        responses += list(executor.map(send, updates))
+    elapsed = time.perf_counter() - started_at
+
+    latencies = sorted(latency for latency, _ in responses)
+    statuses = Counter(str(status) for _, status in responses)
+    return {
+        "reports": len(responses),
+        "requests_per_second": len(responses) / elapsed,
+        "p50": percentile(latencies, 0.5),
+        "p90": percentile(latencies, 0.9),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies),
+        "errors": sum(
+            count
+            for status, count in statuses.items()
+            if status == "None" or int(status) >= 400
+        ),
+        "statuses": dict(statuses),
+    }
+
+
+def run(
+    app,
+    backends: list,
+    reports: int,
+    concurrency_levels: list,
+    recorded_reports: str = None,
+) -> list:
+    """
+    Serve the application against a fake wiki and a local git remote and
+    send the reports of each backend at each concurrency level
+
+    Keyword arguments:
+    app -- The Flask application
+    backends -- List with the backends to test, "wiki" and "git"
+    reports -- The number of reports sent at each concurrency level
+    concurrency_levels -- List with the numbers of concurrent clients
+    recorded_reports -- Optional file with a recorded stream of reports
+
+    Returns:
+    results -- List of dicts with the results of each backend and level
+    """
+    directory = tempfile.mkdtemp(prefix="oeg-load-test-")
+    wiki = FakeWiki()
+    wiki.start()
+    token = "load-test-token"
+    app.config.update(
+        {
+            "REPORT_FILE_DIR": create_report_repository(directory),
+            "REPORT_INDEX_FILE": f"{directory}/report_index.sqlite",
+            "REPORT_SNAPSHOT_DIR": None,
+            "JOB_QUEUE_FILE": None,
+            "WIKI_API_ENDPOINT": wiki.endpoint,
+            "MEDIAWIKI_BOT_NAME": "LoadTest@bot",
+            "MEDIAWIKI_BOT_PASSWORD": "password",
+            "OEG_REPORTER_BOT_NAME": "OEGReporterLoadTest",
+            "OEG_REPORTER_VERSION": "0",
+            "OEG_REPORTER_CONTACT_INFORMATION": "load-test@example.com",
+            "AUTHORIZATION_TOKEN": token,
+        }
+    )
+    server = make_server(
+        "127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    results = []
+    try:
+        first_project_id = random.randint(1, 1000) * 1000000
+        for backend in backends:
+            for concurrency in concurrency_levels:
+                if recorded_reports:
+                    stream = [
+                        report
+                        for report in load_reports(recorded_reports)
+                        if report["path"].startswith(f"/{backend}/")
+                    ]
+                else:
+                    stream = generate_reports(backend, reports, first_project_id)
+                    first_project_id += reports
+                wiki_calls = sum(wiki.calls.values())
+                pushes = metrics.git_pushes.get(("pushes",))
+                result = send_reports(base_url, token, stream, concurrency)
+                result.update(
+                    {
+                        "backend": backend,
+                        "concurrency": concurrency,
+                        "wiki_calls_per_report": (
+                            sum(wiki.calls.values()) - wiki_calls
+                        )
+                        / max(result["reports"], 1),
+                        "pushes_per_report": (
+                            metrics.git_pushes.get(("pushes",)) - pushes
+                        )
+                        / max(result["reports"], 1),
+                    }
+                )
+                results.append(result)
+                print_result(result)
+    finally:
+        server.shutdown()
+        wiki.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def print_result(result: dict) -> None:
+    print(
+        f"{result['backend']:>5} {result['concurrency']:>4} clients"
+        f" {result['reports']:>6} reports {result['requests_per_second']:>8.1f} req/s"
+        f" p50 {result['p50'] * 1000:>8.1f}ms p90 {result['p90'] * 1000:>8.1f}ms"
+        f" p99 {result['p99'] * 1000:>8.1f}ms errors {result['errors']:>4}"
+        f" wiki calls/report {result['wiki_calls_per_report']:>5.1f}"
+        f" pushes/report {result['pushes_per_report']:>4.2f}",
+        flush=True,
+    )
@@ -0,0 +1,81 @@
+"""
+Time the startup of the application, from importing the server package to
+`create_app` returning, and the import time of each module, measured with
+`python -X importtime` in a new interpreter.
+
+Usage: python -m benchmarks.startup [--top 20] [--output results.json]
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+STARTUP_CODE = (
+    "import time; started_at = time.perf_counter();"
+    " from server import create_app; create_app();"
+    " print(time.perf_counter() - started_at)"
+)
+
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure_startup() -> dict:
+    """
+    Start the application in a new interpreter with import times enabled
+
+    Returns:
+    startup -- Dict with the startup seconds and a list with the self and
+               cumulative import seconds of each imported module
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append(
+                {
+                    "module": module,
+                    "depth": len(indent) // 2,
+                    "self": int(self_us) / 1000000,
+                    "cumulative": int(cumulative_us) / 1000000,
+                }
+            )
+    return {
+        "startup": float(process.stdout.strip().splitlines()[-1]),
+        "modules": modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the application startup")
+    parser.add_argument(
+        "--top", type=int, default=20, help="Number of slowest imports printed"
+    )
+    parser.add_argument("--output", help="File to save the JSON results to")
+    arguments = parser.parse_args()
+
+    results = measure_startup()
+    print(f"Startup: {results['startup'] * 1000:.1f}ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for module in sorted(
+        results["modules"], key=lambda module: module["cumulative"], reverse=True
+    )[: arguments.top]:
+        print(
+            f"{module['cumulative'] * 1000:>10.1f}ms {module['self'] * 1000:>8.1f}ms"
+            f"  {'  ' * module['depth']}{module['module']}"
+        )
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
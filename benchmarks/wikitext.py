@@ -0,0 +1,379 @@
+"""
+Time the wikitext layer on generated wiki pages with tables of many rows:
+rendering page text, adding and editing table rows, parsing pages into
+sections and serialising them, as done while reporting a document.
+
+Each benchmark is timed with the median of --repeat runs, and benchmarks
+that take longer than --max-seconds are skipped at larger tables.
+Results can be saved as JSON and compared with the results of other commit,
+exiting with an error when any benchmark is slower than the threshold.
+
+Usage: python -m benchmarks.wikitext [--rows 10 100 ...] [--max-seconds 5]
+                                     [--repeat 5]
+                                     [--output results.json]
+                                     [--baseline results.json] [--threshold 0.3]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from functools import partial
+from unittest.mock import patch
+
+from benchmarks.documents import generate_document
+from server import create_app
+from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
+from server.services.wiki.mediawiki_service import MediaWikiService
+from server.services.wiki.pages.organisation_service import OrganisationPageService
+from server.services.wiki.pages.overview_service import OverviewPageService
+from server.services.wiki.pages.project_service import ProjectPageService
+from server.services.wiki.wiki_section_service import WikiSectionService
+from server.services.wiki.wiki_table_service import WikiTableService
+from server.services.wiki.wiki_text_service import WikiTextService
+
+ROWS = [10, 100, 1000, 10000, 100000]
+
+
+class StaticWiki:
+    """
+    Stand-in of MediaWikiService returning the text of a generated page
+    """
+
+    page_text = ""
+
+    def get_page_text(self, page_title: str) -> str:
+        return self.page_text
+
+    def is_redirect_page(self, page_text: str):
+        return MediaWikiService.is_redirect_page(self, page_text)
+
+
+def generate_overview_page(rows: int) -> str:
+    overview_page = OverviewPageService()
+    templates = overview_page.templates
+    sections_text = WikiTextService().generate_text_from_dict(
+        templates.page_template,
+        f"=={templates.page_initial_section}==",
+        {templates.activities_list_section_title: ""},
+    )
+    new_rows = "".join(
+        overview_page.generate_activities_list_table_row(
+            {
+                "organisation": {"name": f"Organisation {row}"},
+                "platform": {
+                    "name": f"Platform {row % 10}",
+                    "url": f"https://platform-{row % 10}.example.com/",
+                },
+            }
+        )
+        for row in range(rows)
+    )
+    return WikiTableService().add_table_row(
+        page_text=sections_text,
+        new_row=new_rows,
+        table_section_title=templates.activities_list_section_title,
+        table_template=templates.table_template,
+    )
+
+
+def generate_organisation_page(document, rows: int) -> str:
+    organisation_page = OrganisationPageService()
+    templates = organisation_page.templates
+    sections_text = WikiTextService().generate_text_from_dict(
+        templates.page_template,
+        templates.page_initial_section,
+        organisation_page.document_to_page_sections(document),
+    )
+    new_rows = "".join(
+        organisation_page.generate_projects_list_table_row(
+            {
+                "project": {
+                    "name": f"Mapping project {row}",
+                    "author": f"manager_{row % 100}",
+                    "status": "PUBLISHED",
+                },
+                "platform": document["platform"],
+            }
+        )
+        for row in range(rows)
+    )
+    return WikiTableService().add_table_row(
+        page_text=sections_text,
+        new_row=new_rows,
+        table_section_title=templates.projects_section,
+        table_template=templates.table_template,
+    )
+
+
+def generate_project_page(document) -> str:
+    project_page = ProjectPageService()
+    templates = project_page.templates
+    sections_text = WikiTextService().generate_text_from_dict(
+        templates.page_template,
+        f"=={templates.page_initial_section}==",
+        project_page.document_to_page_sections(document),
+    )
+    return WikiTableService().add_table_row(
+        page_text=sections_text,
+        new_row=project_page.get_project_users_table_rows(document),
+        table_section_title=templates.team_user_section,
+        table_template=templates.table_template,
+    )
+
+
+def generate_benchmarks(rows: int) -> dict:
+    """
+    Generate the pages with tables of a number of rows and the benchmarks
+    timed on them
+
+    Keyword arguments:
+    rows -- The number of rows of the tables
+
+    Returns:
+    benchmarks -- Dict with a function preparing each benchmark, which
+                  returns the function being timed
+    """
+    document_json = generate_document(rows)
+    # Dates of project pages are parsed back with the day as the month
+    document_json["project"]["created"] = "2020-07-10T10:54:25.449637Z"
+    document = schema_registry.get(DocumentSchema).load(document_json)
+    page_services = {
+        "overview": OverviewPageService(),
+        "organisation": OrganisationPageService(),
+        "project": ProjectPageService(),
+    }
+    page_texts = {
+        "overview": generate_overview_page(rows),
+        "organisation": generate_organisation_page(document, rows),
+        "project": generate_project_page(document),
+    }
+
+    def wikitext_to_dict(page: str) -> dict:
+        StaticWiki.page_text = page_texts[page]
+        return page_services[page].wikitext_to_dict(page)
+
+    def prepare_generate_text_from_dict():
+        organisation_page = page_services["organisation"]
+        page_sections = organisation_page.document_to_page_sections(document)
+        return lambda: WikiTextService().generate_text_from_dict(
+            page_texts["organisation"],
+            organisation_page.templates.page_initial_section,
+            page_sections,
+        )
+
+    def prepare_add_table_row():
+        organisation_page = page_services["organisation"]
+        section_title = organisation_page.templates.projects_list_section
+        table = WikiSectionService().get_section_table(
+            page_texts["organisation"], section_title
+        )
+        new_row = organisation_page.generate_projects_list_table_row(
+            organisation_page.filter_page_data(document)
+        )
+        return lambda: WikiTableService().add_table_row(
+            page_text=page_texts["organisation"],
+            new_row=new_row,
+            table_section_title=section_title,
+            table_template=table.string,
+        )
+
+    def prepare_edit_table():
+        overview_page = page_services["overview"]
+        table = WikiSectionService().get_section_table(
+            page_texts["overview"],
+            overview_page.templates.activities_list_section_title,
+        )
+        update_table_fields = overview_page.get_update_table_fields(
+            {"organisation": {"name": "Renamed organisation"}},
+            {
+                "organisation": {"name": f"Organisation {rows // 2}"},
+                "platform": {
+                    "name": f"Platform {rows // 2 % 10}",
+                    "url": f"https://platform-{rows // 2 % 10}.example.com/",
+                },
+            },
+        )
+        return lambda: WikiTableService().edit_table(
+            table.string, "", update_table_fields
+        )
+
+    def prepare_wikitext_to_dict(page: str):
+        return lambda: wikitext_to_dict(page)
+
+    def prepare_parse_page_to_serializer(page: str):
+        page_dictionary = wikitext_to_dict(page)
+        if page == "project":
+            return lambda: page_services[page].parse_page_to_serializer(
+                page_dictionary, document["project"]["name"]
+            )
+        return lambda: page_services[page].parse_page_to_serializer(page_dictionary)
+
+    benchmarks = {
+        "generate_text_from_dict": prepare_generate_text_from_dict,
+        "add_table_row": prepare_add_table_row,
+        "edit_table": prepare_edit_table,
+    }
+    for page in page_texts:
+        benchmarks[f"wikitext_to_dict_{page}"] = partial(
+            prepare_wikitext_to_dict, page
+        )
+    for page in page_texts:
+        benchmarks[f"parse_page_to_serializer_{page}"] = partial(
+            prepare_parse_page_to_serializer, page
+        )
+    return benchmarks
+
+
+def median_time(function, repeat: int) -> float:
+    """
+    Time a function with the median of several repeats. Each repeat calls the
+    function as many times as needed to take at least 0.2 seconds, and
+    functions taking longer than a second are timed once
+
+    Keyword arguments:
+    function -- The function being timed
+    repeat -- The number of repeats
+
+    Returns:
+    seconds -- The median seconds of a call
+    """
+    timer = timeit.Timer(function)
+    number, seconds = timer.autorange()
+    if seconds / number > 1:
+        return seconds / number
+    samples = [seconds] + timer.repeat(repeat=repeat - 1, number=number)
+    return statistics.median(samples) / number
+
+
+def run(rows_counts: list, max_seconds: float, repeat: int = 5) -> list:
+    """
+    Run the benchmarks with tables of each number of rows. A benchmark is
+    skipped at larger tables once it took longer than `max_seconds`
+
+    Keyword arguments:
+    rows_counts -- List with the numbers of rows of the tables
+    max_seconds -- Seconds after which a benchmark is skipped at larger tables
+    repeat -- The number of repeats of each benchmark
+
+    Returns:
+    results -- List of dicts with the benchmark, rows and median seconds,
+               which are None for skipped benchmarks
+    """
+    results = []
+    slow_benchmarks = set()
+    with patch(
+        "server.services.wiki.pages.page_service.MediaWikiService", StaticWiki
+    ):
+        for rows in sorted(rows_counts):
+            for name, prepare in generate_benchmarks(rows).items():
+                seconds = None
+                if name not in slow_benchmarks:
+                    seconds = median_time(prepare(), repeat)
+                    if seconds > max_seconds:
+                        slow_benchmarks.add(name)
+                results.append({"benchmark": name, "rows": rows, "seconds": seconds})
+                print(
+                    f"{name:>40} {rows:>8} "
+                    + (f"{seconds * 1000:>10.2f}ms" if seconds is not None else "skipped"),
+                    flush=True,
+                )
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float) -> list:
+    """
+    Compare the results with the results of a baseline run
+
+    Keyword arguments:
+    results -- List with the results of this run
+    baseline -- The JSON results of the baseline run
+    threshold -- The fraction a benchmark may be slower than the baseline
+
+    Returns:
+    regressions -- List of strings describing the benchmarks slower than
+                   the threshold
+    """
+    baseline_seconds = {
+        (result["benchmark"], result["rows"]): result["seconds"]
+        for result in baseline["results"]
+    }
+    regressions = []
+    for result in results:
+        seconds = baseline_seconds.get((result["benchmark"], result["rows"]))
+        if (
+            seconds
+            and result["seconds"] is not None
+            and result["seconds"] > seconds * (1 + threshold)
+        ):
+            regressions.append(
+                f"{result['benchmark']} with {result['rows']} rows:"
+                f" {seconds * 1000:.2f}ms -> {result['seconds'] * 1000:.2f}ms"
+                f" ({result['seconds'] / seconds - 1:+.0%})"
+            )
+    return regressions
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wikitext layer")
+    parser.add_argument("--rows", type=int, nargs="+", help="Rows of the tables")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=5,
+        help="Seconds after which a benchmark is skipped at larger tables",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Repeats of each benchmark"
+    )
+    parser.add_argument("--output", help="File to save the JSON results to")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="Fraction a benchmark may be slower than the baseline",
+    )
+    arguments = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        results = run(arguments.rows or ROWS, arguments.max_seconds, arguments.repeat)
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(
+                {
+                    "commit": get_commit(),
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), arguments.threshold)
+        if regressions:
+            print(f"Regressions over {arguments.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions over {arguments.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the YAML codec with the pure Python PyYAML implementation previously
+used by FileService.
+
+Usage: python -m benchmarks.yaml_codec [users_count ...]
+"""
+import sys
+import timeit
+
+import yaml
+
+from benchmarks.documents import generate_document
+from server.services.git.yaml_codec import LIBYAML_AVAILABLE, YamlCodec
+
+USERS_COUNTS = [10, 100, 1000, 10000, 50000]
+
+
+def pure_python_encode(yaml_dict: dict) -> str:
+    return yaml.dump(yaml_dict, allow_unicode=True)
+
+
+def pure_python_decode(yaml_str: str) -> dict:
+    return yaml.load(yaml_str, Loader=yaml.FullLoader)
+
+
+def best_time(function, argument, repeat: int) -> float:
+    return min(timeit.repeat(lambda: function(argument), number=1, repeat=repeat))
+
+
+def run(users_counts: list) -> list:
+    results = []
+    for users_count in users_counts:
+        document = generate_document(users_count)
+        yaml_str = pure_python_encode(document)
+        if YamlCodec.encode(document) != yaml_str:
+            raise AssertionError(f"Codec output differs for {users_count} users")
+        if YamlCodec.decode(yaml_str) != document:
+            raise AssertionError(f"Codec doesn't round trip {users_count} users")
+
+        repeat = 5 if users_count < 10000 else 2
+        results.append(
+            {
+                "users": users_count,
+                "bytes": len(yaml_str.encode("utf-8")),
+                "python_dump": best_time(pure_python_encode, document, repeat),
+                "codec_dump": best_time(YamlCodec.encode, document, repeat),
+                "python_load": best_time(pure_python_decode, yaml_str, repeat),
+                "codec_load": best_time(YamlCodec.decode, yaml_str, repeat),
+            }
+        )
+    return results
+
+
+def main():
+    users_counts = [int(argument) for argument in sys.argv[1:]] or USERS_COUNTS
+    print(f"libyaml available: {LIBYAML_AVAILABLE}")
+    print(
+        f"{'users':>8} {'bytes':>10} {'py dump':>10} {'dump':>10} {'speedup':>8}"
+        f" {'py load':>10} {'load':>10} {'speedup':>8}"
+    )
+    for result in run(users_counts):
+        print(
+            f"{result['users']:>8} {result['bytes']:>10}"
+            f" {result['python_dump'] * 1000:>8.2f}ms {result['codec_dump'] * 1000:>8.2f}ms"
+            f" {result['python_dump'] / result['codec_dump']:>7.1f}x"
+            f" {result['python_load'] * 1000:>8.2f}ms {result['codec_load'] * 1000:>8.2f}ms"
+            f" {result['python_load'] / result['codec_load']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,138 @@
 
-from flask_script import Manager
+from flask_script import Manager, Server
 
-from server import create_app
+from server import create_app, start_background_threads_on_request
 
-application = create_app()
+# Commands don't run the background threads, only the development server
+application = create_app(background_threads=False)
 manager = Manager(application)
 
+
+class BackgroundThreadsServer(Server):
+    """Development server that starts the background threads"""
+
+    def __call__(self, app, *args, **kwargs):
+        start_background_threads_on_request(app)
+        super().__call__(app, *args, **kwargs)
+
+
+manager.add_command("runserver", BackgroundThreadsServer())
+
+
+@manager.option("-l", "--layout", dest="layout", help="Layout name: flat or hashed")
+@manager.option(
+    "-f", "--fan-out", dest="fan_out", type=int, help="Fan-out of the hashed layout"
+)
+def migrate_layout(layout=None, fan_out=None):
+    """Move the report files to a new directory layout in a single commit"""
+    import git
+
+    from server.services.git.layout_service import LayoutService
+    from server.services.git.push_service import PushService
+
+    layout = layout or application.config["REPORT_FILE_LAYOUT"]
+    fan_out = fan_out or application.config["REPORT_FILE_FAN_OUT"]
+
+    repo = git.Repo(application.config["REPORT_FILE_DIR"])
+    layout_service = LayoutService(f"{application.config['REPORT_FILE_DIR']}/github_files")
+    moved_files = layout_service.migrate(repo, layout, fan_out)
+
+    repo.index.commit(f"Migrate report files to the {layout} layout")
+    PushService(repo).push()
+    print(f"{moved_files} project files moved to the {layout} layout")
+
+
+@manager.command
+def rebuild_index():
+    """Rebuild the project index from the tree of the report repository"""
+    import git
+
+    from server.services.git.index_service import ProjectIndexService
+
+    project_index = ProjectIndexService()
+    if not project_index.is_enabled():
+        print("REPORT_INDEX_FILE is not set")
+        return
+    repo = git.Repo(application.config["REPORT_FILE_DIR"])
+    print(f"{project_index.rebuild(repo)} projects indexed")
+
+
+@manager.command
+def build_snapshot():
+    """Build the columnar snapshot of the project documents"""
+    import git
+
+    from server.services.git.snapshot_service import SnapshotService
+
+    snapshot = SnapshotService()
+    if not snapshot.is_enabled():
+        print("REPORT_SNAPSHOT_DIR is not set")
+        return
+    repo = git.Repo(application.config["REPORT_FILE_DIR"])
+    manifest = snapshot.build(repo)
+    print(
+        f"Snapshot of commit {manifest['commit']} built,"
+        f" {manifest['parsed_files']} project files parsed"
+    )
+
+
+@manager.option(
+    "-d",
+    "--dry-run",
+    dest="dry_run",
+    action="store_true",
+    help="List the pages to create or edit without writing them",
+)
+@manager.option("-w", "--workers", dest="workers", type=int, help="Concurrent edits")
+def reconcile_wiki(dry_run=False, workers=None):
+    """Create or edit the wiki pages that differ from the report repository"""
+    from server.services.wiki.reconcile_service import WikiReconcileService
+
+    result = WikiReconcileService(workers=workers).reconcile(dry_run=dry_run)
+    created, edited = ("to create", "to edit") if dry_run else ("created", "edited")
+    for file_path, error in result["skipped_files"].items():
+        print(f"Skipped {file_path}: {error}")
+    for page_title in result["created_pages"]:
+        print(f"Page {created}: {page_title}")
+    for page_title in result["edited_pages"]:
+        print(f"Page {edited}: {page_title}")
+    for page_title, error in result["failed_pages"].items():
+        print(f"Page failed: {page_title}: {error}")
+    print(
+        f"{result['documents']} documents, {result['pages']} pages:"
+        f" {result['unchanged_pages']} unchanged,"
+        f" {len(result['created_pages'])} {created},"
+        f" {len(result['edited_pages'])} {edited},"
+        f" {len(result['failed_pages'])} failed"
+    )
+
+
+@manager.option("-b", "--backends", dest="backends", help="Backends: wiki,git")
+@manager.option("-n", "--reports", dest="reports", type=int, help="Reports per level")
+@manager.option(
+    "-c", "--concurrency", dest="concurrency", help="Concurrency levels, e.g. 1,4,16"
+)
+@manager.option(
+    "-r", "--recorded", dest="recorded", help="File with recorded reports (JSON lines)"
+)
+@manager.option("-o", "--output", dest="output", help="File to save the JSON results to")
+def load_test(backends=None, reports=None, concurrency=None, recorded=None, output=None):
+    """Load test the reports against a local wiki stand-in and git remote"""
+    import json
+
+    from benchmarks.load_test import run
+
+    results = run(
+        application,
+        (backends or "wiki,git").split(","),
+        reports or 200,
+        [int(level) for level in (concurrency or "1,4,16").split(",")],
+        recorded,
+    )
+    if output:
+        with open(output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
 if __name__ == "__main__":
     manager.run()
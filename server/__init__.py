@@ -1,13 +1,26 @@
+import os
+
 from flask_cors import CORS
 from flask import Flask
-from flasgger import Swagger
 from flask_marshmallow import Marshmallow
 
+from server.lazy import LazySwagger, LazyView
+
 
 ma = Marshmallow()
 
+# PID of the process that loaded the application before forking the workers
+preloaded_pid = None
+
+
+def create_app(background_threads: bool = True):
+    """
+    Create the Flask application
 
-def create_app():
+    Keyword arguments:
+    background_threads -- If False, the git maintenance and job worker
+                          threads are not started, e.g. for commands and tests
+    """
     app = Flask(__name__)
 
     # Load configuration options from environment
@@ -16,40 +29,215 @@ def create_app():
     # Database configuration
     ma.init_app(app)
 
+    # Clone the report repository if it is not cloned yet
+    from server.services.git.bootstrap_service import RepositoryBootstrapService
+
+    RepositoryBootstrapService(app).bootstrap()
+
+    # Cache of parsed project documents
+    from server.services.git.document_cache import document_cache
+
+    document_cache.init_app(app)
+
+    # Stored responses of the requests with an Idempotency-Key
+    from server.services.idempotency_store import idempotency_store
+
+    idempotency_store.init_app(app)
+
+    # Cache of documents parsed from the wiki pages
+    from server.services.wiki.document_cache import wiki_document_cache
+
+    wiki_document_cache.init_app(app)
+
+    # Write lanes of the report repository
+    from server.services.git.write_lanes import write_lanes
+
+    write_lanes.init_app(app)
+
+    # Background maintenance of the report repository
+    from server.services.git.maintenance_service import git_maintenance
+
+    git_maintenance.init_app(app)
+
+    # Latency metrics of the reports
+    from server.services.metrics_service import metrics
+
+    metrics.init_app(app)
+
+    # Profiling of signed or sampled requests
+    from server.services.profiling_service import request_profiler
+
+    request_profiler.init_app(app)
+
     # Add paths to API endpoints
     add_api_endpoints(app)
 
-    # Swagger configuration
-    Swagger(app)
+    # Build the views, templates and schemas before the workers are forked
+    if app.config["WARMUP_ENABLED"]:
+        from server.services.warmup_service import WarmupService
+
+        WarmupService(app).warmup()
+
+    # Workers of the report job queue
+    from server.services.jobs.worker_pool import job_workers
+
+    job_workers.init_app(app)
+
+    # Threads don't survive a fork, and forking while they hold locks can
+    # deadlock the children, so a preloading server starts them in each worker
+    if background_threads and app.config["WARMUP_ENABLED"]:
+        start_background_threads_after_fork(app)
+    elif background_threads:
+        start_background_threads()
+
+    # Swagger configuration, loaded on the first request to the docs
+    app.wsgi_app = LazySwagger(app)
 
     # Enables CORS on all API routes, meaning API is callable from anywhere
     CORS(app)
     return app
 
 
-def add_api_endpoints(app):
+def start_background_threads():
+    """
+    Start the threads of the git maintenance and of the job workers that are
+    not running in this process
+    """
+    from server.services.git.maintenance_service import git_maintenance
+    from server.services.jobs.worker_pool import job_workers
+
+    git_maintenance.start()
+    job_workers.start()
+
+
+def start_background_threads_after_fork(app):
+    """
+    Start the background threads in the workers forked by a preloading
+    server, or on the first request of a server that doesn't fork
+
+    Keyword arguments:
+    app -- The Flask application
+    """
+    global preloaded_pid
+    preloaded_pid = os.getpid()
+    start_background_threads_on_request(app)
+
+
+def start_background_threads_on_request(app):
+    """
+    Start the background threads on the first request served by each
+    process. Later requests only check that they were started
 
-    from server.api.git.resources import GitDocumentApi
-    from server.api.wiki.resources import WikiDocumentApi
+    Keyword arguments:
+    app -- The Flask application
+    """
+    app.before_request(start_background_threads)
 
+
+def start_background_threads_in_worker():
+    """
+    Start the background threads in a worker forked by a preloading server.
+    Processes forked by the workers don't run them
+    """
+    if preloaded_pid is not None and os.getppid() == preloaded_pid:
+        start_background_threads()
+
+
+os.register_at_fork(after_in_child=start_background_threads_in_worker)
+
+
+def add_api_endpoints(app):
     app.add_url_rule(
         "/git/",
-        view_func=GitDocumentApi.as_view("create_git_document"),
+        view_func=LazyView(
+            "server.api.git.resources.GitDocumentApi", "create_git_document"
+        ),
+        methods=["POST"],
+    )
+    app.add_url_rule(
+        "/git/bulk",
+        view_func=LazyView(
+            "server.api.git.resources.GitBulkDocumentApi", "create_git_documents"
+        ),
+        methods=["POST"],
+    )
+    app.add_url_rule(
+        "/git/projects/",
+        view_func=LazyView(
+            "server.api.git.resources.GitProjectIndexApi", "list_git_projects"
+        ),
+        methods=["GET"],
+    )
+    app.add_url_rule(
+        "/git/projects/<int:project_id>/",
+        view_func=LazyView(
+            "server.api.git.resources.GitProjectIndexApi", "get_git_project"
+        ),
+        methods=["GET"],
+    )
+    app.add_url_rule(
+        "/git/snapshot/",
+        view_func=LazyView(
+            "server.api.git.resources.GitSnapshotApi", "create_git_snapshot"
+        ),
         methods=["POST"],
     )
     app.add_url_rule(
         "/git/<string:platform_name>/<string:organisation_name>/<int:project_id>/",
-        view_func=GitDocumentApi.as_view("update_git_document"),
+        view_func=LazyView(
+            "server.api.git.resources.GitDocumentApi", "update_git_document"
+        ),
         methods=["PATCH"],
     )
+    app.add_url_rule(
+        "/git/<string:platform_name>/<string:organisation_name>/<int:project_id>/",
+        view_func=LazyView(
+            "server.api.git.resources.GitDocumentApi", "get_git_document"
+        ),
+        methods=["GET"],
+    )
 
     app.add_url_rule(
         "/wiki/",
-        view_func=WikiDocumentApi.as_view("create_wiki_document"),
+        view_func=LazyView(
+            "server.api.wiki.resources.WikiDocumentApi", "create_wiki_document"
+        ),
+        methods=["POST"],
+    )
+    app.add_url_rule(
+        "/wiki/bulk",
+        view_func=LazyView(
+            "server.api.wiki.resources.WikiBulkDocumentApi", "create_wiki_documents"
+        ),
         methods=["POST"],
     )
     app.add_url_rule(
         "/wiki/<string:organisation_name>/<string:project_name>/",
-        view_func=WikiDocumentApi.as_view("update_wiki_document"),
+        view_func=LazyView(
+            "server.api.wiki.resources.WikiDocumentApi", "update_wiki_document"
+        ),
         methods=["PATCH"],
     )
+    app.add_url_rule(
+        "/wiki/<string:organisation_name>/<string:project_name>/",
+        view_func=LazyView(
+            "server.api.wiki.resources.WikiDocumentApi", "get_wiki_document"
+        ),
+        methods=["GET"],
+    )
+
+    app.add_url_rule(
+        "/jobs/<string:job_id>/",
+        view_func=LazyView(
+            "server.api.jobs.resources.JobApi", "get_job"
+        ),
+        methods=["GET"],
+    )
+
+    app.add_url_rule(
+        "/metrics",
+        view_func=LazyView(
+            "server.api.metrics.resources.MetricsApi", "get_metrics"
+        ),
+        methods=["GET"],
+    )
@@ -1,42 +1,250 @@
+import json
+
 from flask.views import MethodView
-from flask import request
+from flask import Response, current_app, request, stream_with_context
+
+import git
 
 from marshmallow.exceptions import ValidationError
 
+from server.services.git.bulk_service import GitBulkService
 from server.services.git.git_service import GitService
+from server.services.git.index_service import ProjectIndexService
+from server.services.git.snapshot_service import SnapshotService
+from server.services.git.write_lanes import write_lanes
+from server.services.jobs.queue_service import JobQueueService
+from server.services.jobs.worker_pool import job_workers
 from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
 from server.services.git.file_service import FileServiceError
-from server.services.utils import check_token
+from server.services.git.push_service import GitPushError
+from server.services.utils import (
+    check_token,
+    enqueue_job,
+    idempotent,
+    make_conditional_response,
+)
+
+
+@job_workers.action("create_git_document")
+def create_git_document(document_data: dict) -> tuple:
+    """
+    Create the file of a document in the report repository
+
+    Keyword arguments:
+    document_data -- The JSON data of the document being created
+
+    Returns:
+    response -- Dict with the detail of the result
+    status -- The HTTP status of the result
+    """
+    try:
+        document = schema_registry.get(DocumentSchema).load(document_data)
+
+        platform_name = document["platform"]["name"]
+        organisation_name = document["organisation"]["name"]
+        project_id = document["project"]["project_id"]
+
+        git_report = GitService(platform_name, organisation_name, project_id)
+        git_report.create_document(document)
+        return {"detail": f"Document for project {project_id} created"}, 201
+    except FileServiceError as e:
+        return {"detail": f"{str(e)}"}, 409
+    except ValidationError as e:
+        return {"detail": f"Error validating report data {str(e)}"}, 400
+    except GitPushError as e:
+        return {"detail": f"{str(e)}"}, 503
+
+
+@job_workers.action("update_git_document")
+def update_git_document(
+    platform_name: str, organisation_name: str, project_id: int, document_data: dict
+) -> tuple:
+    """
+    Update the file of a document in the report repository
+
+    Keyword arguments:
+    platform_name -- The name of the platform of the project
+    organisation_name -- The name of the organisation of the project
+    project_id -- The id of the project
+    document_data -- The JSON data of the fields being updated
+
+    Returns:
+    response -- Dict with the detail of the result
+    status -- The HTTP status of the result
+    """
+    try:
+        document = schema_registry.get(DocumentSchema, partial=True).load(
+            document_data
+        )
+        git_report = GitService(platform_name, organisation_name, project_id)
+        git_report.update_document(document)
+        return {"detail": f"Document for project {project_id} updated"}, 201
+    except FileServiceError as e:
+        return {"detail": f"{str(e)}"}, 409
+    except ValidationError as e:
+        return {"detail": f"Error validating report data {str(e)}"}, 400
+    except GitPushError as e:
+        return {"detail": f"{str(e)}"}, 503
 
 
 class GitDocumentApi(MethodView):
     @check_token
-    def post(self):
+    def get(self, platform_name: str, organisation_name: str, project_id: int):
+        """
+        Get the document of a project from the report repository. The ETag of
+        the response is the git blob SHA of the project file, and requests
+        with it in If-None-Match get a 304 response
+        """
         try:
-            document_schema = DocumentSchema()
-            document = document_schema.load(request.json)
-
-            platform_name = document["platform"]["name"]
-            organisation_name = document["organisation"]["name"]
-            project_id = document["project"]["project_id"]
-
             git_report = GitService(platform_name, organisation_name, project_id)
-            git_report.create_document(document)
-            return {"detail": f"Document for project {project_id} created"}, 201
+            document, blob_sha = git_report.read_document()
+            return make_conditional_response(document.to_json(), blob_sha)
         except FileServiceError as e:
-            return {"detail": f"{str(e)}"}, 409
-        except ValidationError as e:
-            return {"detail": f"Error validating report data {str(e)}"}, 400
+            return {"detail": f"{str(e)}"}, 404
 
     @check_token
+    @idempotent
+    def post(self):
+        if JobQueueService().is_enabled():
+            try:
+                schema_registry.get(DocumentSchema).load(request.json)
+            except ValidationError as e:
+                return {"detail": f"Error validating report data {str(e)}"}, 400
+            return enqueue_job("create_git_document", request.json)
+        return create_git_document(request.json)
+
+    @check_token
+    @idempotent
     def patch(self, platform_name: str, organisation_name: str, project_id: int):
-        try:
-            document_schema = DocumentSchema(partial=True)
-            document = document_schema.load(request.json)
-            git_report = GitService(platform_name, organisation_name, project_id)
-            git_report.update_document(document_schema.dump(document))
-            return {"detail": f"Document for project {project_id} updated"}, 201
-        except FileServiceError as e:
-            return {"detail": f"{str(e)}"}, 409
-        except ValidationError as e:
-            return {"detail": f"Error validating report data {str(e)}"}, 400
+        if JobQueueService().is_enabled():
+            try:
+                schema_registry.get(DocumentSchema, partial=True).load(request.json)
+            except ValidationError as e:
+                return {"detail": f"Error validating report data {str(e)}"}, 400
+            return enqueue_job(
+                "update_git_document",
+                platform_name,
+                organisation_name,
+                project_id,
+                request.json,
+            )
+        return update_git_document(
+            platform_name, organisation_name, project_id, request.json
+        )
+
+
+class GitBulkDocumentApi(MethodView):
+    @check_token
+    def post(self):
+        """
+        Create many documents sent as newline-delimited JSON. Each line is
+        validated and written as it arrives, and all documents are pushed in a
+        single commit. The response has one JSON line with the result of each
+        document line followed by a line with the commit result
+        """
+        bulk_report = GitBulkService()
+
+        def generate_results():
+            document_schema = schema_registry.get(DocumentSchema)
+            committing = False
+            try:
+                for line_number, line in enumerate(request.stream, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        document = document_schema.load(json.loads(line))
+                        bulk_report.create_document(document)
+                        project_id = document["project"]["project_id"]
+                        result = {
+                            "line": line_number,
+                            "status": 201,
+                            "detail": f"Document for project {project_id} created",
+                        }
+                    except FileServiceError as e:
+                        result = {"line": line_number, "status": 409, "detail": str(e)}
+                    except ValidationError as e:
+                        result = {
+                            "line": line_number,
+                            "status": 400,
+                            "detail": f"Error validating report data {str(e)}",
+                        }
+                    except ValueError as e:
+                        result = {
+                            "line": line_number,
+                            "status": 400,
+                            "detail": f"Error decoding report data {str(e)}",
+                        }
+                    yield json.dumps(result) + "\n"
+
+                # The written documents are removed by commit_documents if
+                # they can't be committed
+                committing = True
+                try:
+                    bulk_report.commit_documents()
+                    result = {
+                        "status": 201,
+                        "detail": f"{bulk_report.created_documents} documents created",
+                    }
+                except Exception as e:
+                    error_msg = f"Git bulk POST - error committing documents: {str(e)}"
+                    current_app.logger.error(error_msg)
+                    result = {"status": 500, "detail": error_msg}
+                yield json.dumps(result) + "\n"
+            finally:
+                # The upload was interrupted before the commit, e.g. the
+                # client disconnected or a document couldn't be written
+                if not committing:
+                    current_app.logger.warning(
+                        "Git bulk POST - upload aborted, removing"
+                        f" {bulk_report.created_documents} written documents"
+                    )
+                    bulk_report.abort()
+
+        return Response(
+            stream_with_context(generate_results()), mimetype="application/x-ndjson"
+        )
+
+
+class GitProjectIndexApi(MethodView):
+    @check_token
+    def get(self, project_id: int = None):
+        """
+        Get a project, or list the projects, from the project index
+        """
+        project_index = ProjectIndexService()
+        if not project_index.is_enabled():
+            return {"detail": "Project index is not configured"}, 404
+
+        if project_id is None:
+            limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+            offset = max(request.args.get("offset", 0, type=int), 0)
+            projects = project_index.list_projects(
+                platform=request.args.get("platform"),
+                organisation=request.args.get("organisation"),
+                limit=limit,
+                offset=offset,
+            )
+            return {"projects": projects}, 200
+
+        project = project_index.get_project(project_id)
+        if project is None:
+            return {"detail": f"Project {project_id} not found in the index"}, 404
+        return project, 200
+
+
+class GitSnapshotApi(MethodView):
+    @check_token
+    def post(self):
+        """
+        Build the columnar snapshot of the project documents
+        """
+        snapshot = SnapshotService()
+        if not snapshot.is_enabled():
+            return {"detail": "Snapshot directory is not configured"}, 404
+
+        with write_lanes.acquire("snapshot", blocking=False) as acquired:
+            if not acquired:
+                return {"detail": "A snapshot is already being built"}, 409
+            repo = git.Repo(current_app.config["REPORT_FILE_DIR"])
+            return snapshot.build(repo), 201
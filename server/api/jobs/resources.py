@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from flask.views import MethodView
+
+from server.services.jobs.queue_service import JobQueueService
+from server.services.utils import check_token
+
+
+class JobApi(MethodView):
+    @check_token
+    def get(self, job_id: str):
+        """
+        Get the status of a report job. Finished jobs have the HTTP status
+        and the detail of their result
+        """
+        job_queue = JobQueueService()
+        if not job_queue.is_enabled():
+            return {"detail": "Job queue is not configured"}, 404
+
+        job = job_queue.get_job(job_id)
+        if job is None:
+            return {"detail": f"Job {job_id} not found"}, 404
+        return (
+            {
+                "job_id": job["job_id"],
+                "action": job["action"],
+                "status": job["status"],
+                "attempts": job["attempts"],
+                "result_status": job["result_status"],
+                "detail": job["detail"],
+                "created": datetime.fromtimestamp(
+                    job["created"], timezone.utc
+                ).isoformat(),
+                "updated": datetime.fromtimestamp(
+                    job["updated"], timezone.utc
+                ).isoformat(),
+            },
+            200,
+        )
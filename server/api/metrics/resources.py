@@ -0,0 +1,17 @@
+from flask import Response
+from flask.views import MethodView
+
+from server.services.metrics_service import metrics
+from server.services.utils import check_token
+
+
+class MetricsApi(MethodView):
+    @check_token
+    def get(self):
+        """
+        Get the latency histograms and counters of the reports in the
+        Prometheus text format
+        """
+        if not metrics.enabled:
+            return {"detail": "Metrics are not enabled"}, 404
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -5,78 +5,225 @@ from flask import current_app
 from marshmallow.exceptions import ValidationError
 from requests.exceptions import ConnectionError
 
+from server.services.jobs.queue_service import JobQueueService
+from server.services.jobs.worker_pool import job_workers
+from server.services.wiki.bulk_service import WikiBulkService
 from server.services.wiki.mediawiki_service import MediaWikiServiceError
 from server.services.wiki.pages.organisation_service import OrganisationPageService
 from server.services.wiki.pages.project_service import ProjectPageService
 from server.services.wiki.pages.overview_service import OverviewPageService
-from server.services.wiki.pages.utils import generate_document_data_from_wiki_pages
-from server.services.utils import check_token
+from server.services.wiki.document_cache import wiki_document_cache
+from server.services.wiki.pages.utils import (
+    generate_document_data_from_wiki_pages,
+    get_document_from_wiki_pages,
+)
+from server.services.utils import (
+    check_token,
+    enqueue_job,
+    idempotent,
+    make_conditional_response,
+)
 from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
+
+
+@job_workers.action("create_wiki_document")
+def create_wiki_document(document_data: dict) -> tuple:
+    """
+    Create the wiki pages of a document
+
+    Keyword arguments:
+    document_data -- The JSON data of the document being created
+
+    Returns:
+    response -- Dict with the detail of the result
+    status -- The HTTP status of the result
+    """
+    document = None
+    try:
+        # Validate report data
+        document = schema_registry.get(DocumentSchema).load(document_data)
+
+        overview_page = OverviewPageService()
+        if overview_page.enabled_to_report(document):
+            overview_page.create_page(document)
+
+        organisation_page = OrganisationPageService()
+        if organisation_page.enabled_to_report(document):
+            organisation_page.create_page(document)
+        ProjectPageService().create_page(document)
+        return (
+            {
+                "detail": "Document for project "
+                f"{document['project']['project_id']} created"
+            },
+            201,
+        )
+    except MediaWikiServiceError as e:
+        return {"detail": f"{str(e)}"}, 409
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return {"detail": f"{str(e)}"}, 400
+    except ConnectionError:
+        return {"detail": "Error in connection with Mediawiki"}, 500
+    except ValidationError as e:
+        return {"detail": f"Error validating report data: {str(e)}"}, 400
+    except Exception as e:
+        error_msg = f"Wiki POST - unhandled error: {str(e)}"
+        current_app.logger.error(error_msg)
+        return {"detail": f"{str(error_msg)}"}, 500
+    finally:
+        if document is not None:
+            wiki_document_cache.invalidate_organisation(
+                document["organisation"]["name"]
+            )
+
+
+@job_workers.action("update_wiki_document")
+def update_wiki_document(
+    organisation_name: str, project_name: str, document_data: dict
+) -> tuple:
+    """
+    Edit the wiki pages of a document
+
+    Keyword arguments:
+    organisation_name -- The name of the organisation of the project
+    project_name -- The name of the project
+    document_data -- The JSON data of the fields being updated
+
+    Returns:
+    response -- Dict with the detail of the result
+    status -- The HTTP status of the result
+    """
+    update_fields = None
+    try:
+        # Validate report data
+        update_fields = schema_registry.get(DocumentSchema, partial=True).load(
+            document_data
+        )
+
+        (
+            updated_document,
+            document,
+            changed_fields,
+        ) = generate_document_data_from_wiki_pages(
+            organisation_name, project_name, update_fields
+        )
+        # Only edit the pages showing a changed field
+        for page_service in (
+            OverviewPageService(),
+            OrganisationPageService(),
+            ProjectPageService(),
+        ):
+            if page_service.is_page_updated(changed_fields):
+                page_service.edit_page(updated_document, update_fields, document)
+        return {"detail": f"Document for project {project_name} reported"}, 201
+    except MediaWikiServiceError as e:
+        return {"detail": f"{str(e)}"}, 409
+    except ValueError as e:
+        current_app.logger.error(str(e))
+        return {"detail": f"{str(e)}"}, 400
+    except ValidationError as e:
+        return {"detail": f"Error validating report data: {str(e)}"}, 400
+    except ConnectionError:
+        return {"detail": "Error in connection with Mediawiki"}, 500
+    except Exception as e:
+        error_msg = f"Wiki PATCH - unhandled error: {str(e)}"
+        current_app.logger.error(error_msg)
+        return {"detail": f"{str(error_msg)}"}, 500
+    finally:
+        if update_fields is not None:
+            wiki_document_cache.invalidate_organisation(organisation_name)
+            if "name" in update_fields.get("organisation", {}):
+                wiki_document_cache.invalidate_organisation(
+                    update_fields["organisation"]["name"]
+                )
 
 
 class WikiDocumentApi(MethodView):
     @check_token
-    def post(self):
+    def get(self, organisation_name: str, project_name: str):
+        """
+        Get the document of a project parsed from its wiki pages. Documents
+        are cached, and requests with the ETag of the cached document in
+        If-None-Match get a 304 response
+        """
         try:
-            # Validate report data
-            document_schema = DocumentSchema(partial=True)
-            document_schema.load(request.json)
-
-            overview_page = OverviewPageService()
-            if overview_page.enabled_to_report(request.json):
-                overview_page.create_page(request.json)
-
-            organisation_page = OrganisationPageService()
-            if organisation_page.enabled_to_report(request.json):
-                organisation_page.create_page(request.json)
-            ProjectPageService().create_page(request.json)
-            return (
-                {
-                    "detail": "Document for project "
-                    f"{request.json['project']['projectId']} created"
-                },
-                201,
-            )
-        except MediaWikiServiceError as e:
-            return {"detail": f"{str(e)}"}, 409
-        except ValueError as e:
-            current_app.logger.error(str(e))
-            return {"detail": f"{str(e)}"}, 400
+            entry = wiki_document_cache.get(organisation_name, project_name)
+            if entry is None:
+                generation = wiki_document_cache.get_generation(organisation_name)
+                document_json = get_document_from_wiki_pages(
+                    organisation_name, project_name
+                ).to_json()
+                etag = wiki_document_cache.set(
+                    organisation_name, project_name, document_json, generation
+                )
+            else:
+                document_json, etag = entry
+            return make_conditional_response(document_json, etag)
+        except (MediaWikiServiceError, ValueError) as e:
+            return {"detail": f"{str(e)}"}, 404
         except ConnectionError:
             return {"detail": "Error in connection with Mediawiki"}, 500
-        except ValidationError as e:
-            return {"detail": f"Error validating report data: {str(e)}"}, 400
-        except Exception as e:
-            error_msg = f"Wiki POST - unhandled error: {str(e)}"
-            current_app.logger.error(error_msg)
-            return {"detail": f"{str(error_msg)}"}, 500
 
     @check_token
-    def patch(self, organisation_name: str, project_name: str):
-        try:
-            # Validate report data
-            document_schema = DocumentSchema(partial=True)
-            document_schema.load(request.json)
+    @idempotent
+    def post(self):
+        if JobQueueService().is_enabled():
+            try:
+                schema_registry.get(DocumentSchema).load(request.json)
+            except ValidationError as e:
+                return {"detail": f"Error validating report data: {str(e)}"}, 400
+            return enqueue_job("create_wiki_document", request.json)
+        return create_wiki_document(request.json)
 
-            updated_document, document = generate_document_data_from_wiki_pages(
-                organisation_name, project_name, request.json
-            )
-            OverviewPageService().edit_page(updated_document, request.json, document)
-            OrganisationPageService().edit_page(
-                updated_document, request.json, document
+    @check_token
+    @idempotent
+    def patch(self, organisation_name: str, project_name: str):
+        if JobQueueService().is_enabled():
+            try:
+                schema_registry.get(DocumentSchema, partial=True).load(request.json)
+            except ValidationError as e:
+                return {"detail": f"Error validating report data: {str(e)}"}, 400
+            return enqueue_job(
+                "update_wiki_document", organisation_name, project_name, request.json
             )
-            ProjectPageService().edit_page(updated_document, request.json, document)
-            return {"detail": f"Document for project {project_name} reported"}, 201
-        except MediaWikiServiceError as e:
-            return {"detail": f"{str(e)}"}, 409
-        except ValueError as e:
-            current_app.logger.error(str(e))
-            return {"detail": f"{str(e)}"}, 400
-        except ValidationError as e:
-            return {"detail": f"Error validating report data: {str(e)}"}, 400
-        except ConnectionError:
-            return {"detail": "Error in connection with Mediawiki"}, 500
-        except Exception as e:
-            error_msg = f"Wiki PATCH - unhandled error: {str(e)}"
-            current_app.logger.error(error_msg)
-            return {"detail": f"{str(error_msg)}"}, 500
+        return update_wiki_document(organisation_name, project_name, request.json)
+
+
+class WikiBulkDocumentApi(MethodView):
+    @check_token
+    @idempotent
+    def post(self):
+        """
+        Create the wiki pages of many documents sent as a JSON list. The
+        overview and organisation pages are edited once for all documents,
+        and the response has the result of each document, in the order of
+        the list
+        """
+        documents = request.get_json(silent=True)
+        if not isinstance(documents, list):
+            return {"detail": "Report data must be a list of documents"}, 400
+
+        results = [None] * len(documents)
+        valid_documents = []
+        valid_indexes = []
+        document_schema = schema_registry.get(DocumentSchema)
+        for index, document_data in enumerate(documents):
+            try:
+                valid_documents.append(document_schema.load(document_data))
+                valid_indexes.append(index)
+            except ValidationError as e:
+                results[index] = {
+                    "status": 400,
+                    "detail": f"Error validating report data: {str(e)}",
+                }
+
+        bulk_report = WikiBulkService()
+        for index, result in zip(
+            valid_indexes, bulk_report.create_documents(valid_documents)
+        ):
+            results[index] = result
+        for index, result in enumerate(results):
+            result["index"] = index
+        return {"results": results}, 200
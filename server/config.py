@@ -2,21 +2,182 @@ import os
 
 from dotenv import load_dotenv
 
+# Load configuration from file, before the environment is read below
+load_dotenv(os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".env")))
 
-class EnvironmentConfig:
-
-    # Load configuration from file
-    load_dotenv(os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".env")))
 
+class EnvironmentConfig:
     REPORT_FILE_DIR = os.path.normpath(
         os.path.join(
             os.path.dirname(__file__), "..", f"{os.getenv('REPORT_FILE_DIR')}/",
         )
     )
 
+    # Bootstrap of REPORT_FILE_DIR on startup, only used when the
+    # repository is not cloned yet
+    REPORT_REPOSITORY_URL = os.getenv("REPORT_REPOSITORY_URL")
+    REPORT_REPOSITORY_BRANCH = os.getenv("REPORT_REPOSITORY_BRANCH")
+    REPORT_CLONE_FILTER = os.getenv("REPORT_CLONE_FILTER", "blob:none")
+    REPORT_CLONE_DEPTH = int(os.getenv("REPORT_CLONE_DEPTH", 0))
+    REPORT_SPARSE_CHECKOUT_DIRS = [
+        sparse_checkout_dir.strip()
+        for sparse_checkout_dir in os.getenv("REPORT_SPARSE_CHECKOUT_DIRS", "").split(
+            ","
+        )
+        if sparse_checkout_dir.strip()
+    ]
+
+    # Directory layout of the project files in the report repository.
+    # Only used when the repository doesn't record a layout yet
+    REPORT_FILE_LAYOUT = os.getenv("REPORT_FILE_LAYOUT", "flat")
+    REPORT_FILE_FAN_OUT = int(os.getenv("REPORT_FILE_FAN_OUT", 2))
+
+    # SQLite file with the index of the reported projects, kept next to
+    # the report repository. The index is disabled when it is not set
+    REPORT_INDEX_FILE = (
+        os.path.normpath(
+            os.path.join(
+                os.path.dirname(__file__), "..", os.getenv("REPORT_INDEX_FILE")
+            )
+        )
+        if os.getenv("REPORT_INDEX_FILE")
+        else None
+    )
+
+    # Directory of the columnar snapshot of the project documents, and the
+    # number of processes parsing them (defaults to the number of CPUs)
+    REPORT_SNAPSHOT_DIR = (
+        os.path.normpath(
+            os.path.join(
+                os.path.dirname(__file__), "..", os.getenv("REPORT_SNAPSHOT_DIR")
+            )
+        )
+        if os.getenv("REPORT_SNAPSHOT_DIR")
+        else None
+    )
+    REPORT_SNAPSHOT_WORKERS = int(os.getenv("REPORT_SNAPSHOT_WORKERS", 0))
+
+    # Limits of the cache of parsed project documents
+    GIT_DOCUMENT_CACHE_MAX_ENTRIES = int(
+        os.getenv("GIT_DOCUMENT_CACHE_MAX_ENTRIES", 1024)
+    )
+    GIT_DOCUMENT_CACHE_MAX_BYTES = int(
+        os.getenv("GIT_DOCUMENT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    )
+
+    # Directory of the lock files that serialise writes to the report
+    # repository across worker processes. Only threads of the same process
+    # are serialised when it is not set
+    GIT_LOCK_DIR = (
+        os.path.normpath(
+            os.path.join(os.path.dirname(__file__), "..", os.getenv("GIT_LOCK_DIR"))
+        )
+        if os.getenv("GIT_LOCK_DIR")
+        else None
+    )
+
+    # Retries of a push rejected because the remote branch moved, and the
+    # backoff in seconds before the first retry, doubled on each retry
+    GIT_PUSH_MAX_RETRIES = int(os.getenv("GIT_PUSH_MAX_RETRIES", 5))
+    GIT_PUSH_BACKOFF = float(os.getenv("GIT_PUSH_BACKOFF", 0.5))
+
+    # Background maintenance of the report repository, run every
+    # GIT_MAINTENANCE_INTERVAL seconds when no commit was made in the last
+    # GIT_MAINTENANCE_IDLE_SECONDS. Maintenance is disabled when the interval is 0
+    GIT_MAINTENANCE_INTERVAL = int(os.getenv("GIT_MAINTENANCE_INTERVAL", 0))
+    GIT_MAINTENANCE_IDLE_SECONDS = int(os.getenv("GIT_MAINTENANCE_IDLE_SECONDS", 60))
+    GIT_MAINTENANCE_TASKS = [
+        task.strip()
+        for task in os.getenv("GIT_MAINTENANCE_TASKS", "gc,repack,commit-graph").split(
+            ","
+        )
+        if task.strip()
+    ]
+
+    # SQLite file of the queue of report jobs. When it is set, reports are
+    # queued and run by JOB_WORKERS threads of each process, and the API
+    # answers with the id of the job. Reports run in the request otherwise
+    JOB_QUEUE_FILE = (
+        os.path.normpath(
+            os.path.join(os.path.dirname(__file__), "..", os.getenv("JOB_QUEUE_FILE"))
+        )
+        if os.getenv("JOB_QUEUE_FILE")
+        else None
+    )
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+    # Jobs failing with a server error are retried after JOB_RETRY_DELAY
+    # seconds, doubled on each attempt, up to JOB_MAX_ATTEMPTS attempts. A job
+    # whose worker died is retried when its JOB_LEASE_SECONDS lease expires
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", 30))
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+
+    # SQLite file of the responses of the requests sent with an
+    # Idempotency-Key header, shared by all the processes of the server. The
+    # header is ignored when it is not set. Responses are kept for
+    # IDEMPOTENCY_TTL seconds, up to IDEMPOTENCY_MAX_ENTRIES keys
+    IDEMPOTENCY_FILE = (
+        os.path.normpath(
+            os.path.join(os.path.dirname(__file__), "..", os.getenv("IDEMPOTENCY_FILE"))
+        )
+        if os.getenv("IDEMPOTENCY_FILE")
+        else None
+    )
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 60 * 60))
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", 10000))
+
+    # Record the latency of each stage of the reports and expose it, in the
+    # Prometheus text format, in the /metrics endpoint
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("true", "1")
+
+    # Directory of the profiles of single requests. Requests are profiled when
+    # they are signed with PROFILING_SECRET, or at random for a
+    # PROFILING_SAMPLE_RATE fraction of them. Profiling is disabled when the
+    # directory is not set
+    PROFILING_DIR = (
+        os.path.normpath(
+            os.path.join(os.path.dirname(__file__), "..", os.getenv("PROFILING_DIR"))
+        )
+        if os.getenv("PROFILING_DIR")
+        else None
+    )
+    PROFILING_SECRET = os.getenv("PROFILING_SECRET")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+
+    # Import the API modules, compile the page templates and build the
+    # schemas while the application is created, so the workers of a
+    # preloading server (e.g. gunicorn --preload) share them after the fork.
+    # The background threads are then started in each worker after the fork
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "false").lower() in ("true", "1")
+
     WIKI_API_ENDPOINT = os.getenv("WIKI_API_ENDPOINT")
     MEDIAWIKI_BOT_NAME = os.getenv("MEDIAWIKI_BOT_NAME")
     MEDIAWIKI_BOT_PASSWORD = os.getenv("MEDIAWIKI_BOT_PASSWORD")
+    # Limits of the cache of documents parsed from the wiki pages. Wiki pages
+    # may be edited by hand, so documents expire after the TTL in seconds
+    WIKI_DOCUMENT_CACHE_MAX_ENTRIES = int(
+        os.getenv("WIKI_DOCUMENT_CACHE_MAX_ENTRIES", 1024)
+    )
+    WIKI_DOCUMENT_CACHE_TTL = int(os.getenv("WIKI_DOCUMENT_CACHE_TTL", 300))
+    # SQLite file where the invalidations of the wiki document cache are
+    # shared by all the processes of the server. When it is not set, reports
+    # only invalidate the documents cached by the process that handled them
+    WIKI_DOCUMENT_CACHE_FILE = (
+        os.path.normpath(
+            os.path.join(
+                os.path.dirname(__file__), "..", os.getenv("WIKI_DOCUMENT_CACHE_FILE")
+            )
+        )
+        if os.getenv("WIKI_DOCUMENT_CACHE_FILE")
+        else None
+    )
+
+    # Number of threads creating the project pages of a bulk wiki report
+    WIKI_BULK_WORKERS = int(os.getenv("WIKI_BULK_WORKERS", 4))
+    # Number of pages fetched with each request while reconciling the wiki
+    # with the report repository. MediaWiki allows 50, or 500 for bots
+    WIKI_RECONCILE_BATCH_SIZE = int(os.getenv("WIKI_RECONCILE_BATCH_SIZE", 50))
     OEG_REPORTER_BOT_NAME = os.getenv("OEG_REPORTER_BOT_NAME")
     OEG_REPORTER_VERSION = os.getenv("OEG_REPORTER_VERSION")
     OEG_REPORTER_CONTACT_INFORMATION = os.getenv("OEG_REPORTER_CONTACT_INFORMATION")
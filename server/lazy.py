@@ -0,0 +1,74 @@
+import threading
+
+from flask import Flask
+from werkzeug.utils import cached_property, import_string
+
+
+class LazyView:
+    """
+    View function importing its MethodView class on the first request, so
+    the API modules and their dependencies (GitPython, wikitextparser and
+    requests) are not imported while the application starts
+    """
+
+    def __init__(self, import_name: str, endpoint: str):
+        self.import_name = import_name
+        self.__module__ = import_name.rsplit(".", 1)[0]
+        self.__name__ = endpoint
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name).as_view(self.__name__)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+class LazySwagger:
+    """
+    WSGI middleware serving the Swagger docs. Flasgger is imported and the
+    docs application is built on the first request to the docs, mirroring
+    the routes of the application so the spec documents them
+    """
+
+    paths = ("/apidocs", "/apispec_1.json", "/flasgger_static", "/oauth2-redirect.html")
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.docs_app = None
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if environ.get("PATH_INFO", "").startswith(self.paths):
+            return self.get_docs_app()(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+    def get_docs_app(self) -> Flask:
+        """
+        Get the application serving the docs, building it on the first call
+
+        Returns:
+        docs_app -- The Flask application serving the Swagger docs
+        """
+        with self.lock:
+            if self.docs_app is None:
+                from flasgger import Swagger
+                from flask_cors import CORS
+
+                docs_app = Flask(self.app.import_name)
+                docs_app.config.update(self.app.config)
+                for rule in self.app.url_map.iter_rules():
+                    if rule.endpoint == "static":
+                        continue
+                    view_func = self.app.view_functions[rule.endpoint]
+                    docs_app.add_url_rule(
+                        rule.rule,
+                        endpoint=rule.endpoint,
+                        view_func=getattr(view_func, "view", view_func),
+                        methods=rule.methods,
+                    )
+                Swagger(docs_app)
+                CORS(docs_app)
+                self.docs_app = docs_app
+            return self.docs_app
@@ -0,0 +1,170 @@
+from datetime import datetime
+
+from server.models.serializers.utils import camelcase
+
+
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+
+class Model:
+    """
+    Base class of the document model. Models store their fields in slots,
+    which take much less memory than the dicts they replace, and fields
+    missing from a partial document are left unset.
+
+    Models can be read like the dicts deserialised by the schemas, with the
+    snake-case field names as keys, so code handling documents doesn't need
+    to know if it got a model or a dict.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def keys(self) -> set:
+        """
+        Get the names of the fields set in the model
+
+        Returns:
+        keys -- Set with the names of the fields
+        """
+        return {name for name in self.__slots__ if hasattr(self, name)}
+
+    def items(self) -> list:
+        """
+        Get the fields set in the model
+
+        Returns:
+        items -- List of tuples with the name and the value of each field
+        """
+        return [
+            (name, getattr(self, name)) for name in self.__slots__ if hasattr(self, name)
+        ]
+
+    def get(self, name: str, default=None):
+        """
+        Get the value of a field, or a default value if it is not set
+        """
+        return getattr(self, name, default) if name in self.__slots__ else default
+
+    def __getitem__(self, name: str):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__slots__ and hasattr(self, name)
+
+    def __iter__(self):
+        return iter(name for name in self.__slots__ if hasattr(self, name))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return type(self) is type(other) and self.items() == other.items()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+    def merge_patch(self, update_fields: "Model") -> tuple:
+        """
+        Apply the fields of other model following JSON Merge Patch semantics:
+        nested models are merged, fields set to None are removed and any
+        other value, lists included, is replaced.
+
+        Only the models on the path of a changed field are copied, every
+        other field is shared with the current model, which is not modified.
+        If no field changes, the current model itself is returned
+
+        Keyword arguments:
+        update_fields -- Model, or dict, with the fields being updated
+
+        Returns:
+        updated_model -- The updated model
+        changed_fields -- List with the dotted paths of the changed fields,
+                          e.g. "project.external_source.license"
+        """
+        fields = dict(self.items())
+        changed_fields = []
+        for name, value in update_fields.items():
+            if value is None:
+                if name in fields:
+                    del fields[name]
+                    changed_fields.append(name)
+                continue
+            current_value = fields.get(name)
+            if isinstance(value, (Model, dict)) and isinstance(current_value, Model):
+                value, nested_changed_fields = current_value.merge_patch(value)
+                changed_fields.extend(
+                    f"{name}.{nested_field}" for nested_field in nested_changed_fields
+                )
+            elif name not in fields or current_value != value:
+                changed_fields.append(name)
+            fields[name] = value
+
+        if not changed_fields:
+            return self, changed_fields
+        return self.__class__(**fields), changed_fields
+
+    def to_json(self) -> dict:
+        """
+        Generate the camel-case representation of the model, as dumped
+        by its schema
+
+        Returns:
+        model_json -- Dict with the camel-case representation of the model
+        """
+        model_json = {}
+        for name, value in self.items():
+            if isinstance(value, Model):
+                value = value.to_json()
+            elif isinstance(value, list):
+                value = [
+                    item.to_json() if isinstance(item, Model) else item
+                    for item in value
+                ]
+            elif isinstance(value, datetime):
+                value = value.strftime(DATETIME_FORMAT)
+            model_json[camelcase(name)] = value
+        return model_json
+
+
+class User(Model):
+    __slots__ = ("user_id", "user_name")
+
+
+class ExternalSource(Model):
+    __slots__ = ("imagery", "license", "instructions", "per_task_instructions")
+
+
+class Project(Model):
+    __slots__ = (
+        "project_id",
+        "status",
+        "name",
+        "short_description",
+        "changeset_comment",
+        "author",
+        "url",
+        "created",
+        "external_source",
+        "users",
+    )
+
+
+class Organisation(Model):
+    __slots__ = ("description", "url", "name")
+
+
+class Platform(Model):
+    __slots__ = ("name", "url")
+
+
+class Document(Model):
+    __slots__ = ("project", "organisation", "platform")
@@ -1,4 +1,5 @@
 from server import ma
+from server.models.document import Document
 from server.models.serializers.utils import CamelCaseSchema
 from server.models.serializers.organisation import OrganisationSchema
 from server.models.serializers.platform import PlatformSchema
@@ -6,6 +7,8 @@ from server.models.serializers.project import ProjectSchema
 
 
 class DocumentSchema(CamelCaseSchema):
+    model_class = Document
+
     project = ma.Nested(ProjectSchema)
     organisation = ma.Nested(OrganisationSchema)
     platform = ma.Nested(PlatformSchema)
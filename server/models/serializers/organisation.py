@@ -1,8 +1,11 @@
 from server import ma
+from server.models.document import Organisation
 from server.models.serializers.utils import CamelCaseSchema
 
 
 class OrganisationSchema(CamelCaseSchema):
+    model_class = Organisation
+
     description = ma.Str(required=True)
     url = ma.Url(required=True)
     name = ma.Str(required=True)
@@ -1,8 +1,11 @@
 from server import ma
+from server.models.document import Platform
 from server.models.serializers.utils import CamelCaseSchema
 
 
 class PlatformSchema(CamelCaseSchema):
+    model_class = Platform
+
     name = ma.Str(required=True)
     url = ma.Url(required=True)
 
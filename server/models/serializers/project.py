@@ -1,13 +1,18 @@
 from server import ma
+from server.models.document import ExternalSource, Project, User
 from server.models.serializers.utils import CamelCaseSchema
 
 
 class UserSchema(CamelCaseSchema):
+    model_class = User
+
     user_id = ma.Int(required=True)
     user_name = ma.Str(required=True)
 
 
 class ExternalSourceSchema(CamelCaseSchema):
+    model_class = ExternalSource
+
     imagery = ma.Str(required=True)
     license = ma.Str(required=True)
     instructions = ma.Str(required=True)
@@ -15,6 +20,8 @@ class ExternalSourceSchema(CamelCaseSchema):
 
 
 class ProjectSchema(CamelCaseSchema):
+    model_class = Project
+
     project_id = ma.Int(required=True)
     status = ma.Str(required=True)
     name = ma.Str(required=True)
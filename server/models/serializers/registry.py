@@ -0,0 +1,42 @@
+import threading
+
+
+class SchemaRegistry:
+    """
+    Registry of prebuilt schema instances. Building a schema, mainly with
+    `only`, is much slower than loading data with it, so each combination of
+    schema class, fields and partial loading is built once and reused.
+
+    Schemas are shared between requests and threads, so their options and
+    context must not be modified.
+    """
+
+    def __init__(self):
+        self.schemas = {}
+        self.lock = threading.Lock()
+
+    def get(self, schema_class, only: list = None, partial: bool = False):
+        """
+        Get the schema instance of a schema class and options, building
+        it the first time it is requested
+
+        Keyword arguments:
+        schema_class -- The class of the schema
+        only -- Fields loaded and dumped by the schema. All fields if not set
+        partial -- If True, required fields may be missing
+
+        Returns:
+        schema -- The schema instance
+        """
+        key = (schema_class, frozenset(only) if only else None, partial)
+        schema = self.schemas.get(key)
+        if schema is None:
+            with self.lock:
+                schema = self.schemas.get(key)
+                if schema is None:
+                    schema = schema_class(only=only, partial=partial)
+                    self.schemas[key] = schema
+        return schema
+
+
+schema_registry = SchemaRegistry()
@@ -1,3 +1,5 @@
+from marshmallow import post_load
+
 from server import ma
 
 
@@ -9,8 +11,15 @@ def camelcase(s):
 class CamelCaseSchema(ma.Schema):
     """
     Schema that uses camel-case for its external representation
-    and snake-case for its internal representation.
+    and snake-case for its internal representation. Schemas with a
+    model class load data into instances of the model.
     """
 
+    model_class = None
+
+    @post_load
+    def make_model(self, data, **kwargs):
+        return self.model_class(**data) if self.model_class else data
+
     def on_bind_field(self, field_name, field_obj):
         field_obj.data_key = camelcase(field_obj.data_key or field_name)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import tempfile
+
+from server.services.git.git_features import get_git_version
+
+
+class RepositoryBootstrapService:
+    """
+    Clone the report repository into REPORT_FILE_DIR when it is not there yet.
+
+    The clone is partial, without the file contents of the history (and
+    optionally shallow), and only the directories set in
+    REPORT_SPARSE_CHECKOUT_DIRS are checked out, so a new instance is ready
+    to serve in seconds however large the report history grows
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.report_file_dir = app.config["REPORT_FILE_DIR"]
+        self.repository_url = app.config["REPORT_REPOSITORY_URL"]
+        self.branch = app.config["REPORT_REPOSITORY_BRANCH"]
+        self.clone_filter = app.config["REPORT_CLONE_FILTER"]
+        self.clone_depth = app.config["REPORT_CLONE_DEPTH"]
+        self.sparse_checkout_dirs = app.config["REPORT_SPARSE_CHECKOUT_DIRS"]
+
+    def is_bootstrapped(self) -> bool:
+        """
+        Check if REPORT_FILE_DIR already holds a clone of the repository. A
+        submodule checkout has a `.git` file instead of a directory
+
+        Returns:
+        bool -- Boolean indicating if the repository is already cloned
+        """
+        return os.path.exists(os.path.join(self.report_file_dir, ".git"))
+
+    def get_clone_options(self) -> dict:
+        """
+        Get the options of the partial clone
+
+        Returns:
+        clone_options -- Dict with the options passed to `git clone`
+        """
+        clone_options = {"no_checkout": True}
+        if self.clone_filter:
+            clone_options["filter"] = self.clone_filter
+        if self.clone_depth:
+            clone_options["depth"] = self.clone_depth
+        if self.branch:
+            clone_options["branch"] = self.branch
+        return clone_options
+
+    def bootstrap(self) -> bool:
+        """
+        Clone the report repository if it is configured and not cloned yet.
+        The clone is made in a temporary directory and moved into place, so
+        workers starting at the same time don't see a partial clone
+
+        Returns:
+        bool -- Boolean indicating if the repository was cloned
+        """
+        if not self.repository_url or self.is_bootstrapped():
+            return False
+
+        import git
+
+        parent_dir = os.path.dirname(self.report_file_dir)
+        os.makedirs(parent_dir, exist_ok=True)
+        clone_dir = tempfile.mkdtemp(prefix=".bootstrap-", dir=parent_dir)
+        try:
+            self.app.logger.info(
+                f"Cloning report repository {self.repository_url}"
+                f" into {self.report_file_dir}"
+            )
+            repo = git.Repo.clone_from(
+                self.repository_url, clone_dir, **self.get_clone_options()
+            )
+            if self.sparse_checkout_dirs and get_git_version() < (2, 34):
+                self.app.logger.warning(
+                    "Sparse checkout needs git 2.34 or later, checking out"
+                    " the whole tree"
+                )
+            elif self.sparse_checkout_dirs:
+                repo.git.sparse_checkout("init", "--cone")
+                repo.git.sparse_checkout("set", *self.sparse_checkout_dirs)
+            repo.git.checkout(self.branch or repo.active_branch.name)
+
+            if os.path.isdir(self.report_file_dir) and not os.listdir(
+                self.report_file_dir
+            ):
+                # Replace the empty mount point or submodule directory
+                os.rmdir(self.report_file_dir)
+            try:
+                os.rename(clone_dir, self.report_file_dir)
+            except OSError:
+                if self.is_bootstrapped():
+                    # Other worker finished its clone first
+                    return False
+                raise
+            return True
+        finally:
+            if os.path.isdir(clone_dir):
+                shutil.rmtree(clone_dir, ignore_errors=True)
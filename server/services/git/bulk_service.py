@@ -0,0 +1,204 @@
+import os
+import sqlite3
+import tempfile
+
+from flask import current_app
+
+import git
+
+from server.services.git.document_cache import document_cache
+from server.services.git.file_service import FileService
+from server.services.git.git_features import get_git_version, get_sparse_options
+from server.services.git.git_service import GitService
+from server.services.git.index_service import ProjectIndexService
+from server.services.git.layout_service import LayoutService
+from server.services.git.push_service import PushService
+from server.services.git.write_lanes import write_lanes
+
+
+class GitBulkService:
+    """
+    Create many documents in a git repository with a single commit and push.
+    The paths of the created files are kept in a pathspec file, so memory
+    doesn't grow with the number of documents, and they are only staged while
+    holding the commit lane, so other reports never commit them. The paths and
+    blob SHAs of the files are kept in a second file, and the project index
+    is updated with them in a single transaction once the commit is pushed
+    """
+
+    # Number of paths staged by each `git add` when git is too old to read
+    # them from the pathspec file
+    stage_batch_size = 500
+
+    def __init__(self):
+        self.yaml_file_dir = "github_files"
+        self.repo = git.Repo(current_app.config["REPORT_FILE_DIR"])
+        self.layout = LayoutService(
+            f'{current_app.config["REPORT_FILE_DIR"]}/{self.yaml_file_dir}'
+        )
+        self.pathspec_file = tempfile.NamedTemporaryFile(
+            "w", prefix="bulk-", suffix=".pathspec", delete=False
+        )
+        self.project_index = ProjectIndexService()
+        self.project_index_file = None
+        if self.project_index.is_enabled():
+            self.project_index_file = tempfile.NamedTemporaryFile(
+                "w", prefix="bulk-", suffix=".index", delete=False
+            )
+        self.created_documents = 0
+
+    def create_document(self, document: dict) -> None:
+        """
+        Write the file of a new document in the local git repository. The
+        file is committed by `commit_documents`
+
+        Keyword arguments:
+        document -- The content of the document being created
+
+        Raises:
+        FileServiceError -- Raised when the project was already reported
+        """
+        git_report = GitService(
+            document["platform"]["name"],
+            document["organisation"]["name"],
+            document["project"]["project_id"],
+            repo=self.repo,
+            layout=self.layout,
+        )
+        with write_lanes.lane(git_report.document_dir):
+            project_file, blob_sha = git_report.write_document(document)
+        self.pathspec_file.write(f"{project_file}\n")
+        if self.project_index_file:
+            self.project_index_file.write(f"{blob_sha} {project_file}\n")
+        self.created_documents += 1
+
+    def commit_documents(self) -> bool:
+        """
+        Commit all created documents in the local git repository and push
+        them to the remote repo
+
+        Returns:
+        bool -- Boolean indicating if any document was committed
+        """
+        try:
+            self.pathspec_file.close()
+            if self.project_index_file:
+                self.project_index_file.close()
+            if not self.created_documents:
+                return False
+            with write_lanes.commit():
+                try:
+                    self.stage_documents()
+                    self.repo.index.commit(f"Add {self.created_documents} projects")
+                except Exception:
+                    # Nothing was committed, so the files can be reported again
+                    self.unstage_documents()
+                    self.abort()
+                    raise
+                PushService(self.repo).push()
+            if self.project_index_file:
+                self.update_index()
+            return True
+        finally:
+            self.close()
+
+    def get_created_files(self):
+        """
+        Read the paths of the created files from the pathspec file
+
+        Returns:
+        created_files -- Generator of lists with up to `stage_batch_size`
+                         paths of created files
+        """
+        with open(self.pathspec_file.name) as f:
+            batch = []
+            for line in f:
+                batch.append(line.rstrip("\n"))
+                if len(batch) >= self.stage_batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+    def stage_documents(self) -> None:
+        """
+        Stage the created files, and the layout file if the repository
+        doesn't record its layout yet. Must be called holding the commit lane
+        """
+        layout_files = self.layout.record_layout()
+        if layout_files:
+            # Listed with the created files, so it is removed on errors too
+            with open(self.pathspec_file.name, "a") as f:
+                f.writelines(f"{layout_file}\n" for layout_file in layout_files)
+        sparse_options = get_sparse_options(self.repo)
+        if get_git_version() >= (2, 26):
+            self.repo.git.add(
+                *sparse_options, f"--pathspec-from-file={self.pathspec_file.name}"
+            )
+            return
+        for created_files in self.get_created_files():
+            self.repo.git.add(*sparse_options, "--", *created_files)
+
+    def unstage_documents(self) -> None:
+        """
+        Remove the created files from the index after a failed commit, so
+        other reports don't commit them. Must be called holding the commit
+        lane. Errors are logged, as the files are removed anyway
+        """
+        try:
+            for created_files in self.get_created_files():
+                self.repo.git.reset("-q", "--", *created_files)
+        except git.GitCommandError as e:
+            current_app.logger.error(f"Error unstaging the documents: {e.stderr}")
+
+    def abort(self) -> None:
+        """
+        Remove the files written for documents that won't be committed,
+        e.g. when the upload is interrupted, so they can be reported again
+        """
+        self.pathspec_file.close()
+        if os.path.exists(self.pathspec_file.name):
+            with open(self.pathspec_file.name) as f:
+                for line in f:
+                    project_file = line.rstrip("\n")
+                    with write_lanes.worktree():
+                        FileService.remove_file(
+                            project_file,
+                            f'{current_app.config["REPORT_FILE_DIR"]}/'
+                            f"{self.yaml_file_dir}",
+                        )
+                    document_cache.remove(project_file)
+        self.created_documents = 0
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove the temporary files of the created documents
+        """
+        for temp_file in [self.pathspec_file, self.project_index_file]:
+            if temp_file is None:
+                continue
+            temp_file.close()
+            if os.path.exists(temp_file.name):
+                os.remove(temp_file.name)
+
+    def update_index(self) -> None:
+        """
+        Add the pushed documents to the project index in a single
+        transaction. The index can be rebuilt from the repository, so
+        errors are logged instead of raised
+        """
+        try:
+            with self.project_index.transaction() as connection, open(
+                self.project_index_file.name
+            ) as f:
+                batch = []
+                for line in f:
+                    blob_sha, project_file = line.rstrip("\n").split(" ", 1)
+                    batch.append((project_file, blob_sha))
+                    if len(batch) >= 1000:
+                        self.project_index.update_projects(batch, connection)
+                        batch = []
+                self.project_index.update_projects(batch, connection)
+        except sqlite3.Error as e:
+            current_app.logger.error(f"Error updating the project index: {str(e)}")
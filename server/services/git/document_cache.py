@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from server.services.git.file_service import FileService
+
+
+class DocumentCache:
+    """
+    LRU cache of deserialised project documents keyed by the git blob SHA of
+    their YAML file.
+
+    The blob SHA of each file is remembered together with its stat signature,
+    like git does in its index, so an unchanged file is found in the cache
+    without being read or parsed again. As in git, the signature of a file
+    modified in the last `racy_margin_ns` is not remembered, because a later
+    write within the timestamp granularity of the file system may leave it
+    unchanged. Those files are read and found in the cache by their content.
+    """
+
+    racy_margin_ns = 2 * 10**9
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.documents = OrderedDict()
+        self.blob_shas = OrderedDict()
+        self.lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """
+        Configure the cache limits from the application config
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        with self.lock:
+            self.max_entries = app.config["GIT_DOCUMENT_CACHE_MAX_ENTRIES"]
+            self.max_bytes = app.config["GIT_DOCUMENT_CACHE_MAX_BYTES"]
+            self.evict()
+
+    @staticmethod
+    def get_stat_signature(file_path: str) -> tuple:
+        """
+        Get the stat signature of a file, or None if it doesn't exist
+
+        Keyword arguments:
+        file_path -- The path of the file
+
+        Returns:
+        stat_signature -- Tuple with the inode, size and modification time
+        """
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        return file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns
+
+    def is_racy(self, stat_signature: tuple) -> bool:
+        """
+        Check if a stat signature is too recent to tell later writes apart
+
+        Keyword arguments:
+        stat_signature -- Tuple with the inode, size and modification time
+
+        Returns:
+        bool -- Boolean indicating if the file was modified too recently
+        """
+        return stat_signature[2] > time.time_ns() - self.racy_margin_ns
+
+    def get(self, file_path: str) -> dict:
+        """
+        Get the cached document of a file, if the file didn't change
+        since it was cached
+
+        Keyword arguments:
+        file_path -- The path of the file
+
+        Returns:
+        document -- The cached document, or None in case of a cache miss
+        """
+        entry = self.get_entry(file_path)
+        return entry[0] if entry else None
+
+    def get_entry(self, file_path: str) -> tuple:
+        """
+        Get the cached document of a file and the git blob SHA of the file,
+        if the file didn't change since it was cached
+
+        Keyword arguments:
+        file_path -- The path of the file
+
+        Returns:
+        entry -- Tuple with the cached document and the blob SHA, or None
+                 in case of a cache miss
+        """
+        stat_signature = self.get_stat_signature(file_path)
+        with self.lock:
+            cached_blob_sha = self.blob_shas.get(file_path)
+            if (
+                stat_signature is not None
+                and cached_blob_sha is not None
+                and cached_blob_sha[0] == stat_signature
+                and cached_blob_sha[1] in self.documents
+            ):
+                self.blob_shas.move_to_end(file_path)
+                self.documents.move_to_end(cached_blob_sha[1])
+                self.hits += 1
+                return self.documents[cached_blob_sha[1]][0], cached_blob_sha[1]
+            self.misses += 1
+            return None
+
+    def get_by_content(self, file_path: str, file_content: str) -> dict:
+        """
+        Get the cached document of a file already read from disk. The
+        document is found when other file had the same content
+
+        Keyword arguments:
+        file_path -- The path of the file
+        file_content -- The content of the file
+
+        Returns:
+        document -- The cached document, or None in case of a cache miss
+        """
+        blob_sha = FileService.get_blob_sha(file_content)
+        stat_signature = self.get_stat_signature(file_path)
+        with self.lock:
+            if blob_sha not in self.documents:
+                return None
+            if stat_signature is not None and not self.is_racy(stat_signature):
+                self.blob_shas[file_path] = (stat_signature, blob_sha)
+                self.blob_shas.move_to_end(file_path)
+            else:
+                self.blob_shas.pop(file_path, None)
+            self.documents.move_to_end(blob_sha)
+            return self.documents[blob_sha][0]
+
+    def set(self, file_path: str, file_content: str, document: dict) -> None:
+        """
+        Cache the document of a file written on disk. Cached documents
+        must not be modified
+
+        Keyword arguments:
+        file_path -- The path of the file
+        file_content -- The content of the file, as written on disk
+        document -- The deserialised document
+        """
+        stat_signature = self.get_stat_signature(file_path)
+        if stat_signature is None:
+            return
+        document_size = len(file_content.encode("utf-8"))
+        if document_size > self.max_bytes:
+            return
+
+        blob_sha = FileService.get_blob_sha(file_content)
+        with self.lock:
+            if self.is_racy(stat_signature):
+                self.blob_shas.pop(file_path, None)
+            else:
+                self.blob_shas[file_path] = (stat_signature, blob_sha)
+                self.blob_shas.move_to_end(file_path)
+            if blob_sha in self.documents:
+                self.documents.move_to_end(blob_sha)
+            else:
+                self.documents[blob_sha] = (document, document_size)
+                self.size += document_size
+            self.evict()
+
+    def remove(self, file_path: str) -> None:
+        """
+        Forget the blob SHA of a file, so its document is read again
+
+        Keyword arguments:
+        file_path -- The path of the file
+        """
+        with self.lock:
+            self.blob_shas.pop(file_path, None)
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used documents until the cache
+        is within its limits. Must be called holding the lock
+        """
+        while self.documents and (
+            len(self.documents) > self.max_entries or self.size > self.max_bytes
+        ):
+            _, (_, document_size) = self.documents.popitem(last=False)
+            self.size -= document_size
+        while len(self.blob_shas) > self.max_entries:
+            self.blob_shas.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all documents from the cache
+        """
+        with self.lock:
+            self.documents.clear()
+            self.blob_shas.clear()
+            self.size = 0
+
+
+document_cache = DocumentCache()
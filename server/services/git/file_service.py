@@ -1,9 +1,11 @@
+import hashlib
 import os
 import re
+import uuid
 
 from flask import current_app
 
-import yaml
+from server.services.git.yaml_codec import YamlCodec
 
 
 class FileServiceError(Exception):
@@ -17,10 +19,34 @@ class FileServiceError(Exception):
 
 
 class FileService:
+    @staticmethod
+    def write_temp_file(file_content: str, file_dir: str, filename: str) -> str:
+        """
+        Write the content of a file into a new hidden file next to it, so it
+        can be put in place at once and readers never see a partial file
+
+        Keyword arguments:
+        file_content -- The contents of the file
+        file_dir -- The directory of the file
+        filename -- The name of the file
+
+        Returns:
+        temp_file -- The path of the written file
+        """
+        temp_file = f"{file_dir}/.{filename}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_file, "x") as f:
+                f.write(file_content)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        return temp_file
+
     @staticmethod
     def create_file(file_content: str, file_dir: str, filename: str) -> None:
         """
-        Create a file
+        Create a file. The file appears with its whole content at once
 
         Keyword arguments:
         file_content -- The contents of the updated file
@@ -30,22 +56,24 @@ class FileService:
         Raises:
         ValueError -- Raised when the file already exists
         """
+        os.makedirs(file_dir, exist_ok=True)
+        temp_file = FileService.write_temp_file(file_content, file_dir, filename)
         try:
-            if not os.path.exists(file_dir):
-                os.makedirs(file_dir)
-            f = open(f"{file_dir}/{filename}", "x")
-            f.write(file_content)
-            f.close()
+            # Unlike a rename, a link fails when the file already exists
+            os.link(temp_file, f"{file_dir}/{filename}")
         except FileExistsError:
             project_id = re.search(r"\d+", filename).group(0)
             raise FileServiceError(
                 f"Unable to report project {project_id}. Project already reported"
             )
+        finally:
+            os.remove(temp_file)
 
     @staticmethod
     def update_file(file_content: str, file_dir: str, filename: str) -> None:
         """
-        Update an existing file
+        Update an existing file. The content is replaced at once, so readers
+        get either the previous or the updated content
 
         Keyword arguments:
         file_content -- The contents of the updated file
@@ -56,14 +84,34 @@ class FileService:
         ValueError -- Raised when the file doesn't exists
         """
         try:
-            f = open(f"{file_dir}/{filename}", "w+")
-            f.write(file_content)
-            f.close()
+            temp_file = FileService.write_temp_file(file_content, file_dir, filename)
         except FileNotFoundError:
             project_id = re.search(r"\d+", filename).group(0)
             raise FileServiceError(
                 f"Unable to update project {project_id}. Project not previously reported to git"
             )
+        os.replace(temp_file, f"{file_dir}/{filename}")
+
+    @staticmethod
+    def remove_file(file_path: str, root_dir: str) -> None:
+        """
+        Remove a file, if it exists, and the directories left empty
+        between the file and a root directory
+
+        Keyword arguments:
+        file_path -- The path of the file
+        root_dir -- The directory that is never removed
+        """
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        file_dir = os.path.dirname(os.path.abspath(file_path))
+        root_dir = os.path.abspath(root_dir)
+        while file_dir.startswith(f"{root_dir}{os.sep}"):
+            try:
+                os.rmdir(file_dir)
+            except OSError:
+                break
+            file_dir = os.path.dirname(file_dir)
 
     @staticmethod
     def get_content(file_dir):
@@ -89,6 +137,22 @@ class FileService:
             project_id = re.search(r"\d+", filename).group(0)
             raise FileServiceError(f"Unable to get content from project {project_id}")
 
+    @staticmethod
+    def get_blob_sha(file_content: str) -> str:
+        """
+        Get the git blob SHA of a file content, the same returned
+        by `git hash-object`
+
+        Keyword arguments:
+        file_content -- The content of the file
+
+        Returns:
+        blob_sha -- The hexadecimal blob SHA
+        """
+        file_bytes = file_content.encode("utf-8")
+        blob = b"blob %d\0" % len(file_bytes) + file_bytes
+        return hashlib.sha1(blob).hexdigest()
+
     @staticmethod
     def dict_to_yaml(yaml_dict: dict) -> str:
         """
@@ -100,7 +164,7 @@ class FileService:
         Returns:
         yaml_str -- The string representation of a YAML
         """
-        yaml_str = yaml.dump(yaml_dict, allow_unicode=True)
+        yaml_str = YamlCodec.encode(yaml_dict)
         return yaml_str
 
     @staticmethod
@@ -114,5 +178,5 @@ class FileService:
         Returns:
         yaml_dict -- The dictionary representation of a YAML
         """
-        yaml_dict = yaml.load(yaml_str, Loader=yaml.FullLoader)
+        yaml_dict = YamlCodec.decode(yaml_str)
         return yaml_dict
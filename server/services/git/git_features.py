@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_git_version() -> tuple:
+    """
+    Get the version of the installed git executable. Some options used by the
+    services need a recent git, and older versions fall back to other ones
+
+    Returns:
+    version -- Tuple with the major, minor and patch numbers of the version
+    """
+    import git
+
+    return git.Git().version_info[:3]
+
+
+def get_sparse_options(repo) -> list:
+    """
+    Get the options staging files outside the sparse checkout of the
+    repository, which git refuses to stage otherwise. They need git 2.34
+
+    Keyword arguments:
+    repo -- The report repository
+
+    Returns:
+    options -- List with `--sparse` when the repository has a sparse
+               checkout, empty otherwise
+    """
+    # `git sparse-checkout init` may set it in the worktree config file
+    sparse_checkout = repo.git.config(
+        "--bool", "--default", "false", "--get", "core.sparseCheckout"
+    )
+    return ["--sparse"] if sparse_checkout == "true" else []
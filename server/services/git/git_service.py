@@ -1,28 +1,45 @@
+import os
 from os import listdir
-from os.path import isfile, join
+from os.path import isdir, isfile, join
 import shutil
+import sqlite3
 
 from flask import current_app
 
 import git
 
-from server.services.git.file_service import FileService
+from server.services.git.document_cache import document_cache
+from server.services.git.file_service import FileService, FileServiceError
+from server.services.git.git_features import get_sparse_options
+from server.services.git.index_service import ProjectIndexService
+from server.services.git.layout_service import LayoutService
+from server.services.git.push_service import PushService
+from server.services.git.write_lanes import write_lanes
+from server.services.metrics_service import metrics
+from server.services.utils import update_document as merge_document
 from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
 
 
 class GitService:
-    def __init__(self, platfotm_name, organisation_name, project_id):
+    def __init__(
+        self, platfotm_name, organisation_name, project_id, repo=None, layout=None
+    ):
         self.yaml_file_dir = "github_files"
         self.platform_name = platfotm_name.replace(" ", "_")
         self.organisation_name = organisation_name.replace(" ", "_")
         self.project_id = project_id
-        self.repo = git.Repo(current_app.config["REPORT_FILE_DIR"])
+        self.repo = repo or git.Repo(current_app.config["REPORT_FILE_DIR"])
         self.document_dir = (
             f'{current_app.config["REPORT_FILE_DIR"]}/'
             f"{self.yaml_file_dir}/"
             f"{self.platform_name}/"
             f"{self.organisation_name}"
         )
+        self.layout = layout or LayoutService(
+            f'{current_app.config["REPORT_FILE_DIR"]}/{self.yaml_file_dir}'
+        )
+        self.project_dir = self.layout.get_project_dir(self.document_dir, project_id)
 
     def commit_file(self, commit_message: str) -> None:
         """
@@ -32,59 +49,182 @@ class GitService:
         Keyword arguments:
         commit_message -- The message of the commit
         """
-        self.repo.index.commit(commit_message)
-        origin = self.repo.remote(name="origin")
-        origin.push()
+        with metrics.time_stage("git_commit"):
+            self.repo.index.commit(commit_message)
+        PushService(self.repo).push()
 
-    def create_document(self, document: dict) -> None:
+    def write_document(self, document: dict) -> tuple:
         """
-        Create a new file in a git repository
+        Write the file of a new document in the local git repository,
+        without staging it
 
         Keyword arguments:
-        document -- The string of the yaml file being created
+        document -- The content of the document being created
+
+        Returns:
+        project_file -- The path of the created file
+        blob_sha -- The git blob SHA of the created file
         """
         # Parse dict to yaml and write it to the local repo
-        yaml_file = FileService.dict_to_yaml(DocumentSchema().dump(obj=document))
+        with metrics.time_stage("git_yaml"):
+            yaml_file = FileService.dict_to_yaml(document.to_json())
         filename = "project_" + str(self.project_id) + ".yaml"
-        FileService.create_file(yaml_file, self.document_dir, filename)
+        with write_lanes.worktree():
+            FileService.create_file(yaml_file, self.project_dir, filename)
+        document_cache.set(f"{self.project_dir}/{filename}", yaml_file, document)
+        return f"{self.project_dir}/{filename}", FileService.get_blob_sha(yaml_file)
 
-        # push the file  to the remote repo
-        self.repo.git.add([f"{self.document_dir}/{filename}"])
-        commit_message = f"Add project {str(self.project_id)}"
-        self.commit_file(commit_message)
+    def create_document(self, document: dict) -> None:
+        """
+        Create a new file in a git repository
 
-    def update_document(self, update_document: dict) -> dict:
+        Keyword arguments:
+        document -- The string of the yaml file being created
+        """
+        with write_lanes.lane(self.document_dir):
+            try:
+                project_file, blob_sha = self.write_document(document)
+            except FileServiceError:
+                if self.is_document_committed(document):
+                    # Reported by an earlier attempt of the same report
+                    current_app.logger.info(
+                        f"Project {str(self.project_id)} already committed"
+                    )
+                    return
+                raise
+
+            # push the file  to the remote repo
+            with write_lanes.commit():
+                self.repo.git.add(
+                    *get_sparse_options(self.repo),
+                    [project_file, *self.layout.record_layout()],
+                )
+                commit_message = f"Add project {str(self.project_id)}"
+                self.commit_file(commit_message)
+            self.update_index(project_file, blob_sha)
+
+    def is_document_committed(self, document: dict) -> bool:
         """
-        Update a document in a git repository
+        Check if the file of a document is committed with the same content
 
         Keyword arguments:
-        update_document -- The content of document being updated
+        document -- The content of the document being created
+
+        Returns:
+        bool -- Boolean indicating if the file is committed with the content
+                of the document
         """
-        # Write changes of the file in the local repo
         filename = "project_" + str(self.project_id) + ".yaml"
-        yaml_file = FileService.get_content(f"{self.document_dir}/{filename}")
-        update_yaml_file = self.update_yaml_file(update_document, yaml_file)
-        FileService.update_file(update_yaml_file, self.document_dir, filename)
+        path = os.path.relpath(
+            f"{self.project_dir}/{filename}", current_app.config["REPORT_FILE_DIR"]
+        )
+        try:
+            committed_blob_sha = self.repo.head.commit.tree[path].hexsha
+        except KeyError:
+            return False
+        return committed_blob_sha == FileService.get_blob_sha(
+            FileService.dict_to_yaml(document.to_json())
+        )
+
+    def update_document(self, update_document: dict) -> list:
+        """
+        Update a document in a git repository. Nothing is written or
+        committed if no field of the document changes
 
+        Keyword arguments:
+        update_document -- The fields of the document being updated,
+                           already deserialised by DocumentSchema
+
+        Returns:
+        changed_fields -- List with the dotted paths of the changed fields
+        """
         # if the platform/org name is updated it's necessary change
         # the directory structure of the repository
         if self.is_platform_or_org_name_being_updated(update_document):
-            # Update the directory structure of the repo
             update_dir = self.get_platform_and_org_name_updated_dir(update_document)
-            document_dir_files, update_document_dir_files = self.get_staged_files(
-                update_dir
+            organisation_dirs = [self.document_dir, update_dir]
+        else:
+            update_dir = None
+            organisation_dirs = [self.document_dir]
+
+        with write_lanes.lane(*organisation_dirs):
+            # Write changes of the file in the local repo
+            filename = "project_" + str(self.project_id) + ".yaml"
+            current_document = self.get_document(f"{self.project_dir}/{filename}")
+            updated_document, changed_fields = merge_document(
+                current_document, update_document
+            )
+            if not changed_fields:
+                current_app.logger.info(
+                    f"Project {str(self.project_id)} not updated: no field changed"
+                )
+                return changed_fields
+            update_yaml_file = FileService.dict_to_yaml(updated_document.to_json())
+            with write_lanes.worktree():
+                FileService.update_file(update_yaml_file, self.project_dir, filename)
+            document_cache.set(
+                f"{self.project_dir}/{filename}", update_yaml_file, updated_document
             )
-            shutil.move(self.document_dir, update_dir)
 
-            # Stage files
-            self.repo.git.add(update_document_dir_files)
-            self.repo.git.rm(document_dir_files)
-        else:
-            self.repo.git.add([f"{self.document_dir}/{filename}"])
+            if update_dir:
+                # Update the directory structure of the repo
+                document_dir_files, update_document_dir_files = self.get_staged_files(
+                    update_dir
+                )
+                with write_lanes.worktree():
+                    shutil.move(self.document_dir, update_dir)
+
+            with write_lanes.commit():
+                # Stage files
+                sparse_options = get_sparse_options(self.repo)
+                layout_files = self.layout.record_layout()
+                if update_dir:
+                    self.repo.git.add(
+                        *sparse_options, [*update_document_dir_files, *layout_files]
+                    )
+                    self.repo.git.rm(*sparse_options, document_dir_files)
+                else:
+                    self.repo.git.add(
+                        *sparse_options,
+                        [f"{self.project_dir}/{filename}", *layout_files],
+                    )
+
+                # push changes to the remote repo
+                commit_message = f"Update project {str(self.project_id)}"
+                self.commit_file(commit_message)
+
+            project_dir = (
+                self.layout.get_project_dir(update_dir, self.project_id)
+                if update_dir
+                else self.project_dir
+            )
+            self.update_index(
+                f"{project_dir}/{filename}",
+                FileService.get_blob_sha(update_yaml_file),
+                update_dir,
+            )
+        return changed_fields
 
-        # push changes to the remote repo
-        commit_message = f"Update project {str(self.project_id)}"
-        self.commit_file(commit_message)
+    def update_index(
+        self, project_file: str, blob_sha: str, update_dir: str = None
+    ) -> None:
+        """
+        Update the project index after a commit. The index can be rebuilt
+        from the repository, so errors are logged instead of raised
+
+        Keyword arguments:
+        project_file -- The path of the committed project file
+        blob_sha -- The git blob SHA of the committed project file
+        update_dir -- The updated directory of the organisation, if
+                      the organisation directory was moved
+        """
+        try:
+            project_index = ProjectIndexService()
+            if update_dir:
+                project_index.move_projects(self.document_dir, update_dir)
+            project_index.update_projects([(project_file, blob_sha)])
+        except sqlite3.Error as e:
+            current_app.logger.error(f"Error updating the project index: {str(e)}")
 
     def is_platform_or_org_name_being_updated(self, update_document: dict) -> bool:
         """
@@ -119,17 +259,32 @@ class GitService:
         tuple -- Tuple with two lists containing all files that need
                  to be staged
         """
-        document_dir_files = [
-            f"{self.document_dir}/{dir_file}"
-            for dir_file in listdir(f"{self.document_dir}/")
-            if isfile(join(f"{self.document_dir}/", dir_file))
-        ]
+        document_dir_files = self.list_dir_files(self.document_dir)
         update_document_dir_files = [
             dir_file.replace(f"{self.document_dir}", f"{update_dir}")
             for dir_file in document_dir_files
         ]
         return document_dir_files, update_document_dir_files
 
+    def list_dir_files(self, directory: str) -> list:
+        """
+        List all files in a directory, including the ones stored
+        in the fan-out subdirectories of the hashed layout
+
+        Keyword arguments:
+        directory -- The directory being listed
+
+        Returns:
+        dir_files -- List with the path of all files in the directory
+        """
+        dir_files = []
+        for dir_entry in listdir(f"{directory}/"):
+            if isfile(join(f"{directory}/", dir_entry)):
+                dir_files.append(f"{directory}/{dir_entry}")
+            elif isdir(join(f"{directory}/", dir_entry)):
+                dir_files.extend(self.list_dir_files(f"{directory}/{dir_entry}"))
+        return dir_files
+
     def get_platform_and_org_name_updated_dir(self, update_document: dict) -> str:
         """
         Generate updated directory with updated organisation / platform names
@@ -185,39 +340,61 @@ class GitService:
             )
         return update_dir
 
-    def update_yaml_file(self, update_document: dict, yaml_str: str) -> str:
+    def get_document(self, file_path: str) -> dict:
         """
-        Generate the request data for update a file in a git repository
+        Get the deserialised document of a project file. Documents of files
+        that didn't change since the last request are served from the cache
 
         Keyword arguments:
-        update_document -- The content of document being updated
-        yaml_str -- The string of the yaml present in the git repository that
-                    is being updated
+        file_path -- The path of the project file
 
         Returns:
-        update_yaml_file -- The request data for update a file
-                         in a github repository
+        document -- The deserialised document. It must not be modified
+                    because it may be shared with the cache
         """
-        update_yaml_dict = DocumentSchema(partial=True).load(
-            data=FileService.yaml_to_dict(yaml_str)
-        )
-        update_fields = DocumentSchema(partial=True).load(data=update_document)
-
-        # Update yaml dictionary with new values
-        for key in update_fields.keys():
-            for nested_key, value in update_fields[key].items():
-                if isinstance(update_fields[key][nested_key], list):
-                    update_yaml_dict[key][nested_key] = list(value)
-                elif isinstance(update_fields[key][nested_key], dict):
-                    for nested_dict_key in update_fields[key][nested_key]:
-                        update_yaml_dict[key][nested_key][
-                            nested_dict_key
-                        ] = update_fields[key][nested_key][nested_dict_key]
-                else:
-                    update_yaml_dict[key][nested_key] = value
+        return self.get_document_entry(file_path)[0]
 
-        # Parse the updated yaml dictionary into yaml
-        update_yaml_file = FileService.dict_to_yaml(
-            DocumentSchema().dump(obj=update_yaml_dict)
-        )
-        return update_yaml_file
+    def get_document_entry(self, file_path: str) -> tuple:
+        """
+        Get the deserialised document of a project file and the git blob SHA
+        of the file. Documents of files that didn't change since the last
+        request are served from the cache
+
+        Keyword arguments:
+        file_path -- The path of the project file
+
+        Raises:
+        FileServiceError -- Raised when the project file doesn't exist
+
+        Returns:
+        document -- The deserialised document. It must not be modified
+                    because it may be shared with the cache
+        blob_sha -- The git blob SHA of the project file
+        """
+        entry = document_cache.get_entry(file_path)
+        if entry is not None:
+            return entry
+
+        yaml_str = FileService.get_content(file_path)
+        document = document_cache.get_by_content(file_path, yaml_str)
+        if document is None:
+            document = schema_registry.get(DocumentSchema, partial=True).load(
+                data=FileService.yaml_to_dict(yaml_str)
+            )
+            document_cache.set(file_path, yaml_str, document)
+        return document, FileService.get_blob_sha(yaml_str)
+
+    def read_document(self) -> tuple:
+        """
+        Get the document of the project and the git blob SHA of its file
+
+        Raises:
+        FileServiceError -- Raised when the project was not reported
+
+        Returns:
+        document -- The deserialised document. It must not be modified
+                    because it may be shared with the cache
+        blob_sha -- The git blob SHA of the project file
+        """
+        filename = "project_" + str(self.project_id) + ".yaml"
+        return self.get_document_entry(f"{self.project_dir}/{filename}")
@@ -0,0 +1,257 @@
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from flask import current_app
+
+
+class ProjectIndexService:
+    """
+    Persistent index of the projects stored in the report repository. It maps
+    each project id to the path of its file, its organisation, its platform and
+    the git blob SHA of the file, so projects can be found and listed without
+    walking the repository tree.
+
+    The index is stored in the SQLite file set in REPORT_INDEX_FILE, and it is
+    disabled when the variable is not set.
+    """
+
+    project_file_pattern = re.compile(
+        r"^github_files/([^/]+)/([^/]+)/(?:[^/]+/)?project_(\d+)\.yaml$"
+    )
+
+    def __init__(self, index_file: str = None):
+        self.index_file = index_file or current_app.config["REPORT_INDEX_FILE"]
+        self.report_file_dir = current_app.config["REPORT_FILE_DIR"]
+
+    def is_enabled(self) -> bool:
+        """
+        Check if the project index is configured
+
+        Returns:
+        bool -- Boolean indicating if the project index is configured
+        """
+        return bool(self.index_file)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the index, creating it if it doesn't exist
+
+        Returns:
+        connection -- The connection to the SQLite index
+        """
+        connection = sqlite3.connect(self.index_file, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS project ("
+            " project_id INTEGER PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " platform TEXT NOT NULL,"
+            " organisation TEXT NOT NULL,"
+            " blob_sha TEXT NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS project_organisation"
+            " ON project (platform, organisation)"
+        )
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Open a connection to the index with a transaction that is committed
+        when the context exits without errors and rolled back otherwise
+
+        Returns:
+        connection -- The connection to the SQLite index
+        """
+        connection = self.connect()
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get_project_row(self, project_file: str, blob_sha: str) -> tuple:
+        """
+        Generate the index row of a project file
+
+        Keyword arguments:
+        project_file -- The path of the project file
+        blob_sha -- The git blob SHA of the project file
+
+        Returns:
+        row -- Tuple with the project id, the path relative to the repository,
+               the platform, the organisation and the blob SHA. None if the
+               file is not a project file
+        """
+        path = os.path.relpath(project_file, self.report_file_dir).replace(os.sep, "/")
+        project_file_match = self.project_file_pattern.match(path)
+        if not project_file_match:
+            return None
+        platform, organisation, project_id = project_file_match.groups()
+        return int(project_id), path, platform, organisation, blob_sha
+
+    def update_projects(self, project_files: list, connection=None) -> None:
+        """
+        Add or update projects in the index
+
+        Keyword arguments:
+        project_files -- List of tuples with the path and the blob SHA
+                         of each project file
+        connection -- Connection with an open transaction. If not set, the
+                      changes are committed in a new connection
+        """
+        if not self.is_enabled():
+            return
+        rows = [
+            row
+            for row in (
+                self.get_project_row(project_file, blob_sha)
+                for project_file, blob_sha in project_files
+            )
+            if row
+        ]
+        if connection is not None:
+            connection.executemany(
+                "INSERT OR REPLACE INTO project VALUES (?, ?, ?, ?, ?)", rows
+            )
+            return
+        with self.transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO project VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def remove_projects(self, project_files: list) -> None:
+        """
+        Remove projects from the index
+
+        Keyword arguments:
+        project_files -- List with the path of each removed project file
+        """
+        if not self.is_enabled() or not project_files:
+            return
+        with self.transaction() as connection:
+            connection.executemany(
+                "DELETE FROM project WHERE path = ?",
+                [
+                    (
+                        os.path.relpath(project_file, self.report_file_dir).replace(
+                            os.sep, "/"
+                        ),
+                    )
+                    for project_file in project_files
+                ],
+            )
+
+    def move_projects(self, current_dir: str, update_dir: str) -> None:
+        """
+        Update the index after an organisation directory is moved
+
+        Keyword arguments:
+        current_dir -- The directory before the move
+        update_dir -- The directory after the move
+        """
+        if not self.is_enabled():
+            return
+        current_path = os.path.relpath(current_dir, self.report_file_dir)
+        update_path = os.path.relpath(update_dir, self.report_file_dir)
+        _, platform, organisation = update_path.split("/")[:3]
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE project SET"
+                " path = ? || substr(path, ?),"
+                " platform = ?,"
+                " organisation = ?"
+                " WHERE substr(path, 1, ?) = ?",
+                (
+                    update_path,
+                    len(current_path) + 1,
+                    platform,
+                    organisation,
+                    len(current_path) + 1,
+                    f"{current_path}/",
+                ),
+            )
+
+    def get_project(self, project_id: int) -> dict:
+        """
+        Get a project from the index
+
+        Keyword arguments:
+        project_id -- The id of the project
+
+        Returns:
+        project -- Dict with the indexed project data, or None if the
+                   project is not indexed
+        """
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT * FROM project WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_projects(
+        self,
+        platform: str = None,
+        organisation: str = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list:
+        """
+        List the indexed projects ordered by project id
+
+        Keyword arguments:
+        platform -- Only list projects of this platform directory
+        organisation -- Only list projects of this organisation directory
+        limit -- The maximum number of projects listed
+        offset -- The number of projects skipped
+
+        Returns:
+        projects -- List with the indexed data of each project
+        """
+        conditions = []
+        parameters = []
+        if platform:
+            conditions.append("platform = ?")
+            parameters.append(platform.replace(" ", "_"))
+        if organisation:
+            conditions.append("organisation = ?")
+            parameters.append(organisation.replace(" ", "_"))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.transaction() as connection:
+            rows = connection.execute(
+                f"SELECT * FROM project{where}"
+                " ORDER BY project_id LIMIT ? OFFSET ?",
+                (*parameters, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def rebuild(self, repo) -> int:
+        """
+        Rebuild the index from the tree of the current commit
+
+        Keyword arguments:
+        repo -- The report repository
+
+        Returns:
+        indexed_projects -- The number of indexed projects
+        """
+        indexed_projects = 0
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM project")
+            batch = []
+            for item in repo.head.commit.tree.traverse():
+                if item.type != "blob":
+                    continue
+                batch.append((f"{self.report_file_dir}/{item.path}", item.hexsha))
+                if len(batch) >= 1000:
+                    self.update_projects(batch, connection)
+                    batch = []
+            self.update_projects(batch, connection)
+            indexed_projects = connection.execute(
+                "SELECT COUNT(*) FROM project"
+            ).fetchone()[0]
+        return indexed_projects
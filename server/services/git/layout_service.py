@@ -0,0 +1,207 @@
+import hashlib
+import os
+import re
+
+from flask import current_app
+
+from server.services.git.file_service import FileService
+from server.services.git.git_features import get_sparse_options
+
+
+class LayoutService:
+    """
+    Resolve where project files are stored inside the report repository.
+
+    The "flat" layout stores every project of an organisation in the same
+    directory, `github_files/<platform>/<organisation>/project_<id>.yaml`.
+    The "hashed" layout adds a fan-out directory derived from the project id,
+    `github_files/<platform>/<organisation>/<hash>/project_<id>.yaml`, so that
+    no directory grows past a few hundred entries.
+    """
+
+    layouts = ["flat", "hashed"]
+    layout_filename = "layout.yaml"
+    project_file_pattern = re.compile(r"^project_(\d+)\.yaml$")
+
+    def __init__(self, yaml_files_dir: str):
+        self.yaml_files_dir = yaml_files_dir
+        self.layout_file = f"{yaml_files_dir}/{self.layout_filename}"
+
+        recorded_layout = self.get_recorded_layout()
+        if recorded_layout:
+            self.name = recorded_layout["layout"]
+            self.fan_out = int(recorded_layout.get("fan_out", 0))
+        else:
+            self.name = current_app.config["REPORT_FILE_LAYOUT"]
+            self.fan_out = int(current_app.config["REPORT_FILE_FAN_OUT"])
+        self.validate_layout(self.name, self.fan_out)
+
+    @classmethod
+    def validate_layout(cls, name: str, fan_out: int) -> None:
+        """
+        Check if a layout can be used to store project files
+
+        Keyword arguments:
+        name -- The name of the layout
+        fan_out -- Number of hexadecimal characters used in the name
+                   of the fan-out directories
+
+        Raises:
+        ValueError -- Raised when the layout is unknown or the fan-out is invalid
+        """
+        if name not in cls.layouts:
+            raise ValueError(
+                f"Invalid report file layout '{name}'."
+                f" Available layouts: {', '.join(cls.layouts)}"
+            )
+        if name == "hashed" and not 1 <= fan_out <= 4:
+            raise ValueError(
+                f"Invalid report file fan-out '{fan_out}'. Must be between 1 and 4"
+            )
+
+    def get_recorded_layout(self) -> dict:
+        """
+        Get the layout recorded in the report repository
+
+        Returns:
+        layout -- Dict with the recorded layout, or None if the
+                  repository doesn't record one
+        """
+        if not os.path.isfile(self.layout_file):
+            return None
+        return FileService.yaml_to_dict(FileService.get_content(self.layout_file))
+
+    def get_fan_out_dir(self, project_id: int) -> str:
+        """
+        Get the name of the fan-out directory of a project
+
+        Keyword arguments:
+        project_id -- The id of the project
+
+        Returns:
+        fan_out_dir -- The fan-out directory name, or an empty string
+                       for the flat layout
+        """
+        if self.name == "flat":
+            return ""
+        project_hash = hashlib.sha1(str(project_id).encode("utf-8")).hexdigest()
+        return project_hash[: self.fan_out]
+
+    def get_project_dir(self, organisation_dir: str, project_id: int) -> str:
+        """
+        Get the directory where a project file is stored
+
+        Keyword arguments:
+        organisation_dir -- The directory of the project organisation
+        project_id -- The id of the project
+
+        Returns:
+        project_dir -- The directory of the project file
+        """
+        fan_out_dir = self.get_fan_out_dir(project_id)
+        if fan_out_dir:
+            return f"{organisation_dir}/{fan_out_dir}"
+        return organisation_dir
+
+    def get_layout_file_content(self) -> str:
+        """
+        Generate the YAML content that records the layout in the repository
+
+        Returns:
+        yaml_str -- The string representation of the layout
+        """
+        layout = {"layout": self.name}
+        if self.name == "hashed":
+            layout["fan_out"] = self.fan_out
+        return FileService.dict_to_yaml(layout)
+
+    def record_layout(self) -> list:
+        """
+        Record a hashed layout in the repository if it doesn't record one
+        yet, so the project files are still found if the configuration
+        changes. Repositories without a layout file are flat by default, so
+        the flat layout isn't recorded. Must be called holding the commit lane
+
+        Returns:
+        layout_files -- List with the path of the layout file if it was
+                        written, to be staged with the next commit
+        """
+        if self.name == "flat" or os.path.isfile(self.layout_file):
+            return []
+        FileService.create_file(
+            self.get_layout_file_content(), self.yaml_files_dir, self.layout_filename
+        )
+        return [self.layout_file]
+
+    def get_project_files(self) -> list:
+        """
+        Get every project file stored in the report repository
+
+        Returns:
+        project_files -- List of tuples with the organisation directory,
+                         the project id and the current path of each file
+        """
+        project_files = []
+        for root, _, filenames in os.walk(self.yaml_files_dir):
+            relative_root = os.path.relpath(root, self.yaml_files_dir).split(os.sep)
+            # Project files are at least two levels deep: <platform>/<organisation>
+            if len(relative_root) < 2 or relative_root[0] == ".":
+                continue
+            organisation_dir = (
+                f"{self.yaml_files_dir}/{relative_root[0]}/{relative_root[1]}"
+            )
+            for filename in filenames:
+                project_file = self.project_file_pattern.match(filename)
+                if project_file:
+                    project_files.append(
+                        (
+                            organisation_dir,
+                            int(project_file.group(1)),
+                            f"{root}/{filename}",
+                        )
+                    )
+        return project_files
+
+    def migrate(self, repo, name: str, fan_out: int) -> int:
+        """
+        Move every project file to a new layout and record it in the repository.
+        The changes are staged but not committed
+
+        Keyword arguments:
+        repo -- The report repository
+        name -- The name of the new layout
+        fan_out -- Number of hexadecimal characters used in the name
+                   of the fan-out directories
+
+        Returns:
+        moved_files -- The number of project files moved
+        """
+        self.validate_layout(name, fan_out)
+        project_files = self.get_project_files()
+
+        self.name = name
+        self.fan_out = fan_out
+        moved_files = 0
+        for organisation_dir, project_id, current_path in project_files:
+            project_dir = self.get_project_dir(organisation_dir, project_id)
+            updated_path = f"{project_dir}/{os.path.basename(current_path)}"
+            if os.path.normpath(current_path) != os.path.normpath(updated_path):
+                # os.renames prunes the fan-out directories left empty
+                os.renames(current_path, updated_path)
+                moved_files += 1
+
+        if os.path.isfile(self.layout_file):
+            FileService.update_file(
+                self.get_layout_file_content(),
+                self.yaml_files_dir,
+                self.layout_filename,
+            )
+        else:
+            FileService.create_file(
+                self.get_layout_file_content(),
+                self.yaml_files_dir,
+                self.layout_filename,
+            )
+        # A single "add --all" lets git detect the renames
+        repo.git.add("--all", *get_sparse_options(repo), self.yaml_files_dir)
+        return moved_files
@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+
+from server.services.git.git_features import get_git_version
+from server.services.git.write_lanes import write_lanes
+
+
+class GitMaintenanceService:
+    """
+    Background maintenance of the local report repository. Every report adds
+    a commit and its loose objects, which slow down staging, committing and
+    pushing as they pile up, so the repository is periodically packed and
+    its commit-graph written.
+
+    Maintenance only runs when no commit was made for a while, and it holds
+    the commit lane while running, so it never runs during a commit.
+    """
+
+    # Commands of each task, from the one needing the most recent git. The
+    # first command supported by the installed git is run, and tasks without
+    # one are skipped
+    tasks = {
+        "gc": [((0,), ("gc", "--auto", "--quiet"))],
+        "repack": [
+            ((2, 32), ("repack", "-d", "-l", "--geometric=2", "--quiet")),
+            ((0,), ("repack", "-d", "-l", "--quiet")),
+        ],
+        "commit-graph": [
+            ((2, 24), ("commit-graph", "write", "--reachable", "--split")),
+            ((2, 19), ("commit-graph", "write", "--reachable")),
+        ],
+    }
+
+    def __init__(self):
+        self.app = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.start_lock = threading.Lock()
+        # PID of the process running the thread
+        self.started_pid = None
+        self.commands = None
+        self.last_run = None
+        self.runs = 0
+        self.skipped_runs = 0
+
+    def init_app(self, app) -> None:
+        """
+        Configure the maintenance from the application config. The thread is
+        started by `start`
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.app = app
+        self.interval = app.config["GIT_MAINTENANCE_INTERVAL"]
+        self.idle_seconds = app.config["GIT_MAINTENANCE_IDLE_SECONDS"]
+        self.enabled_tasks = app.config["GIT_MAINTENANCE_TASKS"]
+        for task in self.enabled_tasks:
+            if task not in self.tasks:
+                raise ValueError(
+                    f"Unknown git maintenance task {task}."
+                    f" Valid tasks: {', '.join(self.tasks)}"
+                )
+
+    def start(self) -> None:
+        """
+        Start the maintenance thread if maintenance is enabled and the thread
+        is not running in this process. Threads don't survive a fork, so each
+        forked process starts its own
+        """
+        if not self.interval or self.started_pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.started_pid == os.getpid():
+                return
+            self.stop_event = threading.Event()
+            self.thread = threading.Thread(
+                target=self.run_forever, name="git-maintenance", daemon=True
+            )
+            self.thread.start()
+            self.started_pid = os.getpid()
+
+    def stop(self) -> None:
+        """
+        Stop the maintenance thread
+        """
+        self.stop_event.set()
+        with self.start_lock:
+            if self.thread is not None:
+                self.thread.join()
+                self.thread = None
+            self.started_pid = None
+
+    def is_idle(self) -> bool:
+        """
+        Check if no commit was made in the last GIT_MAINTENANCE_IDLE_SECONDS
+
+        Returns:
+        bool -- Boolean indicating if the repository is idle
+        """
+        if write_lanes.commit_in_progress:
+            return False
+        return (
+            write_lanes.last_commit_at is None
+            or time.monotonic() - write_lanes.last_commit_at >= self.idle_seconds
+        )
+
+    def run_forever(self) -> None:
+        """
+        Run the maintenance every GIT_MAINTENANCE_INTERVAL seconds
+        until stopped
+        """
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.run()
+            except Exception as e:
+                self.app.logger.error(f"Git maintenance failed: {str(e)}")
+
+    def get_commands(self) -> dict:
+        """
+        Get the commands of the enabled tasks supported by the installed git
+
+        Returns:
+        commands -- Dict with the git arguments of each task
+        """
+        if self.commands is None:
+            git_version = get_git_version()
+            self.commands = {}
+            for task in self.enabled_tasks:
+                for min_version, command in self.tasks[task]:
+                    if git_version >= min_version:
+                        self.commands[task] = command
+                        break
+                else:
+                    self.app.logger.warning(
+                        f"Git maintenance task {task} skipped, it needs a more"
+                        f" recent git than {'.'.join(map(str, git_version))}"
+                    )
+        return self.commands
+
+    def run(self) -> dict:
+        """
+        Run the enabled maintenance tasks if the repository is idle
+
+        Returns:
+        durations -- Dict with the seconds each task took, or None if the
+                     repository was busy
+        """
+        if not self.is_idle():
+            self.skipped_runs += 1
+            return None
+        with write_lanes.acquire(write_lanes.commit_lane, blocking=False) as acquired:
+            if not acquired:
+                self.skipped_runs += 1
+                return None
+            import git
+
+            repo = git.Repo(self.app.config["REPORT_FILE_DIR"])
+            durations = {}
+            for task, command in self.get_commands().items():
+                started_at = time.monotonic()
+                repo.git.execute(["git", *command])
+                durations[task] = time.monotonic() - started_at
+
+        self.runs += 1
+        self.last_run = durations
+        self.app.logger.info(
+            "Git maintenance finished: "
+            + ", ".join(f"{task} {seconds:.2f}s" for task, seconds in durations.items())
+        )
+        return durations
+
+
+git_maintenance = GitMaintenanceService()
@@ -0,0 +1,207 @@
+import os
+import random
+import sqlite3
+import time
+
+from flask import current_app
+
+import git
+from git.remote import PushInfo
+
+from server.services.git.document_cache import document_cache
+from server.services.git.file_service import FileService
+from server.services.git.index_service import ProjectIndexService
+from server.services.git.write_lanes import write_lanes
+from server.services.metrics_service import metrics
+
+
+class GitPushError(Exception):
+    """
+    Custom Exception to notify callers the local commits couldn't be pushed
+    """
+
+    def __init__(self, message):
+        if current_app:
+            current_app.logger.error(message)
+
+
+class PushService:
+    """
+    Push the local commits to the remote report repository. When the push is
+    rejected because other writer pushed first, the local commits are rebased
+    onto the new remote head and the push is retried with exponential
+    backoff. Project files are independent, so rebasing only conflicts when
+    the same project was changed on both sides. When the commits can't be
+    pushed, the branch is reset to the remote one, so the failed report
+    doesn't block the next ones and can be sent again.
+
+    Must be called holding the commit lane, as rebasing rewrites the index.
+    """
+
+    rejected_flags = PushInfo.REJECTED | PushInfo.REMOTE_REJECTED | PushInfo.ERROR
+
+    def __init__(self, repo, max_retries: int = None, backoff: float = None):
+        self.repo = repo
+        self.max_retries = (
+            current_app.config["GIT_PUSH_MAX_RETRIES"]
+            if max_retries is None
+            else max_retries
+        )
+        self.backoff = (
+            current_app.config["GIT_PUSH_BACKOFF"] if backoff is None else backoff
+        )
+
+    def is_rejected(self, push_infos) -> bool:
+        """
+        Check if a push was rejected
+
+        Keyword arguments:
+        push_infos -- The PushInfo list returned by the push
+
+        Returns:
+        bool -- Boolean indicating if any ref was rejected
+        """
+        return any(push_info.flags & self.rejected_flags for push_info in push_infos)
+
+    def fetch(self) -> str:
+        """
+        Fetch the remote branch
+
+        Raises:
+        GitPushError -- Raised when the remote branch couldn't be fetched
+
+        Returns:
+        remote_branch -- The name of the remote branch
+        """
+        branch = self.repo.active_branch.name
+        try:
+            self.repo.remote(name="origin").fetch()
+        except git.GitCommandError as e:
+            raise GitPushError(f"Error fetching origin/{branch}: {e.stderr}")
+        return f"origin/{branch}"
+
+    def rebase(self) -> None:
+        """
+        Fetch the remote branch and rebase the local commits onto it. Files
+        being written by other lanes are stashed during the rebase, and no
+        lane writes until it finishes
+
+        Raises:
+        GitPushError -- Raised when the remote branch couldn't be fetched or
+                        the local commits conflict with the remote ones
+        """
+        remote_branch = self.fetch()
+        with write_lanes.worktree(exclusive=True):
+            try:
+                self.repo.git.rebase("--autostash", remote_branch)
+            except git.GitCommandError as e:
+                self.repo.git.rebase("--abort")
+                raise GitPushError(
+                    f"Local commits conflict with {remote_branch}: {e.stderr}"
+                )
+
+    def reset(self) -> list:
+        """
+        Fetch the remote branch and reset the local one to it, dropping the
+        local commits that couldn't be pushed. The files of those commits are restored with
+        their remote content, or removed when they are not in the remote
+        branch, while the files other lanes are writing are kept. The reset
+        files are evicted from the document cache and the project index
+
+        Returns:
+        reset_files -- List of tuples with the path of each reset file and
+                       its remote blob SHA, which is None for removed files
+        """
+        try:
+            remote_branch = self.fetch()
+        except GitPushError:
+            remote_branch = f"origin/{self.repo.active_branch.name}"
+        with write_lanes.worktree(exclusive=True):
+            modified_files = set(self.repo.git.diff("--name-only", "-z").split("\0"))
+            diff = self.repo.git.diff(
+                "--raw", "--no-renames", "--no-abbrev", "-z", "HEAD", remote_branch
+            ).split("\0")
+            reset_files = []
+            for diff_line, path in zip(diff[0::2], diff[1::2]):
+                if path in modified_files:
+                    continue
+                _, _, _, blob_sha, status = diff_line.split()
+                reset_files.append((path, None if status == "D" else blob_sha))
+
+            self.repo.git.reset("--mixed", "-q", remote_branch)
+            restored_files = [path for path, blob_sha in reset_files if blob_sha]
+            for start in range(0, len(restored_files), 500):
+                self.repo.git.checkout(
+                    remote_branch, "--", *restored_files[start : start + 500]
+                )
+            for path, blob_sha in reset_files:
+                if blob_sha:
+                    continue
+                FileService.remove_file(
+                    os.path.join(self.repo.working_dir, path), self.repo.working_dir
+                )
+
+        reset_files = [
+            (os.path.join(self.repo.working_dir, path), blob_sha)
+            for path, blob_sha in reset_files
+        ]
+        for file_path, _ in reset_files:
+            document_cache.remove(file_path)
+        try:
+            project_index = ProjectIndexService()
+            project_index.remove_projects(
+                [file_path for file_path, blob_sha in reset_files if not blob_sha]
+            )
+            project_index.update_projects(
+                [
+                    (file_path, blob_sha)
+                    for file_path, blob_sha in reset_files
+                    if blob_sha
+                ]
+            )
+        except sqlite3.Error as e:
+            current_app.logger.error(f"Error updating the project index: {str(e)}")
+        current_app.logger.warning(
+            f"Branch reset to {remote_branch}, {len(reset_files)} files restored"
+        )
+        return reset_files
+
+    @metrics.timed("git_push")
+    def push(self) -> int:
+        """
+        Push the local commits, rebasing and retrying when the push
+        is rejected
+
+        Returns:
+        retries -- The number of retries needed
+
+        Raises:
+        GitPushError -- Raised when the commits couldn't be pushed, after
+                        resetting the branch to the remote one
+        """
+        origin = self.repo.remote(name="origin")
+        try:
+            for retries in range(self.max_retries + 1):
+                if retries:
+                    metrics.increment(metrics.git_pushes, ("retries",))
+                    time.sleep(
+                        random.uniform(0.5, 1) * self.backoff * 2 ** (retries - 1)
+                    )
+                    self.rebase()
+                try:
+                    rejected = self.is_rejected(origin.push())
+                except git.GitCommandError as e:
+                    current_app.logger.warning(f"Push failed: {e.stderr}")
+                    rejected = True
+                if not rejected:
+                    metrics.increment(metrics.git_pushes, ("pushes",))
+                    return retries
+                metrics.increment(metrics.git_pushes, ("rejections",))
+            raise GitPushError(f"Push rejected after {self.max_retries} retries")
+        except GitPushError:
+            metrics.increment(metrics.git_pushes, ("failures",))
+            try:
+                self.reset()
+            except git.GitCommandError as e:
+                current_app.logger.error(f"Error resetting the branch: {e.stderr}")
+            raise
@@ -0,0 +1,390 @@
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+import git
+
+from server.services.git.file_service import FileService
+from server.services.git.index_service import ProjectIndexService
+
+
+def parse_project_file(project_file: tuple) -> tuple:
+    """
+    Parse a project file into the rows of the snapshot tables. Runs in the
+    worker processes of the snapshot
+
+    Keyword arguments:
+    project_file -- Tuple with the path, the blob SHA and the content
+                    of the project file
+
+    Returns:
+    rows -- Tuple with the project row, the list of user rows, the
+            organisation row and the platform row
+    """
+    path, blob_sha, file_content = project_file
+    document = FileService.yaml_to_dict(file_content) or {}
+    project = document.get("project") or {}
+    external_source = project.get("externalSource") or {}
+    organisation = document.get("organisation") or {}
+    platform = document.get("platform") or {}
+
+    project_row = {
+        "project_id": project.get("projectId"),
+        "status": project.get("status"),
+        "name": project.get("name"),
+        "short_description": project.get("shortDescription"),
+        "changeset_comment": project.get("changesetComment"),
+        "author": project.get("author"),
+        "url": project.get("url"),
+        "created": project.get("created"),
+        "imagery": external_source.get("imagery"),
+        "license": external_source.get("license"),
+        "instructions": external_source.get("instructions"),
+        "per_task_instructions": external_source.get("perTaskInstructions"),
+        "users_count": len(project.get("users") or []),
+        "organisation_name": organisation.get("name"),
+        "platform_name": platform.get("name"),
+        "path": path,
+        "blob_sha": blob_sha,
+    }
+    user_rows = [
+        {
+            "project_id": project.get("projectId"),
+            "user_id": user.get("userId"),
+            "user_name": user.get("userName"),
+        }
+        for user in project.get("users") or []
+    ]
+    organisation_row = {
+        "name": organisation.get("name"),
+        "url": organisation.get("url"),
+        "description": organisation.get("description"),
+    }
+    platform_row = {"name": platform.get("name"), "url": platform.get("url")}
+    return project_row, user_rows, organisation_row, platform_row
+
+
+class SnapshotService:
+    """
+    Columnar snapshot of every project document in the report repository, for
+    analysis. The snapshot is a directory with one CSV file per table (projects,
+    users, organisations and platforms) and a manifest recording the commit it
+    was built from.
+
+    Project files are read from the git objects of the current commit and
+    parsed by a pool of worker processes. Once a snapshot exists, only the
+    project files changed since its commit are parsed again. Project files
+    without a project id are skipped and listed in the manifest.
+    """
+
+    tables = {
+        "projects": [
+            "project_id",
+            "status",
+            "name",
+            "short_description",
+            "changeset_comment",
+            "author",
+            "url",
+            "created",
+            "imagery",
+            "license",
+            "instructions",
+            "per_task_instructions",
+            "users_count",
+            "organisation_name",
+            "platform_name",
+            "path",
+            "blob_sha",
+        ],
+        "users": ["project_id", "user_id", "user_name"],
+        "organisations": ["name", "url", "description"],
+        "platforms": ["name", "url"],
+    }
+    manifest_filename = "manifest.json"
+    batch_size = 1000
+    # Missing blobs of a partial clone are fetched in requests of this size
+    fetch_batch_size = 500
+
+    def __init__(self, snapshot_dir: str = None, workers: int = None):
+        self.snapshot_dir = snapshot_dir or current_app.config["REPORT_SNAPSHOT_DIR"]
+        self.workers = workers or current_app.config["REPORT_SNAPSHOT_WORKERS"] or None
+
+    def is_enabled(self) -> bool:
+        """
+        Check if the snapshot directory is configured
+
+        Returns:
+        bool -- Boolean indicating if the snapshot directory is configured
+        """
+        return bool(self.snapshot_dir)
+
+    def get_manifest(self) -> dict:
+        """
+        Get the manifest of the current snapshot
+
+        Returns:
+        manifest -- Dict with the commit, the creation date and the tables of
+                    the snapshot, or None if there is no snapshot yet
+        """
+        try:
+            with open(os.path.join(self.snapshot_dir, self.manifest_filename)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get_changed_paths(self, repo, commit: str) -> tuple:
+        """
+        Get the project files changed between a commit and the current one
+
+        Keyword arguments:
+        repo -- The report repository
+        commit -- The SHA of the commit of the last snapshot
+
+        Returns:
+        changed_paths -- Tuple with the set of added or modified paths and the
+                         set of deleted paths, or None if the commit is not
+                         in the repository history
+        """
+        try:
+            diff = repo.git.diff(
+                "--name-status", "--no-renames", commit, "HEAD", "--", "github_files"
+            )
+        except git.GitCommandError:
+            return None
+        updated_paths, deleted_paths = set(), set()
+        for line in diff.splitlines():
+            status, path = line.split("\t", 1)
+            if not ProjectIndexService.project_file_pattern.match(path):
+                continue
+            if status == "D":
+                deleted_paths.add(path)
+            else:
+                updated_paths.add(path)
+        return updated_paths, deleted_paths
+
+    def get_promisor_remote(self, repo) -> str:
+        """
+        Get the remote the missing objects of a partial clone are fetched from
+
+        Keyword arguments:
+        repo -- The report repository
+
+        Returns:
+        remote -- The name of the promisor remote, or None if the repository
+                  is not a partial clone
+        """
+        config = repo.config_reader()
+        for remote in repo.remotes:
+            section = f'remote "{remote.name}"'
+            if config.get_value(section, "promisor", False):
+                return remote.name
+        return None
+
+    def fetch_missing_blobs(self, repo, blob_shas: set) -> None:
+        """
+        Fetch the missing blobs of a partial clone in a few requests, instead
+        of the on-demand fetch of each blob when it is read
+
+        Keyword arguments:
+        repo -- The report repository
+        blob_shas -- Set with the SHAs of the blobs that will be read
+        """
+        remote = self.get_promisor_remote(repo)
+        if remote is None:
+            return
+        objects = repo.git.rev_list("--objects", "--missing=print", "--no-walk", "HEAD")
+        missing_shas = [
+            line[1:]
+            for line in objects.splitlines()
+            if line.startswith("?") and line[1:] in blob_shas
+        ]
+        for i in range(0, len(missing_shas), self.fetch_batch_size):
+            repo.git.fetch(
+                remote,
+                "--no-tags",
+                "--no-write-fetch-head",
+                "--recurse-submodules=no",
+                "--filter=blob:none",
+                *missing_shas[i : i + self.fetch_batch_size],
+            )
+
+    def get_project_files(self, repo, paths: set = None):
+        """
+        Read project files from the tree of the current commit
+
+        Keyword arguments:
+        repo -- The report repository
+        paths -- Only read these paths. All project files are read if not set
+
+        Returns:
+        project_files -- Generator of tuples with the path, the blob SHA
+                         and the content of each project file
+        """
+        blobs = [
+            item
+            for item in repo.head.commit.tree.traverse()
+            if item.type == "blob"
+            and (paths is None or item.path in paths)
+            and ProjectIndexService.project_file_pattern.match(item.path)
+        ]
+        self.fetch_missing_blobs(repo, {item.hexsha for item in blobs})
+        for item in blobs:
+            file_content = item.data_stream.read().decode("utf-8")
+            yield item.path, item.hexsha, file_content
+
+    def parse_project_files(self, project_files):
+        """
+        Parse project files in a pool of worker processes. Files are sent to
+        the pool in batches, so memory doesn't grow with the number of files.
+        Worker processes are spawned instead of forked, so they don't inherit
+        the locks and threads of the server when the snapshot is built from
+        a request
+
+        Keyword arguments:
+        project_files -- Iterable of tuples with the path, the blob SHA and
+                         the content of each project file
+
+        Returns:
+        rows -- Generator of the rows of each project file
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            batch = []
+            for project_file in project_files:
+                batch.append(project_file)
+                if len(batch) >= self.batch_size:
+                    yield from executor.map(parse_project_file, batch, chunksize=50)
+                    batch = []
+            yield from executor.map(parse_project_file, batch, chunksize=50)
+
+    def read_table(self, table: str) -> list:
+        """
+        Read the rows of a snapshot table
+
+        Keyword arguments:
+        table -- The name of the table
+
+        Returns:
+        rows -- List with a dict for each row
+        """
+        with open(os.path.join(self.snapshot_dir, f"{table}.csv"), newline="") as f:
+            return list(csv.DictReader(f))
+
+    def write_table(self, table: str, rows: list) -> None:
+        """
+        Replace the rows of a snapshot table
+
+        Keyword arguments:
+        table -- The name of the table
+        rows -- List with a dict for each row
+        """
+        table_file = os.path.join(self.snapshot_dir, f"{table}.csv")
+        with open(f"{table_file}.tmp", "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self.tables[table])
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(f"{table_file}.tmp", table_file)
+
+    def build(self, repo) -> dict:
+        """
+        Build the snapshot of the current commit, parsing only the project
+        files changed since the last snapshot
+
+        Keyword arguments:
+        repo -- The report repository
+
+        Returns:
+        manifest -- Dict with the commit, the creation date and the tables
+                    of the snapshot
+        """
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        commit = repo.head.commit.hexsha
+        manifest = self.get_manifest()
+        changed_paths = (
+            self.get_changed_paths(repo, manifest["commit"]) if manifest else None
+        )
+
+        projects, users, organisations, platforms = {}, {}, {}, {}
+        if changed_paths is None:
+            paths = None
+        else:
+            updated_paths, deleted_paths = changed_paths
+            paths = updated_paths
+            for project_row in self.read_table("projects"):
+                if project_row["path"] not in updated_paths | deleted_paths:
+                    projects[project_row["path"]] = project_row
+            project_ids = {project_row["project_id"] for project_row in projects.values()}
+            for user_row in self.read_table("users"):
+                if user_row["project_id"] in project_ids:
+                    users.setdefault(user_row["project_id"], []).append(user_row)
+            organisations = {row["name"]: row for row in self.read_table("organisations")}
+            platforms = {row["name"]: row for row in self.read_table("platforms")}
+
+        parsed_files = 0
+        skipped_files = []
+        for project_row, user_rows, organisation_row, platform_row in (
+            self.parse_project_files(self.get_project_files(repo, paths))
+        ):
+            parsed_files += 1
+            try:
+                int(project_row["project_id"])
+            except (TypeError, ValueError):
+                skipped_files.append(project_row["path"])
+                continue
+            projects[project_row["path"]] = project_row
+            users[str(project_row["project_id"])] = user_rows
+            organisations[organisation_row["name"]] = organisation_row
+            platforms[platform_row["name"]] = platform_row
+        if skipped_files:
+            current_app.logger.warning(
+                "Project files without a project id skipped: "
+                + ", ".join(skipped_files)
+            )
+
+        project_rows = sorted(projects.values(), key=lambda row: int(row["project_id"]))
+        organisation_names = {row["organisation_name"] for row in project_rows}
+        platform_names = {row["platform_name"] for row in project_rows}
+        table_rows = {
+            "projects": project_rows,
+            "users": [
+                user_row
+                for project_row in project_rows
+                for user_row in users.get(str(project_row["project_id"]), [])
+            ],
+            "organisations": sorted(
+                (row for name, row in organisations.items() if name in organisation_names),
+                key=lambda row: row["name"],
+            ),
+            "platforms": sorted(
+                (row for name, row in platforms.items() if name in platform_names),
+                key=lambda row: row["name"],
+            ),
+        }
+        for table, rows in table_rows.items():
+            self.write_table(table, rows)
+
+        manifest = {
+            "commit": commit,
+            "created": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "incremental": changed_paths is not None,
+            "parsed_files": parsed_files,
+            "skipped_files": skipped_files,
+            "tables": {
+                table: {"file": f"{table}.csv", "columns": columns, "rows": len(rows)}
+                for (table, columns), rows in zip(
+                    self.tables.items(), table_rows.values()
+                )
+            },
+        }
+        manifest_file = os.path.join(self.snapshot_dir, self.manifest_filename)
+        with open(f"{manifest_file}.tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(f"{manifest_file}.tmp", manifest_file)
+        return manifest
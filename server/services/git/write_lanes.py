@@ -0,0 +1,204 @@
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager, ExitStack
+
+
+class WriteLaneScheduler:
+    """
+    Serialise writes to the report repository per organisation directory.
+
+    Each organisation directory has its own write lane, so reading, rendering
+    and writing project files of different organisations run in parallel.
+    Only staging and committing go through the single commit lane, because
+    git has one index per repository.
+
+    Lanes write their files holding the working tree shared, while rebasing
+    and resetting the branch, which rewrite files of any organisation, hold
+    it exclusively.
+
+    Lanes always serialise the threads of a process. When a lock directory is
+    set they are also backed by file locks, which serialise the worker
+    processes of a pre-forking server.
+    """
+
+    commit_lane = "commit"
+    worktree_lane = "worktree"
+
+    def __init__(self, lock_dir: str = None):
+        self.lock_dir = lock_dir
+        self.lanes = {}
+        self.lanes_lock = threading.Lock()
+        self.last_commit_at = None
+        self.commit_in_progress = False
+        self.worktree_condition = threading.Condition()
+        self.worktree_writers = 0
+        self.worktree_exclusive = False
+        self.worktree_exclusive_waiting = 0
+
+    def init_app(self, app) -> None:
+        """
+        Configure the lock directory from the application config
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.lock_dir = app.config["GIT_LOCK_DIR"]
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def get_lane_lock(self, lane: str) -> threading.Lock:
+        """
+        Get the thread lock of a lane, creating it if needed. Each call must
+        be followed by `release_lane_lock`
+
+        Keyword arguments:
+        lane -- The name of the lane
+
+        Returns:
+        lock -- The thread lock of the lane
+        """
+        with self.lanes_lock:
+            lane_lock = self.lanes.setdefault(lane, [threading.Lock(), 0])
+            lane_lock[1] += 1
+            return lane_lock[0]
+
+    def release_lane_lock(self, lane: str) -> None:
+        """
+        Forget the thread lock of a lane nobody is waiting for
+
+        Keyword arguments:
+        lane -- The name of the lane
+        """
+        with self.lanes_lock:
+            self.lanes[lane][1] -= 1
+            if not self.lanes[lane][1]:
+                del self.lanes[lane]
+
+    @contextmanager
+    def acquire(self, lane: str, blocking: bool = True):
+        """
+        Hold a lane while the context is active
+
+        Keyword arguments:
+        lane -- The name of the lane
+        blocking -- If False, don't wait for a busy lane
+
+        Returns:
+        bool -- Boolean indicating if the lane was acquired. Always True when
+                blocking
+        """
+        lane_lock = self.get_lane_lock(lane)
+        try:
+            if not lane_lock.acquire(blocking):
+                yield False
+                return
+            try:
+                if not self.lock_dir:
+                    yield True
+                    return
+                lane_hash = hashlib.sha1(lane.encode("utf-8")).hexdigest()
+                with open(os.path.join(self.lock_dir, f"{lane_hash}.lock"), "w") as f:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                    except BlockingIOError:
+                        yield False
+                        return
+                    try:
+                        yield True
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            finally:
+                lane_lock.release()
+        finally:
+            self.release_lane_lock(lane)
+
+    @contextmanager
+    def hold_worktree_lock(self, exclusive: bool):
+        """
+        Hold the thread lock of the working tree while the context is active.
+        Threads waiting for it exclusively go before new shared holders
+
+        Keyword arguments:
+        exclusive -- If True, wait until no other thread holds it
+        """
+        with self.worktree_condition:
+            if exclusive:
+                self.worktree_exclusive_waiting += 1
+                self.worktree_condition.wait_for(
+                    lambda: not self.worktree_exclusive and not self.worktree_writers
+                )
+                self.worktree_exclusive_waiting -= 1
+                self.worktree_exclusive = True
+            else:
+                self.worktree_condition.wait_for(
+                    lambda: not self.worktree_exclusive
+                    and not self.worktree_exclusive_waiting
+                )
+                self.worktree_writers += 1
+        try:
+            yield
+        finally:
+            with self.worktree_condition:
+                if exclusive:
+                    self.worktree_exclusive = False
+                else:
+                    self.worktree_writers -= 1
+                self.worktree_condition.notify_all()
+
+    @contextmanager
+    def worktree(self, exclusive: bool = False):
+        """
+        Hold the working tree while the context is active. Lanes hold it
+        shared while they write their files, and git commands that rewrite
+        tracked files of any organisation hold it exclusively, so they never
+        run while a lane is writing
+
+        Keyword arguments:
+        exclusive -- If True, wait until no lane is writing
+        """
+        with self.hold_worktree_lock(exclusive):
+            if not self.lock_dir:
+                yield
+                return
+            lane_hash = hashlib.sha1(self.worktree_lane.encode("utf-8")).hexdigest()
+            with open(os.path.join(self.lock_dir, f"{lane_hash}.lock"), "w") as f:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def lane(self, *organisation_dirs: str):
+        """
+        Hold the write lanes of one or more organisation directories. Lanes
+        are always acquired in the same order to avoid deadlocks
+
+        Keyword arguments:
+        organisation_dirs -- The organisation directories being written
+        """
+        with ExitStack() as stack:
+            for organisation_dir in sorted(
+                {os.path.normpath(organisation_dir) for organisation_dir in organisation_dirs}
+            ):
+                stack.enter_context(self.acquire(f"lane:{organisation_dir}"))
+            yield
+
+    @contextmanager
+    def commit(self):
+        """
+        Hold the commit lane while files are staged, committed and pushed
+        """
+        with self.acquire(self.commit_lane):
+            self.commit_in_progress = True
+            try:
+                yield
+            finally:
+                self.commit_in_progress = False
+                self.last_commit_at = time.monotonic()
+
+
+write_lanes = WriteLaneScheduler()
@@ -0,0 +1,45 @@
+import yaml
+
+# Use the libyaml bindings when PyYAML was built with them, they are an order of
+# magnitude faster than the pure Python implementation and emit the same output
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+    LIBYAML_AVAILABLE = False
+
+
+class YamlCodec:
+    """
+    Encode and decode report documents as YAML. Only the safe subset of
+    YAML is supported, so loading a file never builds arbitrary Python objects
+    """
+
+    @staticmethod
+    def encode(yaml_dict: dict) -> str:
+        """
+        Encode a dictionary as a YAML string
+
+        Keyword arguments:
+        yaml_dict -- The dictionary being encoded
+
+        Returns:
+        yaml_str -- The string representation of a YAML
+        """
+        return yaml.dump(yaml_dict, Dumper=SafeDumper, allow_unicode=True)
+
+    @staticmethod
+    def decode(yaml_str: str) -> dict:
+        """
+        Decode a YAML string into a dictionary
+
+        Keyword arguments:
+        yaml_str -- The string representation of a YAML
+
+        Returns:
+        yaml_dict -- The dictionary representation of a YAML
+        """
+        return yaml.load(yaml_str, Loader=SafeLoader)
@@ -0,0 +1,210 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+class IdempotencyStore:
+    """
+    Store of the responses of the requests sent with an Idempotency-Key
+    header. A retried request with the same key and the same content gets
+    the stored response, without reporting the document again.
+
+    Keys expire IDEMPOTENCY_TTL seconds after their request finished, and the
+    least recently stored keys are evicted when the store has more than
+    IDEMPOTENCY_MAX_ENTRIES keys. The store is kept in the SQLite file set in
+    IDEMPOTENCY_FILE, so it is shared by all the processes of the server and
+    survives a restart, and it is disabled when the variable is not set.
+    """
+
+    # States of a key returned by `begin`
+    started = "started"
+    in_progress = "in_progress"
+    replayed = "replayed"
+    mismatched = "mismatched"
+
+    # Seconds a key of a request in progress is kept, so a key whose process
+    # died while running the request can be used again
+    in_progress_ttl = 15 * 60
+
+    def __init__(
+        self, store_file: str = None, max_entries: int = 10000, ttl: int = 24 * 60 * 60
+    ):
+        self.store_file = store_file
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def init_app(self, app) -> None:
+        """
+        Configure the store file and limits from the application config
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.store_file = app.config["IDEMPOTENCY_FILE"]
+        self.max_entries = app.config["IDEMPOTENCY_MAX_ENTRIES"]
+        self.ttl = app.config["IDEMPOTENCY_TTL"]
+
+    def is_enabled(self) -> bool:
+        """
+        Check if the store is configured
+
+        Returns:
+        bool -- Boolean indicating if the store is configured
+        """
+        return bool(self.store_file)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the store, creating it if it doesn't exist.
+        Transactions are started explicitly by `transaction`
+
+        Returns:
+        connection -- The connection to the SQLite store
+        """
+        connection = sqlite3.connect(self.store_file, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_key ("
+            " key TEXT PRIMARY KEY,"
+            " request_hash TEXT NOT NULL,"
+            " status INTEGER,"
+            " body BLOB,"
+            " headers TEXT,"
+            " expires_at REAL NOT NULL,"
+            " stored REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idempotency_key_expires_at"
+            " ON idempotency_key (expires_at)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idempotency_key_stored"
+            " ON idempotency_key (stored)"
+        )
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Open a connection to the store with a write transaction that is
+        committed when the context exits without errors and rolled back
+        otherwise. Only one process can hold the write transaction
+
+        Returns:
+        connection -- The connection to the SQLite store
+        """
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def begin(self, key: str, request_hash: str) -> tuple:
+        """
+        Start a request with an idempotency key. The request must be
+        finished with `complete` or `cancel` when it is started
+
+        Keyword arguments:
+        key -- The idempotency key of the request
+        request_hash -- The hash of the method, path and body of the request
+
+        Returns:
+        state -- The state of the key: `started` for a new key, `replayed`
+                 when the stored response must be returned, `in_progress`
+                 when other request with the key didn't finish yet, and
+                 `mismatched` when the key was used for a different request
+        response -- The stored response when the state is `replayed`
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            self.evict(connection, now)
+            row = connection.execute(
+                "SELECT request_hash, status, body, headers FROM idempotency_key"
+                " WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                connection.execute(
+                    "INSERT INTO idempotency_key"
+                    " (key, request_hash, expires_at, stored) VALUES (?, ?, ?, ?)",
+                    (key, request_hash, now + self.in_progress_ttl, now),
+                )
+                return self.started, None
+
+        stored_hash, status, body, headers = row
+        if stored_hash != request_hash:
+            return self.mismatched, None
+        if status is None:
+            return self.in_progress, None
+        return self.replayed, (body, status, [tuple(h) for h in json.loads(headers)])
+
+    def complete(self, key: str, response: tuple) -> None:
+        """
+        Store the response of a started request
+
+        Keyword arguments:
+        key -- The idempotency key of the request
+        response -- Tuple with the body, status and headers of the response
+        """
+        body, status, headers = response
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE idempotency_key SET status = ?, body = ?, headers = ?,"
+                " expires_at = ?, stored = ? WHERE key = ? AND status IS NULL",
+                (status, body, json.dumps(headers), now + self.ttl, now, key),
+            )
+            self.evict(connection, now)
+
+    def cancel(self, key: str) -> None:
+        """
+        Forget a started request, so it can be retried with the same key
+
+        Keyword arguments:
+        key -- The idempotency key of the request
+        """
+        with self.transaction() as connection:
+            connection.execute(
+                "DELETE FROM idempotency_key WHERE key = ? AND status IS NULL", (key,)
+            )
+
+    def evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """
+        Remove the expired keys, and the least recently stored ones until
+        the store is within its limit
+
+        Keyword arguments:
+        connection -- Connection with an open transaction
+        now -- The current time
+        """
+        connection.execute("DELETE FROM idempotency_key WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM idempotency_key WHERE key IN ("
+            " SELECT key FROM idempotency_key ORDER BY stored DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def get_keys(self) -> list:
+        """
+        List the stored keys, from the least recently stored
+
+        Returns:
+        keys -- List with the stored keys
+        """
+        with self.transaction() as connection:
+            return [
+                row[0]
+                for row in connection.execute(
+                    "SELECT key FROM idempotency_key ORDER BY stored"
+                )
+            ]
+
+
+idempotency_store = IdempotencyStore()
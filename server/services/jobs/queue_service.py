@@ -0,0 +1,251 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import current_app
+
+
+class JobQueueService:
+    """
+    Durable queue of report jobs. Each job stores the name of the action
+    that runs it and its arguments, and it is kept in the SQLite file set in
+    JOB_QUEUE_FILE, so accepted jobs survive a restart. The queue is disabled
+    when the variable is not set.
+
+    Workers claim a job with a lease of JOB_LEASE_SECONDS, which they renew
+    while the job runs. A job whose worker died keeps the running status
+    until the lease expires, and then it is claimed again, up to
+    JOB_MAX_ATTEMPTS times. Each claim has its own token, so a worker that
+    lost its lease can't save the result of the job
+    """
+
+    def __init__(self, queue_file: str = None):
+        self.queue_file = queue_file or current_app.config["JOB_QUEUE_FILE"]
+        self.lease_seconds = current_app.config["JOB_LEASE_SECONDS"]
+        self.max_attempts = current_app.config["JOB_MAX_ATTEMPTS"]
+        self.retry_delay = current_app.config["JOB_RETRY_DELAY"]
+
+    def is_enabled(self) -> bool:
+        """
+        Check if the job queue is configured
+
+        Returns:
+        bool -- Boolean indicating if the job queue is configured
+        """
+        return bool(self.queue_file)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the queue, creating it if it doesn't exist.
+        Transactions are started explicitly by `transaction`
+
+        Returns:
+        connection -- The connection to the SQLite queue
+        """
+        connection = sqlite3.connect(self.queue_file, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS job ("
+            " job_id TEXT PRIMARY KEY,"
+            " action TEXT NOT NULL,"
+            " arguments TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " run_after REAL NOT NULL,"
+            " result_status INTEGER,"
+            " detail TEXT,"
+            " created REAL NOT NULL,"
+            " updated REAL NOT NULL,"
+            " claim_token TEXT)"
+        )
+        columns = [row["name"] for row in connection.execute("PRAGMA table_info(job)")]
+        if "claim_token" not in columns:
+            # Queues created before jobs had claim tokens
+            connection.execute("ALTER TABLE job ADD COLUMN claim_token TEXT")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS job_pending ON job (status, run_after)"
+        )
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Open a connection to the queue with a write transaction that is
+        committed when the context exits without errors and rolled back
+        otherwise. Only one process can hold the write transaction
+
+        Returns:
+        connection -- The connection to the SQLite queue
+        """
+        connection = self.connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+
+    def enqueue(self, action: str, *arguments) -> str:
+        """
+        Add a job to the queue
+
+        Keyword arguments:
+        action -- The name of the action that runs the job
+        arguments -- JSON serialisable arguments of the action
+
+        Returns:
+        job_id -- The id of the job
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO job"
+                " (job_id, action, arguments, status, run_after, created, updated)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, action, json.dumps(arguments), now, now, now),
+            )
+        return job_id
+
+    def claim(self) -> dict:
+        """
+        Claim the oldest job ready to run, either queued or with an expired
+        lease. Jobs that already used all their attempts are failed instead
+
+        Returns:
+        job -- Dict with the job and the token of the claim, or None if no
+               job is ready to run
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            while True:
+                row = connection.execute(
+                    "SELECT * FROM job WHERE status IN ('queued', 'running')"
+                    " AND run_after <= ? ORDER BY created LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    connection.execute(
+                        "UPDATE job SET status = 'failed', result_status = 500,"
+                        " detail = ?, updated = ? WHERE job_id = ?",
+                        (
+                            f"Job stopped after {row['attempts']} attempts",
+                            now,
+                            row["job_id"],
+                        ),
+                    )
+                    continue
+                claim_token = uuid.uuid4().hex
+                connection.execute(
+                    "UPDATE job SET status = 'running', attempts = attempts + 1,"
+                    " run_after = ?, updated = ?, claim_token = ? WHERE job_id = ?",
+                    (now + self.lease_seconds, now, claim_token, row["job_id"]),
+                )
+                job = self.row_to_job(row)
+                job["status"] = "running"
+                job["attempts"] += 1
+                job["claim_token"] = claim_token
+                return job
+
+    def renew(self, job: dict) -> bool:
+        """
+        Extend the lease of a claimed job by JOB_LEASE_SECONDS
+
+        Keyword arguments:
+        job -- The claimed job
+
+        Returns:
+        bool -- Boolean indicating if the lease was renewed, False when the
+                job was claimed again after the lease expired
+        """
+        now = time.time()
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE job SET run_after = ?, updated = ?"
+                " WHERE job_id = ? AND claim_token = ? AND status = 'running'",
+                (now + self.lease_seconds, now, job["job_id"], job["claim_token"]),
+            )
+        return cursor.rowcount == 1
+
+    def finish(self, job: dict, detail: str, result_status: int) -> str:
+        """
+        Save the result of a claimed job. Jobs failing with a server error
+        are queued again with an exponential delay while they have attempts
+        left. Nothing is saved when the job was claimed again since
+
+        Keyword arguments:
+        job -- The claimed job
+        detail -- The detail of the result of the action
+        result_status -- The HTTP status of the result of the action
+
+        Returns:
+        status -- The new status of the job, or None if the claim was lost
+        """
+        now = time.time()
+        if result_status < 400:
+            status = "succeeded"
+            run_after = now
+        elif result_status >= 500 and job["attempts"] < self.max_attempts:
+            status = "queued"
+            run_after = now + self.retry_delay * 2 ** (job["attempts"] - 1)
+        else:
+            status = "failed"
+            run_after = now
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE job SET status = ?, run_after = ?, result_status = ?,"
+                " detail = ?, updated = ?, claim_token = NULL"
+                " WHERE job_id = ? AND claim_token = ?",
+                (
+                    status,
+                    run_after,
+                    result_status,
+                    detail,
+                    now,
+                    job["job_id"],
+                    job["claim_token"],
+                ),
+            )
+        return status if cursor.rowcount == 1 else None
+
+    def get_job(self, job_id: str) -> dict:
+        """
+        Get a job from the queue
+
+        Keyword arguments:
+        job_id -- The id of the job
+
+        Returns:
+        job -- Dict with the job, or None if it doesn't exist
+        """
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                "SELECT * FROM job WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return self.row_to_job(row) if row else None
+
+    def row_to_job(self, row: sqlite3.Row) -> dict:
+        """
+        Generate the dict of a job from its queue row
+
+        Keyword arguments:
+        row -- The row of the job
+
+        Returns:
+        job -- Dict with the job
+        """
+        job = dict(row)
+        job["arguments"] = json.loads(job["arguments"])
+        return job
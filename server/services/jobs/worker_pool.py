@@ -0,0 +1,190 @@
+import os
+import threading
+from contextlib import contextmanager
+
+from werkzeug.utils import import_string
+
+from server.services.jobs.queue_service import JobQueueService
+
+
+class JobWorkerPool:
+    """
+    Pool of threads running the jobs of the job queue. Jobs are run by
+    actions, functions registered with `action` that take the arguments of
+    the job and return a response body with a "detail" and an HTTP status,
+    like the API resources do.
+
+    Every process running the application starts JOB_WORKERS threads. The
+    queue is shared through its SQLite file, so idle workers poll it every
+    JOB_POLL_INTERVAL seconds, and they are woken up at once by jobs queued
+    in their own process. While a job runs, its lease is renewed every third
+    of JOB_LEASE_SECONDS, so long jobs are not claimed by other workers
+    """
+
+    # Modules registering the actions, imported when the workers start as
+    # the API views are only imported on their first request
+    action_modules = ["server.api.git.resources", "server.api.wiki.resources"]
+
+    def __init__(self):
+        self.app = None
+        self.actions = {}
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.start_lock = threading.Lock()
+        # PID of the process running the threads
+        self.started_pid = None
+
+    def action(self, name: str):
+        """
+        Register a function as the action that runs the jobs with a name
+
+        Keyword arguments:
+        name -- The name of the action
+        """
+
+        def register(function):
+            self.actions[name] = function
+            return function
+
+        return register
+
+    def init_app(self, app) -> None:
+        """
+        Configure the workers from the application config. The threads are
+        started by `start`
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.app = app
+        self.poll_interval = app.config["JOB_POLL_INTERVAL"]
+
+    def start(self) -> None:
+        """
+        Start the worker threads if the job queue is enabled and they are not
+        running in this process. Threads don't survive a fork, so each forked
+        process starts its own
+        """
+        if not self.app.config["JOB_QUEUE_FILE"] or self.started_pid == os.getpid():
+            return
+        with self.start_lock:
+            if self.started_pid == os.getpid():
+                return
+            for module in self.action_modules:
+                import_string(module)
+            self.stop_event = threading.Event()
+            self.wake_event = threading.Event()
+            self.threads = []
+            for worker_number in range(self.app.config["JOB_WORKERS"]):
+                thread = threading.Thread(
+                    target=self.run_forever,
+                    name=f"job-worker-{worker_number}",
+                    daemon=True,
+                )
+                thread.start()
+                self.threads.append(thread)
+            self.started_pid = os.getpid()
+
+    def stop(self) -> None:
+        """
+        Stop the worker threads once they finish their current job
+        """
+        self.stop_event.set()
+        self.wake_event.set()
+        with self.start_lock:
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
+            self.started_pid = None
+
+    def notify(self) -> None:
+        """
+        Wake up the idle workers after a job is queued
+        """
+        self.wake_event.set()
+
+    def run_forever(self) -> None:
+        """
+        Run the jobs of the queue until stopped
+        """
+        while not self.stop_event.is_set():
+            try:
+                ran_job = self.run_next()
+            except Exception as e:
+                self.app.logger.error(f"Job worker failed: {str(e)}")
+                ran_job = False
+            if not ran_job:
+                self.wake_event.wait(self.poll_interval)
+                self.wake_event.clear()
+
+    @contextmanager
+    def renew_lease(self, queue: JobQueueService, job: dict):
+        """
+        Renew the lease of a job from a separate thread while the
+        context is active
+
+        Keyword arguments:
+        queue -- The job queue
+        job -- The claimed job
+        """
+        stop_renewing = threading.Event()
+
+        def renew():
+            while not stop_renewing.wait(queue.lease_seconds / 3):
+                try:
+                    if not queue.renew(job):
+                        self.app.logger.warning(
+                            f"Job {job['job_id']} lease lost, it was claimed again"
+                        )
+                        return
+                except Exception as e:
+                    self.app.logger.error(f"Job {job['job_id']} lease renewal: {e}")
+
+        thread = threading.Thread(
+            target=renew, name=f"job-lease-{job['job_id']}", daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            stop_renewing.set()
+            thread.join()
+
+    def run_next(self) -> bool:
+        """
+        Claim the next job ready to run and run it
+
+        Returns:
+        bool -- Boolean indicating if a job was run
+        """
+        with self.app.app_context():
+            queue = JobQueueService()
+            job = queue.claim()
+            if job is None:
+                return False
+
+            action = self.actions.get(job["action"])
+            if action is None:
+                response, status = {"detail": f"Unknown action {job['action']}"}, 500
+            else:
+                try:
+                    with self.renew_lease(queue, job):
+                        response, status = action(*job["arguments"])
+                except Exception as e:
+                    response = {"detail": f"Job - unhandled error: {str(e)}"}
+                    status = 500
+            job_status = queue.finish(job, response["detail"], status)
+            if job_status is None:
+                self.app.logger.warning(
+                    f"Job {job['job_id']} {job['action']} result discarded:"
+                    " the job was claimed again"
+                )
+                return True
+            self.app.logger.info(
+                f"Job {job['job_id']} {job['action']} {job_status}: {status}"
+            )
+            return True
+
+
+job_workers = JobWorkerPool()
@@ -0,0 +1,371 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import parse_qs, urlsplit
+
+from flask import g, request
+
+
+class Counter:
+    """
+    Counter with a value for each combination of label values
+    """
+
+    type = "counter"
+
+    def __init__(
+        self, name: str, help: str, label_names: tuple, label_values: tuple = ()
+    ):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        # Known label values are rendered from the start, with a zero value
+        self.values = {values: 0 for values in label_values}
+
+    def increment(self, label_values: tuple, amount: float = 1) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, label_values: tuple) -> float:
+        return self.values.get(label_values, 0)
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, dict(zip(self.label_names, label_values)), value
+
+
+class Histogram:
+    """
+    Histogram with cumulative buckets for each combination of label values
+    """
+
+    type = "histogram"
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, name: str, help: str, label_names: tuple):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.values = {}
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        bucket_counts, total = self.values.get(
+            label_values, ([0] * (len(self.buckets) + 1), 0)
+        )
+        bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.values[label_values] = (bucket_counts, total + value)
+
+    def samples(self):
+        for label_values, (bucket_counts, total) in self.values.items():
+            labels = dict(zip(self.label_names, label_values))
+            count = 0
+            for bucket, bucket_count in zip(self.buckets, bucket_counts):
+                count += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": str(bucket)}, count
+            count += bucket_counts[-1]
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, count
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class MetricsRegistry:
+    """
+    Registry of the latency histograms and counters of the reports, exposed
+    in the Prometheus text format by the /metrics endpoint.
+
+    Metrics are recorded only when METRICS_ENABLED is set, otherwise timing a
+    stage costs a couple of attribute checks. Metrics live in the memory of
+    each process, so each process must be scraped. Stages are also recorded
+    as spans of the trace of a profiled request, see `start_trace`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.collectors = []
+        self.stage_duration = Histogram(
+            "oeg_stage_duration_seconds",
+            "Duration of each stage of a report",
+            ("stage",),
+        )
+        self.request_duration = Histogram(
+            "oeg_request_duration_seconds",
+            "Duration of the API requests",
+            ("endpoint", "method", "status"),
+        )
+        self.mediawiki_request_duration = Histogram(
+            "oeg_mediawiki_request_duration_seconds",
+            "Duration of the MediaWiki API requests",
+            ("action", "status"),
+        )
+        self.git_pushes = Counter(
+            "oeg_git_push_total",
+            "Pushes to the remote report repository by result",
+            ("result",),
+            (("pushes",), ("rejections",), ("retries",), ("failures",)),
+        )
+        self.wiki_page_edits = Counter(
+            "oeg_wiki_page_edits_total",
+            "Edits of the wiki pages by result. Edits not changing the"
+            " page text are skipped",
+            ("result",),
+            (("edited",), ("skipped",)),
+        )
+        self.metrics = [
+            self.stage_duration,
+            self.request_duration,
+            self.mediawiki_request_duration,
+            self.git_pushes,
+            self.wiki_page_edits,
+        ]
+
+    def init_app(self, app) -> None:
+        """
+        Enable the metrics if they are enabled in the application config,
+        timing the requests of the application
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.enabled = app.config["METRICS_ENABLED"]
+        if not self.enabled:
+            return
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        if self.collect_service_metrics not in self.collectors:
+            self.add_collector(self.collect_service_metrics)
+
+    def start_request(self) -> None:
+        g.metrics_started_at = time.perf_counter()
+
+    def finish_request(self, response):
+        started_at = g.pop("metrics_started_at", None)
+        if started_at is not None and request.endpoint != "get_metrics":
+            self.observe(
+                self.request_duration,
+                (str(request.endpoint), request.method, str(response.status_code)),
+                time.perf_counter() - started_at,
+            )
+        return response
+
+    def observe_mediawiki_response(self, response, *args, **kwargs):
+        """
+        Record the duration of a MediaWiki API request. Used as a response
+        hook of the requests session of MediaWikiService
+
+        Keyword arguments:
+        response -- The response of the MediaWiki API
+        """
+        action = parse_qs(urlsplit(response.request.url).query).get(
+            "action", ["unknown"]
+        )[0]
+        status = response.headers.get(
+            "MediaWiki-API-Error", str(response.status_code)
+        )
+        self.observe(
+            self.mediawiki_request_duration,
+            (action, status),
+            response.elapsed.total_seconds(),
+        )
+
+    def observe(self, histogram: Histogram, label_values: tuple, value: float):
+        """
+        Record a value in a histogram
+
+        Keyword arguments:
+        histogram -- The histogram
+        label_values -- Tuple with the values of the labels of the histogram
+        value -- The observed value
+        """
+        with self.lock:
+            histogram.observe(label_values, value)
+
+    def increment(self, counter: Counter, label_values: tuple) -> None:
+        """
+        Increment a counter. Counters are kept even when the metrics are
+        disabled
+
+        Keyword arguments:
+        counter -- The counter
+        label_values -- Tuple with the values of the labels of the counter
+        """
+        with self.lock:
+            counter.increment(label_values)
+
+    def start_trace(self, name: str) -> None:
+        """
+        Start recording the stages run by the current thread as a tree of
+        wall-clock spans, even when the metrics are disabled
+
+        Keyword arguments:
+        name -- The name of the root span
+        """
+        self.local.span = {
+            "name": name,
+            "start": time.perf_counter(),
+            "duration": None,
+            "children": [],
+        }
+
+    def finish_trace(self) -> dict:
+        """
+        Stop recording the stages run by the current thread
+
+        Returns:
+        span -- Dict with the name, duration and children spans of the root
+                span, with their start in seconds since the root started
+        """
+        root = self.local.span
+        self.local.span = None
+        root["duration"] = time.perf_counter() - root["start"]
+
+        def relative(span: dict, started_at: float) -> dict:
+            return {
+                "name": span["name"],
+                "start": span["start"] - started_at,
+                "duration": span["duration"],
+                "children": [
+                    relative(child, started_at) for child in span["children"]
+                ],
+            }
+
+        return relative(root, root["start"])
+
+    @contextmanager
+    def time_stage(self, stage: str):
+        """
+        Record the duration of a stage of a report, including failed ones
+
+        Keyword arguments:
+        stage -- The name of the stage
+        """
+        parent = getattr(self.local, "span", None)
+        if not self.enabled and parent is None:
+            yield
+            return
+        started_at = time.perf_counter()
+        if parent is not None:
+            span = {"name": stage, "start": started_at, "children": []}
+            parent["children"].append(span)
+            self.local.span = span
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started_at
+            if parent is not None:
+                span["duration"] = duration
+                self.local.span = parent
+            if self.enabled:
+                self.observe(self.stage_duration, (stage,), duration)
+
+    def timed(self, stage: str):
+        """
+        Decorate a function to record its duration as a stage of a report
+
+        Keyword arguments:
+        stage -- The name of the stage
+        """
+
+        def decorator(function):
+            @wraps(function)
+            def decorated(*args, **kwargs):
+                if not self.enabled and getattr(self.local, "span", None) is None:
+                    return function(*args, **kwargs)
+                with self.time_stage(stage):
+                    return function(*args, **kwargs)
+
+            return decorated
+
+        return decorator
+
+    def add_collector(self, collector) -> None:
+        """
+        Add a function generating metrics kept by other services when the
+        metrics are rendered. The function returns a list of tuples with
+        the name, help, type and a list of (labels, value) samples
+
+        Keyword arguments:
+        collector -- The function generating the metrics
+        """
+        self.collectors.append(collector)
+
+    def collect_service_metrics(self) -> list:
+        """
+        Collect the counters kept by the caches and the git maintenance
+
+        Returns:
+        metrics -- List of tuples with the name, help, type and samples
+                   of each metric
+        """
+        from server.services.git.document_cache import document_cache
+        from server.services.git.maintenance_service import git_maintenance
+        from server.services.wiki.document_cache import wiki_document_cache
+
+        return [
+            (
+                "oeg_document_cache_requests_total",
+                "Requests to the document caches by cache and result",
+                "counter",
+                [
+                    ({"cache": "git", "result": "hit"}, document_cache.hits),
+                    ({"cache": "git", "result": "miss"}, document_cache.misses),
+                    ({"cache": "wiki", "result": "hit"}, wiki_document_cache.hits),
+                    ({"cache": "wiki", "result": "miss"}, wiki_document_cache.misses),
+                ],
+            ),
+            (
+                "oeg_git_maintenance_runs_total",
+                "Runs of the git maintenance by result",
+                "counter",
+                [
+                    ({"result": "finished"}, git_maintenance.runs),
+                    ({"result": "skipped"}, git_maintenance.skipped_runs),
+                ],
+            ),
+        ]
+
+    @staticmethod
+    def format_sample(name: str, labels: dict, value: float) -> str:
+        if labels:
+            label_text = ",".join(
+                '{}="{}"'.format(
+                    label,
+                    str(label_value)
+                    .replace("\\", "\\\\")
+                    .replace('"', '\\"')
+                    .replace("\n", "\\n"),
+                )
+                for label, label_value in labels.items()
+            )
+            return f"{name}{{{label_text}}} {value}"
+        return f"{name} {value}"
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+        text -- The metrics in the Prometheus text format
+        """
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.type}")
+                lines.extend(
+                    self.format_sample(name, labels, value)
+                    for name, labels, value in metric.samples()
+                )
+        for collector in self.collectors:
+            for name, help, metric_type, samples in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(
+                    self.format_sample(name, labels, value) for labels, value in samples
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,129 @@
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import time
+import uuid
+
+from flask import g, request
+
+from server.services.metrics_service import metrics
+
+
+class RequestProfiler:
+    """
+    Profile single requests in production. A request is profiled when it has
+    a valid X-Profile-Signature header, or at random for a PROFILING_SAMPLE_RATE
+    fraction of the requests.
+
+    The view of a profiled request runs under cProfile, and the stages of the
+    report are recorded as a tree of wall-clock spans. Both are written to
+    PROFILING_DIR as `<endpoint>-<request_id>.prof` and
+    `<endpoint>-<request_id>.spans.json`, and the request id is returned in the
+    X-Request-ID header. Only the thread running the request is profiled
+    """
+
+    # Seconds a profiling signature is valid for
+    signature_max_age = 300
+
+    def __init__(self):
+        self.directory = None
+        self.secret = None
+        self.sample_rate = 0
+
+    def init_app(self, app) -> None:
+        """
+        Profile the requests of the application if profiling is enabled in
+        the application config
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        self.directory = app.config["PROFILING_DIR"]
+        self.secret = app.config["PROFILING_SECRET"]
+        self.sample_rate = app.config["PROFILING_SAMPLE_RATE"]
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self.start_request)
+        app.after_request(self.add_request_id)
+        app.teardown_request(self.finish_request)
+
+    @staticmethod
+    def sign(secret: str, timestamp: int, method: str, path: str) -> str:
+        """
+        Generate the X-Profile-Signature header of a request
+
+        Keyword arguments:
+        secret -- The PROFILING_SECRET of the server
+        timestamp -- The current UNIX time
+        method -- The HTTP method of the request
+        path -- The path of the request
+
+        Returns:
+        signature -- The value of the header, with the timestamp and the
+                     HMAC-SHA256 of the timestamp, method and path
+        """
+        digest = hmac.new(
+            secret.encode("utf-8"),
+            f"{timestamp}:{method.upper()}:{path}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+        return f"{timestamp}:{digest}"
+
+    def is_signed(self) -> bool:
+        """
+        Check if the current request has a valid profiling signature
+
+        Returns:
+        bool -- Boolean indicating if the request must be profiled
+        """
+        signature = request.headers.get("X-Profile-Signature")
+        if not self.secret or not signature or ":" not in signature:
+            return False
+        timestamp = signature.split(":", 1)[0]
+        if not timestamp.isdigit():
+            return False
+        if abs(time.time() - int(timestamp)) > self.signature_max_age:
+            return False
+        return hmac.compare_digest(
+            signature, self.sign(self.secret, timestamp, request.method, request.path)
+        )
+
+    def start_request(self) -> None:
+        if not (
+            self.is_signed()
+            or (self.sample_rate and random.random() < self.sample_rate)
+        ):
+            return
+        request_id = request.headers.get("X-Request-ID", "")
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", request_id):
+            request_id = uuid.uuid4().hex
+        g.profiling_request_id = request_id
+        metrics.start_trace(f"{request.method} {request.endpoint}")
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    def add_request_id(self, response):
+        if "profiling_request_id" in g:
+            response.headers["X-Request-ID"] = g.profiling_request_id
+        return response
+
+    def finish_request(self, exception=None) -> None:
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return
+        profiler.disable()
+        spans = metrics.finish_trace()
+        file_path = os.path.join(
+            self.directory, f"{request.endpoint}-{g.profiling_request_id}"
+        )
+        profiler.dump_stats(f"{file_path}.prof")
+        with open(f"{file_path}.spans.json", "w") as spans_file:
+            json.dump(spans, spans_file, indent=2)
+
+
+request_profiler = RequestProfiler()
@@ -1,32 +1,71 @@
-import copy
+import hashlib
 from functools import wraps
 
-from flask import current_app, make_response, request
+from flask import current_app, make_response, request, url_for
 
-from server.models.serializers.document import DocumentSchema
+from server.models.document import Document
+from server.services.idempotency_store import idempotency_store
+from server.services.jobs.queue_service import JobQueueService
+from server.services.jobs.worker_pool import job_workers
 
 
-def update_document(document: dict, update_fields: dict) -> dict:
+def update_document(document: Document, update_fields: Document) -> tuple:
     """
+    Apply the updated fields to a document as a JSON Merge Patch. Both must
+    be already validated, so the updated document is not validated again.
+    The fields that are not updated are shared with the current document
+
+    Keyword arguments:
+    document -- The current content of the document
+    update_fields -- The fields of the document being updated
+
+    Returns:
+    updated_document -- The updated content of the document
+    changed_fields -- List with the dotted paths of the changed fields
+    """
+    return document.merge_patch(update_fields)
+
+
+def enqueue_job(action: str, *arguments) -> tuple:
+    """
+    Queue a job running an action after the request, and generate
+    the response with the id of the job
+
+    Keyword arguments:
+    action -- The name of the action that runs the job
+    arguments -- JSON serialisable arguments of the action
+
+    Returns:
+    response -- Dict with the detail and the id of the job
+    status -- The HTTP status of the response
+    headers -- Dict with the location of the job status
+    """
+    job_id = JobQueueService().enqueue(action, *arguments)
+    job_workers.notify()
+    return (
+        {"detail": f"Job {job_id} queued", "job_id": job_id},
+        202,
+        {"Location": url_for("get_job", job_id=job_id)},
+    )
+
+
+def make_conditional_response(body: dict, etag: str):
     """
-    updated_document = copy.deepcopy(document)
-    for key in update_fields.keys():
-        for nested_key, value in update_fields[key].items():
-            if isinstance(update_fields[key][nested_key], list):
-                updated_document[key][nested_key] = list(value)
-            elif isinstance(update_fields[key][nested_key], dict):
-                for nested_dict_key in update_fields[key][nested_key]:
-                    updated_document[key][nested_key][nested_dict_key] = update_fields[
-                        key
-                    ][nested_key][nested_dict_key]
-            else:
-                updated_document[key][nested_key] = value
+    Generate the response of a cached resource, which is a 304 response
+    without body when the request has its ETag in If-None-Match
 
-    # validate schema
-    document_schema = DocumentSchema(partial=True)
-    document = document_schema.load(updated_document)
+    Keyword arguments:
+    body -- The JSON body of the response
+    etag -- The entity tag of the resource
 
-    return updated_document
+    Returns:
+    response -- The response
+    """
+    response = make_response(body, 200)
+    response.set_etag(etag)
+    # Clients may store the response, but they must revalidate it
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 
 def check_token(f):
@@ -45,3 +84,57 @@ def check_token(f):
         return f(*args, **kwargs)
 
     return decorated
+
+
+def idempotent(f):
+    """
+    Make a view idempotent for requests sent with an Idempotency-Key header.
+    The first response to a key is stored, unless it is a server error, and
+    retries with the same key and content get it without running the view
+    """
+
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key or not idempotency_store.is_enabled():
+            return f(*args, **kwargs)
+
+        request_hash = hashlib.sha256(
+            f"{request.method} {request.path}\n".encode("utf-8") + request.get_data()
+        ).hexdigest()
+        state, stored_response = idempotency_store.begin(key, request_hash)
+        if state == idempotency_store.replayed:
+            body, status, headers = stored_response
+            response = make_response(body, status, headers)
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+        elif state == idempotency_store.mismatched:
+            return make_response(
+                {"detail": "Idempotency-Key was used for a different request"}, 422
+            )
+        elif state == idempotency_store.in_progress:
+            return make_response(
+                {"detail": "A request with this Idempotency-Key is in progress"},
+                409,
+                {"Retry-After": "1"},
+            )
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except BaseException:
+            idempotency_store.cancel(key)
+            raise
+        if response.status_code >= 500:
+            idempotency_store.cancel(key)
+        else:
+            idempotency_store.complete(
+                key,
+                (
+                    response.get_data(),
+                    response.status_code,
+                    list(response.headers.items()),
+                ),
+            )
+        return response
+
+    return decorated
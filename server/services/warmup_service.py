@@ -0,0 +1,105 @@
+import gc
+import time
+
+from server.lazy import LazyView
+
+
+class WarmupService:
+    """
+    Build what the first requests of each worker would otherwise build while
+    the application is created: the API views and their modules, the
+    compiled page templates and the schemas of the schema registry.
+
+    Under a preloading server (e.g. gunicorn --preload) the application is
+    created once before the workers are forked, so they share all of it. The
+    background threads are then started in each worker after the fork
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def load_views(self) -> int:
+        """
+        Import the views of the lazily loaded API endpoints
+
+        Returns:
+        views -- The number of views loaded
+        """
+        views = [
+            view_func.view
+            for view_func in self.app.view_functions.values()
+            if isinstance(view_func, LazyView)
+        ]
+        return len(views)
+
+    def compile_templates(self) -> int:
+        """
+        Compile the page templates of the wiki pages
+
+        Returns:
+        templates -- The number of templates compiled
+        """
+        from server.services.wiki.pages.templates import (
+            OrganisationPageTemplates,
+            OverviewPageTemplates,
+            ProjectPageTemplates,
+        )
+        from server.services.wiki.wiki_section_service import WikiSectionService
+
+        section_obj = WikiSectionService()
+        templates = [
+            OverviewPageTemplates.page_template,
+            OrganisationPageTemplates.page_template,
+            ProjectPageTemplates.page_template,
+        ]
+        for template_text in templates:
+            section_obj.compile_template(template_text)
+        return len(templates)
+
+    def build_schemas(self) -> int:
+        """
+        Build the schemas of the documents and of the wiki pages
+
+        Returns:
+        schemas -- The number of schemas in the schema registry
+        """
+        from server.models.serializers.document import (
+            DocumentSchema,
+            OrganisationPageSchema,
+            OverviewPageSchema,
+        )
+        from server.models.serializers.registry import schema_registry
+        from server.services.wiki.pages.organisation_service import (
+            OrganisationPageService,
+        )
+        from server.services.wiki.pages.project_service import ProjectPageService
+
+        schema_registry.get(DocumentSchema)
+        schema_registry.get(DocumentSchema, partial=True)
+        schema_registry.get(OverviewPageSchema, partial=True)
+        schema_registry.get(
+            OrganisationPageSchema,
+            only=OrganisationPageService().page_fields,
+            partial=True,
+        )
+        schema_registry.get(
+            DocumentSchema, only=ProjectPageService().page_fields, partial=True
+        )
+        return len(schema_registry.schemas)
+
+    def warmup(self) -> None:
+        """
+        Warm up the application and freeze the objects built so far, so the
+        garbage collector of the forked workers doesn't copy their pages
+        """
+        started_at = time.perf_counter()
+        with self.app.app_context():
+            views = self.load_views()
+            templates = self.compile_templates()
+            schemas = self.build_schemas()
+        gc.collect()
+        gc.freeze()
+        self.app.logger.info(
+            f"Warmed up {views} views, {templates} templates and {schemas}"
+            f" schemas in {time.perf_counter() - started_at:.2f}s"
+        )
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from requests.exceptions import ConnectionError
+
+from server.services.wiki.document_cache import wiki_document_cache
+from server.services.wiki.mediawiki_service import MediaWikiServiceError
+from server.services.wiki.pages.organisation_service import OrganisationPageService
+from server.services.wiki.pages.project_service import ProjectPageService
+from server.services.wiki.pages.overview_service import OverviewPageService
+
+
+class WikiBulkService:
+    """
+    Create the wiki pages of many documents. Documents are grouped by the
+    pages they touch, so the overview page and each organisation page are
+    edited once with the rows of all their new projects, and the project
+    pages are created by a pool of WIKI_BULK_WORKERS threads.
+
+    The pages are created in the same order as for a single document, and a
+    document is not reported further once one of its pages fails
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or current_app.config["WIKI_BULK_WORKERS"]
+
+    def create_documents(self, documents: list) -> list:
+        """
+        Create the wiki pages of many documents
+
+        Keyword arguments:
+        documents -- List of documents already deserialised by DocumentSchema
+
+        Returns:
+        results -- List with a dict with the status and detail of the
+                   result of each document, in the order of the documents
+        """
+        if not documents:
+            return []
+
+        try:
+            overview_page = OverviewPageService()
+            overview_documents = overview_page.documents_to_report(documents)
+            if overview_documents:
+                overview_page.add_documents(overview_documents)
+        except Exception as e:
+            error_result = self.get_error_result(e)
+            return [dict(error_result) for _ in documents]
+
+        results = [None] * len(documents)
+        organisations = {}
+        for index, document in enumerate(documents):
+            organisation_name = document["organisation"]["name"].capitalize()
+            organisations.setdefault(organisation_name, []).append(index)
+
+        project_indexes = []
+        for indexes in organisations.values():
+            try:
+                organisation_page = OrganisationPageService()
+                organisation_documents = organisation_page.documents_to_report(
+                    [documents[index] for index in indexes]
+                )
+                if organisation_documents:
+                    organisation_page.add_documents(organisation_documents)
+                project_indexes.extend(indexes)
+            except Exception as e:
+                error_result = self.get_error_result(e)
+                for index in indexes:
+                    results[index] = dict(error_result)
+
+        app = current_app._get_current_object()
+
+        def create_project_page(document: dict) -> dict:
+            with app.app_context():
+                try:
+                    ProjectPageService().create_page(document)
+                    return {
+                        "status": 201,
+                        "detail": "Document for project "
+                        f"{document['project']['project_id']} created",
+                    }
+                except Exception as e:
+                    return self.get_error_result(e)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            project_results = executor.map(
+                create_project_page, [documents[index] for index in project_indexes]
+            )
+            for index, result in zip(project_indexes, project_results):
+                results[index] = result
+
+        for organisation_name in organisations:
+            wiki_document_cache.invalidate_organisation(organisation_name)
+        return results
+
+    def get_error_result(self, error: Exception) -> dict:
+        """
+        Generate the result of a document that failed to be reported
+
+        Keyword arguments:
+        error -- The exception raised while reporting the document
+
+        Returns:
+        result -- Dict with the status and detail of the error
+        """
+        if isinstance(error, MediaWikiServiceError):
+            return {"status": 409, "detail": f"{str(error)}"}
+        elif isinstance(error, ValueError):
+            current_app.logger.error(str(error))
+            return {"status": 400, "detail": f"{str(error)}"}
+        elif isinstance(error, ConnectionError):
+            return {"status": 500, "detail": "Error in connection with Mediawiki"}
+        else:
+            error_msg = f"Wiki bulk POST - unhandled error: {str(error)}"
+            current_app.logger.error(error_msg)
+            return {"status": 500, "detail": error_msg}
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class WikiDocumentCache:
+    """
+    LRU cache of the documents parsed from the wiki pages of the projects,
+    keyed by organisation and project name.
+
+    Reports sent to this server invalidate the documents of the organisations
+    they touch. Wiki pages may also be edited by hand, so documents expire
+    WIKI_DOCUMENT_CACHE_TTL seconds after they were cached.
+
+    Each invalidation starts a new generation of the organisation, and
+    documents read from the wiki before it are not cached, as they may have
+    been read before the report edited the pages. The generations are kept
+    in the SQLite file set in WIKI_DOCUMENT_CACHE_FILE, so reports sent to
+    any process of the server invalidate the documents cached by the others,
+    and in the memory of the process when the variable is not set.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, ttl: int = 300, generations_file: str = None
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generations_file = generations_file
+        self.hits = 0
+        self.misses = 0
+        self.documents = OrderedDict()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """
+        Configure the cache limits from the application config
+
+        Keyword arguments:
+        app -- The Flask application
+        """
+        with self.lock:
+            self.max_entries = app.config["WIKI_DOCUMENT_CACHE_MAX_ENTRIES"]
+            self.ttl = app.config["WIKI_DOCUMENT_CACHE_TTL"]
+            self.generations_file = app.config["WIKI_DOCUMENT_CACHE_FILE"]
+            while len(self.documents) > self.max_entries:
+                self.documents.popitem(last=False)
+
+    @staticmethod
+    def get_key(organisation_name: str, project_name: str) -> tuple:
+        """
+        Get the cache key of a project, as wiki page titles are matched
+
+        Keyword arguments:
+        organisation_name -- The name of the organisation of the project
+        project_name -- The name of the project
+
+        Returns:
+        key -- Tuple with the normalised organisation and project names
+        """
+        return (
+            organisation_name.capitalize().replace("_", " "),
+            project_name.capitalize().replace("_", " "),
+        )
+
+    @staticmethod
+    def get_etag(document_json: dict) -> str:
+        """
+        Generate the entity tag of a document
+
+        Keyword arguments:
+        document_json -- The camel-case representation of the document
+
+        Returns:
+        etag -- The SHA-1 of the canonical JSON of the document
+        """
+        return hashlib.sha1(
+            json.dumps(document_json, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, organisation_name: str, project_name: str) -> tuple:
+        """
+        Get the cached document of a project
+
+        Keyword arguments:
+        organisation_name -- The name of the organisation of the project
+        project_name -- The name of the project
+
+        Returns:
+        entry -- Tuple with the camel-case representation of the document and
+                 its entity tag, or None in case of a cache miss
+        """
+        key = self.get_key(organisation_name, project_name)
+        generation = self.get_generation(organisation_name)
+        with self.lock:
+            entry = self.documents.get(key)
+            if entry is None or entry[2] <= time.monotonic() or entry[3] != generation:
+                self.misses += 1
+                return None
+            self.documents.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def get_generation(self, organisation_name: str) -> int:
+        """
+        Get the current generation of the documents of an organisation, which
+        must be read before reading a document from the wiki to cache it
+
+        Keyword arguments:
+        organisation_name -- The name of the organisation
+
+        Returns:
+        generation -- The number of invalidations of the organisation
+        """
+        organisation_key = self.get_key(organisation_name, "")[0]
+        if self.generations_file:
+            connection = self.connect()
+            try:
+                row = connection.execute(
+                    "SELECT generation FROM wiki_generation WHERE organisation = ?",
+                    (organisation_key,),
+                ).fetchone()
+            finally:
+                connection.close()
+            return row[0] if row else 0
+        with self.lock:
+            return self.generations.get(organisation_key, 0)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the file of the generations, creating it if it
+        doesn't exist
+
+        Returns:
+        connection -- The connection to the SQLite file
+        """
+        connection = sqlite3.connect(
+            self.generations_file, timeout=30, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS wiki_generation ("
+            " organisation TEXT PRIMARY KEY,"
+            " generation INTEGER NOT NULL)"
+        )
+        return connection
+
+    def set(
+        self,
+        organisation_name: str,
+        project_name: str,
+        document_json: dict,
+        generation: int = None,
+    ):
+        """
+        Cache the document of a project. Cached documents must not be modified
+
+        Keyword arguments:
+        organisation_name -- The name of the organisation of the project
+        project_name -- The name of the project
+        document_json -- The camel-case representation of the document
+        generation -- The generation of the organisation when the document
+                      was read. The document is not cached if the organisation
+                      was invalidated since then
+
+        Returns:
+        etag -- The entity tag of the document
+        """
+        key = self.get_key(organisation_name, project_name)
+        etag = self.get_etag(document_json)
+        current_generation = self.get_generation(organisation_name)
+        if generation is not None and generation != current_generation:
+            return etag
+        with self.lock:
+            self.documents[key] = (
+                document_json,
+                etag,
+                time.monotonic() + self.ttl,
+                current_generation,
+            )
+            self.documents.move_to_end(key)
+            while len(self.documents) > self.max_entries:
+                self.documents.popitem(last=False)
+        return etag
+
+    def invalidate_organisation(self, organisation_name: str) -> None:
+        """
+        Remove the cached documents of all projects of an organisation. The
+        organisation page lists all of them, so a report of any project may
+        change the document of the others
+
+        Keyword arguments:
+        organisation_name -- The name of the organisation
+        """
+        organisation_key = self.get_key(organisation_name, "")[0]
+        if self.generations_file:
+            connection = self.connect()
+            try:
+                connection.execute(
+                    "INSERT INTO wiki_generation (organisation, generation)"
+                    " VALUES (?, 1) ON CONFLICT (organisation)"
+                    " DO UPDATE SET generation = generation + 1",
+                    (organisation_key,),
+                )
+            finally:
+                connection.close()
+        with self.lock:
+            self.generations[organisation_key] = (
+                self.generations.get(organisation_key, 0) + 1
+            )
+            for key in [key for key in self.documents if key[0] == organisation_key]:
+                del self.documents[key]
+
+    def clear(self) -> None:
+        """
+        Remove all documents from the cache
+        """
+        with self.lock:
+            self.documents.clear()
+
+
+wiki_document_cache = WikiDocumentCache()
@@ -1,9 +1,13 @@
 import re
+import time
 
-from flask import current_app
+from flask import current_app, g
 
 import requests
 
+from server.services.metrics_service import metrics
+from server.services.wiki.wiki_text_service import WikiTextService
+
 
 class MediaWikiServiceError(Exception):
     """
@@ -16,6 +20,10 @@ class MediaWikiServiceError(Exception):
 
 
 class MediaWikiService:
+    # Queries rejected because the wiki database replicas lag more than
+    # `maxlag` seconds are retried up to this number of times
+    maxlag_retries = 3
+
     def __init__(self):
         self.endpoint = current_app.config["WIKI_API_ENDPOINT"]
         self.session = requests.Session()
@@ -26,8 +34,11 @@ class MediaWikiService:
                 f" ({current_app.config['OEG_REPORTER_CONTACT_INFORMATION']})"
             }
         )
+        if metrics.enabled:
+            self.session.hooks["response"].append(metrics.observe_mediawiki_response)
         self.login()
 
+    @metrics.timed("mediawiki_fetch")
     def get_page_text(self, page_title: str) -> str:
         """
         Get the page content of a page parsed as Wikitext
@@ -57,8 +68,121 @@ class MediaWikiService:
             )
         else:
             text = data["parse"]["wikitext"]["*"]
+            self.set_page_text_hash(page_title, text)
             return text
 
+    def set_page_text_hash(self, page_title: str, page_text: str) -> None:
+        """
+        Remember the hash of the current text of a page for the rest of the
+        request
+
+        Keyword arguments:
+        page_title -- The title of the page
+        page_text -- The current text of the page
+        """
+        g.setdefault("page_text_hashes", {})[
+            page_title
+        ] = WikiTextService().get_page_text_hash(page_text)
+
+    def get_page_text_hash(self, page_title: str) -> str:
+        """
+        Get the hash of the normalised text of a page, from the revision
+        fetched during the request, or fetching the page when it wasn't
+
+        Keyword arguments:
+        page_title -- The title of the page
+
+        Raises:
+        MediaWikiServiceError -- Exception raised when handling wiki
+
+        Returns:
+        page_text_hash -- The hash of the normalised text of the page
+        """
+        page_text_hashes = g.setdefault("page_text_hashes", {})
+        if page_title not in page_text_hashes:
+            self.get_page_text(page_title)
+        return page_text_hashes[page_title]
+
+    @metrics.timed("mediawiki_fetch")
+    def get_pages_text(self, page_titles: list) -> dict:
+        """
+        Get the wikitext of the current revision of many pages with a
+        single query, following its continuations when MediaWiki truncates
+        the result. MediaWiki accepts up to 50 titles per query, or 500
+        for bots
+
+        Keyword arguments:
+        page_titles -- List with the titles of the pages
+
+        Raises:
+        MediaWikiServiceError -- Exception raised when handling wiki
+
+        Returns:
+        pages_text -- Dict with the text of each page by the requested
+                      title, which is None for pages that don't exist
+        """
+        params = {
+            "action": "query",
+            "maxlag": "5",
+            "prop": "revisions",
+            "rvprop": "content",
+            "rvslots": "main",
+            "format": "json",
+            "formatversion": "2",
+        }
+        requested_titles = {}
+        pages_text = {}
+        continue_params = {}
+        while True:
+            data = self.post_query(
+                {**params, **continue_params}, {"titles": "|".join(page_titles)}
+            )
+            if "error" in list(data.keys()):
+                raise MediaWikiServiceError(
+                    f"Error getting text from the pages. {data['error']['code']}"
+                )
+            requested_titles.update(
+                {
+                    normalized_title["to"]: normalized_title["from"]
+                    for normalized_title in data["query"].get("normalized", [])
+                }
+            )
+            for page in data["query"]["pages"]:
+                page_title = requested_titles.get(page["title"], page["title"])
+                if "revisions" in page:
+                    pages_text[page_title] = page["revisions"][0]["slots"]["main"][
+                        "content"
+                    ]
+                else:
+                    # The content of a page left out of a truncated result
+                    # comes in a following response
+                    pages_text.setdefault(page_title, None)
+            if "continue" not in data:
+                return pages_text
+            continue_params = data["continue"]
+
+    def post_query(self, params: dict, data: dict) -> dict:
+        """
+        Send a query to the wiki, waiting and retrying it while the wiki
+        rejects it because of the lag of its database replicas
+
+        Keyword arguments:
+        params -- Dict with the parameters of the query
+        data -- Dict with the form data of the query
+
+        Returns:
+        response -- Dict with the JSON response of the wiki
+        """
+        for retries in range(self.maxlag_retries + 1):
+            r = self.session.post(url=self.endpoint, params=params, data=data)
+            response = r.json()
+            if response.get("error", {}).get("code") != "maxlag":
+                break
+            if retries < self.maxlag_retries:
+                time.sleep(float(r.headers.get("Retry-After", 5)))
+        return response
+
+    @metrics.timed("mediawiki_fetch")
     def is_existing_page(self, page_title: str) -> str:
         """
         Get the page content of a page parsed as Wikitext
@@ -83,6 +207,7 @@ class MediaWikiService:
         else:
             return True
 
+    @metrics.timed("mediawiki_edit")
     def create_page(self, token: str, page_title: str, page_text: str) -> dict:
         """
         Create a new wiki page
@@ -119,8 +244,11 @@ class MediaWikiService:
                 f"Error creating the page '{page_title}'." " Page already exists"
             )
         else:
+            if "error" not in list(data.keys()):
+                self.set_page_text_hash(page_title, page_text)
             return data
 
+    @metrics.timed("mediawiki_edit")
     def edit_page(self, token: str, page_title: str, page_text: str) -> dict:
         """
         Edit a existing wiki page
@@ -157,8 +285,11 @@ class MediaWikiService:
                 f"Error editing the page '{page_title}'. Page does not exist"
             )
         else:
+            if "error" not in list(data.keys()):
+                self.set_page_text_hash(page_title, page_text)
             return data
 
+    @metrics.timed("mediawiki_move")
     def move_page(self, token: str, old_page: str, new_page: str):
         """
         Edit a existing wiki page
@@ -191,6 +322,9 @@ class MediaWikiService:
                 " Both pages have the same title."
             )
         else:
+            page_text_hashes = g.setdefault("page_text_hashes", {})
+            if "error" not in list(data.keys()) and old_page in page_text_hashes:
+                page_text_hashes[new_page] = page_text_hashes.pop(old_page)
             return data
 
     def is_redirect_page(self, page_text: str):
@@ -224,6 +358,7 @@ class MediaWikiService:
         else:
             return True
 
+    @metrics.timed("mediawiki_token")
     def get_token(self) -> str:
         """
         Get MediaWiki API Token for an active Session
@@ -262,6 +397,7 @@ class MediaWikiService:
         login_token = data["query"]["tokens"]["logintoken"]
         return login_token
 
+    @metrics.timed("mediawiki_login")
     def login(self) -> None:
         """
         Login into MediaWiki API
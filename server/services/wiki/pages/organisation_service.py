@@ -5,6 +5,7 @@ from server.services.wiki.wiki_text_service import WikiTextService
 from server.services.wiki.wiki_table_service import WikiTableService
 from server.services.wiki.wiki_section_service import WikiSectionService
 from server.models.serializers.document import OrganisationPageSchema
+from server.models.serializers.registry import schema_registry
 
 
 class OrganisationPageService(PageService):
@@ -133,20 +134,22 @@ class OrganisationPageService(PageService):
         document_data -- All required data for a project using
                          Organised Editing Guidelines
         """
-        mediawiki = MediaWikiService()
+        self.add_documents([document_data])
 
-        organisation_page_sections = self.document_to_page_sections(document_data)
+    def add_documents(self, documents: list) -> None:
+        """
+        Add the projects of many documents of the same organisation to the
+        organisation page with a single edit, creating the page if it
+        doesn't exist
 
-        sections_text = WikiTextService().generate_text_from_dict(
-            self.templates.page_template,
-            self.templates.page_initial_section,
-            organisation_page_sections,
-        )
-        updated_text = WikiTableService().add_table_row(
-            page_text=sections_text,
-            new_row=self.generate_projects_list_table_row(document_data),
-            table_section_title=self.templates.projects_section,
-            table_template=self.templates.table_template,
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+        """
+        mediawiki = MediaWikiService()
+        document_data = documents[0]
+        new_rows = "".join(
+            self.generate_projects_list_table_row(document) for document in documents
         )
 
         page_title = f"{self.templates.oeg_page}/{document_data['organisation']['name'].capitalize()}"
@@ -160,16 +163,69 @@ class OrganisationPageService(PageService):
             )
             updated_text = WikiTableService().add_table_row(
                 page_text=page_text,
-                new_row=self.generate_projects_list_table_row(document_data),
+                new_row=new_rows,
                 table_section_title=self.templates.projects_list_section,
                 table_template=organisation_page_table,
             )
             mediawiki.edit_page(token, page_title, updated_text)
         else:
-            mediawiki.create_page(token, page_title, updated_text)
+            mediawiki.create_page(token, page_title, self.generate_page_text(documents))
+
+    def generate_page_text(
+        self, documents: list, organisation_document: dict = None
+    ) -> str:
+        """
+        Generate the text of a new organisation page listing the projects
+        of many documents of the organisation
+
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+        organisation_document -- The document the organisation and platform
+                                 sections are generated from. The first
+                                 document if not set
+
+        Returns:
+        page_text -- Text of the organisation page
+        """
+        new_rows = "".join(
+            self.generate_projects_list_table_row(document) for document in documents
+        )
+        organisation_page_sections = self.document_to_page_sections(
+            organisation_document or documents[0]
+        )
+
+        sections_text = WikiTextService().generate_text_from_dict(
+            self.templates.page_template,
+            self.templates.page_initial_section,
+            organisation_page_sections,
+        )
+        return WikiTableService().add_table_row(
+            page_text=sections_text,
+            new_row=new_rows,
+            table_section_title=self.templates.projects_section,
+            table_template=self.templates.table_template,
+        )
 
     def enabled_to_report(self, document_data):
-        page_title = f"{self.templates.oeg_page}/{document_data['organisation']['name'].capitalize()}"
+        return bool(self.documents_to_report([document_data]))
+
+    def documents_to_report(self, documents: list) -> list:
+        """
+        Filter the documents whose project and platform are not listed in
+        the organisation page yet, keeping one document for each project and
+        platform. All documents must belong to the same organisation
+
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+
+        Returns:
+        documents_to_report -- List with the documents to add to the page
+        """
+        project_names = []
+        platform_names = []
+        page_title = f"{self.templates.oeg_page}/{documents[0]['organisation']['name'].capitalize()}"
         if MediaWikiService().is_existing_page(page_title):
             organisation_dictionary = self.wikitext_to_dict(page_title)
             serialized_organisation_page = self.parse_page_to_serializer(
@@ -186,15 +242,18 @@ class OrganisationPageService(PageService):
                 for platform_data in serialized_organisation_page["platform"]
             ]
 
+        documents_to_report = []
+        reported_projects = set()
+        for document_data in documents:
+            project_name = document_data["project"]["name"].capitalize()
+            platform_name = document_data["platform"]["name"]
             if (
-                document_data["project"]["name"].capitalize() in project_names
-                and document_data["platform"]["name"] in platform_names
-            ):
-                return False
-            else:
-                return True
-        else:
-            return True
+                project_name in project_names and platform_name in platform_names
+            ) or (project_name, platform_name) in reported_projects:
+                continue
+            reported_projects.add((project_name, platform_name))
+            documents_to_report.append(document_data)
+        return documents_to_report
 
     def parse_page_to_serializer(self, page_dictionary: dict) -> dict:
         """
@@ -241,7 +300,9 @@ class OrganisationPageService(PageService):
         ] = self.get_organisation_projects_platforms(projects_list_text)
 
         # Validate organisation page fields
-        document_schema = OrganisationPageSchema(partial=True, only=self.page_fields)
+        document_schema = schema_registry.get(
+            OrganisationPageSchema, only=self.page_fields, partial=True
+        )
         document_schema.load(current_organisation_page)
         return current_organisation_page
 
@@ -333,7 +394,6 @@ class OrganisationPageService(PageService):
         """
         # Get the text for the updated organisation page
         mediawiki = MediaWikiService()
-        token = mediawiki.get_token()
         page_title = (
             f"{self.templates.oeg_page}/"
             f"{current_organisation_page['organisation']['name'].capitalize()}"
@@ -353,10 +413,11 @@ class OrganisationPageService(PageService):
                 f"{self.templates.oeg_page}/"
                 f'{update_organisation_page["organisation"]["name"].capitalize()}'
             )
+            token = mediawiki.get_token()
             mediawiki.move_page(token=token, old_page=page_title, new_page=new_page)
-            mediawiki.edit_page(token, new_page, updated_text)
+            self.save_page(mediawiki, new_page, updated_text, token)
         else:
-            mediawiki.edit_page(token, page_title, updated_text)
+            self.save_page(mediawiki, page_title, updated_text)
 
     def get_update_table_fields(
         self, update_fields: dict, organisation_page_data: dict
@@ -5,6 +5,7 @@ from server.services.wiki.wiki_text_service import WikiTextService
 from server.services.wiki.wiki_table_service import WikiTableService
 from server.services.wiki.wiki_section_service import WikiSectionService
 from server.models.serializers.document import OverviewPageSchema
+from server.models.serializers.registry import schema_registry
 
 
 class OverviewPageService(PageService):
@@ -97,24 +98,24 @@ class OverviewPageService(PageService):
         document_data -- All required data for a project using
                          Organised Editing Guidelines
         """
+        self.add_documents([document_data])
+
+    def add_documents(self, documents: list) -> None:
+        """
+        Add the activities of many documents to the overview page with a
+        single edit, creating the page if it doesn't exist
+
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+        """
         mediawiki = MediaWikiService()
-        wikitext = WikiTextService()
         token = mediawiki.get_token()
 
         page_title = self.templates.oeg_page
-
-        overview_page_sections = self.document_to_page_sections(document_data)
-
-        sections_text = wikitext.generate_text_from_dict(
-            self.templates.page_template,
-            f"=={self.templates.page_initial_section}==",
-            overview_page_sections,
-        )
-        updated_text = WikiTableService().add_table_row(
-            page_text=sections_text,
-            new_row=self.generate_activities_list_table_row(document_data),
-            table_section_title=self.templates.activities_list_section_title,
-            table_template=self.templates.table_template,
+        new_rows = "".join(
+            self.generate_activities_list_table_row(document_data)
+            for document_data in documents
         )
         if mediawiki.is_existing_page(page_title):
             page_text = MediaWikiService().get_page_text(self.templates.oeg_page)
@@ -127,15 +128,62 @@ class OverviewPageService(PageService):
             )
             updated_text = WikiTableService().add_table_row(
                 page_text=page_text,
-                new_row=self.generate_activities_list_table_row(document_data),
+                new_row=new_rows,
                 table_section_title=self.templates.activities_list_section_title,
                 table_template=overview_page_table,
             )
             mediawiki.edit_page(token, self.templates.oeg_page, updated_text)
         else:
-            mediawiki.create_page(token, page_title, updated_text)
+            mediawiki.create_page(token, page_title, self.generate_page_text(documents))
+
+    def generate_page_text(self, documents: list) -> str:
+        """
+        Generate the text of a new overview page listing the activities
+        of many documents
+
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+
+        Returns:
+        page_text -- Text of the overview page
+        """
+        new_rows = "".join(
+            self.generate_activities_list_table_row(document_data)
+            for document_data in documents
+        )
+        overview_page_sections = self.document_to_page_sections(documents[0])
+
+        sections_text = WikiTextService().generate_text_from_dict(
+            self.templates.page_template,
+            f"=={self.templates.page_initial_section}==",
+            overview_page_sections,
+        )
+        return WikiTableService().add_table_row(
+            page_text=sections_text,
+            new_row=new_rows,
+            table_section_title=self.templates.activities_list_section_title,
+            table_template=self.templates.table_template,
+        )
 
     def enabled_to_report(self, document_data: dict):
+        return bool(self.documents_to_report([document_data]))
+
+    def documents_to_report(self, documents: list) -> list:
+        """
+        Filter the documents whose organisation and platform are not
+        listed in the overview page yet, keeping one document for each
+        organisation and platform
+
+        Keyword arguments:
+        documents -- List of documents with all required data for a
+                     project using Organised Editing Guidelines
+
+        Returns:
+        documents_to_report -- List with the documents to add to the page
+        """
+        organisation_names = []
+        platform_names = []
         if MediaWikiService().is_existing_page(self.templates.oeg_page):
             overview_dictionary = self.wikitext_to_dict(self.templates.oeg_page)
             serialized_overview_page = self.parse_page_to_serializer(
@@ -151,15 +199,19 @@ class OverviewPageService(PageService):
                 for platform_data in serialized_overview_page["platform"]
             ]
 
+        documents_to_report = []
+        reported_activities = set()
+        for document_data in documents:
+            organisation_name = document_data["organisation"]["name"].capitalize()
+            platform_name = document_data["platform"]["name"]
             if (
-                document_data["organisation"]["name"].capitalize() in organisation_names
-                and document_data["platform"]["name"] in platform_names
-            ):
-                return False
-            else:
-                return True
-        else:
-            return True
+                organisation_name in organisation_names
+                and platform_name in platform_names
+            ) or (organisation_name, platform_name) in reported_activities:
+                continue
+            reported_activities.add((organisation_name, platform_name))
+            documents_to_report.append(document_data)
+        return documents_to_report
 
     def edit_page_text(
         self, update_fields: dict, overview_page_data: dict, document_data: dict
@@ -189,12 +241,11 @@ class OverviewPageService(PageService):
         self, document_data: dict, update_fields: dict, overview_page_data: dict
     ):
         mediawiki = MediaWikiService()
-        token = mediawiki.get_token()
 
         updated_text = self.edit_page_text(
             update_fields, overview_page_data, document_data
         )
-        mediawiki.edit_page(token, self.templates.oeg_page, updated_text)
+        self.save_page(mediawiki, self.templates.oeg_page, updated_text)
 
     def table_field_updated(self, update_fields: dict, overview_page_data: dict):
         if "platform" in update_fields.keys():
@@ -338,7 +389,7 @@ class OverviewPageService(PageService):
         overview_page_data["platform"] = platform_list
 
         # Validate
-        overview_page_schema = OverviewPageSchema(partial=True)
+        overview_page_schema = schema_registry.get(OverviewPageSchema, partial=True)
         overview_page_schema.load(overview_page_data)
 
         return overview_page_data
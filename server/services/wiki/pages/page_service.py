@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 
-from server.models.serializers.document import DocumentSchema
+from server.services.metrics_service import metrics
 from server.services.wiki.mediawiki_service import MediaWikiService
 from server.services.wiki.wiki_section_service import WikiSectionService
+from server.services.wiki.wiki_text_service import WikiTextService
 
 
 class PageService(ABC):
+    @metrics.timed("wiki_render")
     def document_to_page_sections(self, document_data: dict) -> dict:
         """
         Generate dict containing the document content
@@ -14,7 +16,8 @@ class PageService(ABC):
 
         Keyword arguments:
         document_data -- All required data for a project using
-                         Organised Editing Guidelines
+                         Organised Editing Guidelines, already
+                         deserialised by DocumentSchema
 
         Returns:
         page_sections_data -- Dictionary containing the document
@@ -24,14 +27,62 @@ class PageService(ABC):
         # Filter page data from document data
         page_data = self.filter_page_data(document_data)
 
-        # Serialize document with page content
-        document_schema = DocumentSchema(only=self.page_fields)
-        serialized_page_data = document_schema.load(page_data)
-
         # Generate page sections dictionary
-        page_sections_data = self.generate_page_sections_dict(serialized_page_data)
+        page_sections_data = self.generate_page_sections_dict(page_data)
         return page_sections_data
 
+    def is_page_updated(self, changed_fields: list) -> bool:
+        """
+        Check if any of the changed fields of a document is shown in the page
+
+        Keyword arguments:
+        changed_fields -- List with the dotted paths of the changed fields
+
+        Returns:
+        bool -- Boolean indicating if the page must be edited
+        """
+        return any(
+            changed_field == page_field
+            or page_field.startswith(f"{changed_field}.")
+            or changed_field.startswith(f"{page_field}.")
+            for changed_field in changed_fields
+            for page_field in self.page_fields
+        )
+
+    def save_page(
+        self,
+        mediawiki: MediaWikiService,
+        page_title: str,
+        page_text: str,
+        token: str = None,
+    ) -> bool:
+        """
+        Edit a page, unless the hash of the normalised text is the same as
+        the hash of the current revision, as the edit would only add a null
+        revision. The token is only requested when the page is edited
+
+        Keyword arguments:
+        mediawiki -- The MediaWiki service of the request
+        page_title -- The title of the page
+        page_text -- The new text of the page
+        token -- The MediaWiki API token, if it was already requested
+
+        Raises:
+        MediaWikiServiceError -- Exception raised when handling wiki
+
+        Returns:
+        bool -- Boolean indicating if the page was edited
+        """
+        if mediawiki.get_page_text_hash(
+            page_title
+        ) == WikiTextService().get_page_text_hash(page_text):
+            metrics.increment(metrics.wiki_page_edits, ("skipped",))
+            return False
+        mediawiki.edit_page(token or mediawiki.get_token(), page_title, page_text)
+        metrics.increment(metrics.wiki_page_edits, ("edited",))
+        return True
+
+    @metrics.timed("wiki_read_page")
     def wikitext_to_dict(self, page_title: str):
         mediawiki = MediaWikiService()
         text = mediawiki.get_page_text(page_title)
@@ -50,6 +101,7 @@ class PageService(ABC):
             else:
                 return page_sections_dict
 
+    @metrics.timed("wiki_parse")
     def generate_sections_dict(self, sections):
         page_sections_dict = {}
         for section in sections:
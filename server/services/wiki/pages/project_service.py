@@ -7,6 +7,7 @@ from server.services.wiki.mediawiki_service import MediaWikiService
 from server.services.wiki.wiki_text_service import WikiTextService
 from server.services.wiki.wiki_table_service import WikiTableService
 from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
 
 
 class ProjectPageService(PageService):
@@ -41,20 +42,20 @@ class ProjectPageService(PageService):
         """
         project_page_data = {
             "project": {
-                "projectId": document_data["project"]["projectId"],
+                "project_id": document_data["project"]["project_id"],
                 "name": document_data["project"]["name"],
-                "shortDescription": document_data["project"]["shortDescription"],
+                "short_description": document_data["project"]["short_description"],
                 "created": document_data["project"]["created"],
-                "changesetComment": document_data["project"]["changesetComment"],
-                "externalSource": {
-                    "instructions": document_data["project"]["externalSource"][
+                "changeset_comment": document_data["project"]["changeset_comment"],
+                "external_source": {
+                    "instructions": document_data["project"]["external_source"][
                         "instructions"
                     ],
-                    "perTaskInstructions": document_data["project"]["externalSource"][
-                        "perTaskInstructions"
-                    ],
-                    "imagery": document_data["project"]["externalSource"]["imagery"],
-                    "license": document_data["project"]["externalSource"]["license"],
+                    "per_task_instructions": document_data["project"][
+                        "external_source"
+                    ]["per_task_instructions"],
+                    "imagery": document_data["project"]["external_source"]["imagery"],
+                    "license": document_data["project"]["external_source"]["license"],
                 },
                 "url": document_data["project"]["url"],
                 "users": document_data["project"]["users"],
@@ -113,21 +114,20 @@ class ProjectPageService(PageService):
         users = project_page_data["project"]["users"]
         project_users = ""
         for user in users:
-            project_users += f"\n| {user['userId']}\n| {user['userName']}\n|-"
+            project_users += f"\n| {user['user_id']}\n| {user['user_name']}\n|-"
         return project_users
 
-    def create_page(self, document_data: dict) -> None:
+    def generate_page_text(self, document_data: dict) -> str:
         """
-        Creates a wiki page
+        Generate the text of the project page of a document
 
         Keyword arguments:
         document_data -- All required data for a project using
                          Organised Editing Guidelines
-        """
-        mediawiki = MediaWikiService()
-
-        token = mediawiki.get_token()
 
+        Returns:
+        page_text -- Text of the project page
+        """
         project_page_sections = self.document_to_page_sections(document_data)
 
         sections_text = WikiTextService().generate_text_from_dict(
@@ -135,18 +135,35 @@ class ProjectPageService(PageService):
             f"=={self.templates.page_initial_section}==",
             project_page_sections,
         )
-        updated_text = WikiTableService().add_table_row(
+        return WikiTableService().add_table_row(
             page_text=sections_text,
             new_row=self.get_project_users_table_rows(document_data),
             table_section_title=self.templates.team_user_section,
             table_template=self.templates.table_template,
         )
 
+    def create_page(self, document_data: dict) -> None:
+        """
+        Creates a wiki page
+
+        Keyword arguments:
+        document_data -- All required data for a project using
+                         Organised Editing Guidelines
+        """
+        mediawiki = MediaWikiService()
+
+        updated_text = self.generate_page_text(document_data)
+
         page_title = (
             f"{self.templates.oeg_page}/Projects/"
             f'{document_data["project"]["name"].capitalize()}'
         )
         if mediawiki.is_existing_page(page_title):
+            if mediawiki.get_page_text_hash(
+                page_title
+            ) == WikiTextService().get_page_text_hash(updated_text):
+                # Created by an earlier attempt of the same report
+                return
             raise ValueError(
                 "Error reporting project "
                 f"'{document_data['project']['name'].capitalize()}'."
@@ -154,7 +171,9 @@ class ProjectPageService(PageService):
             )
         else:
             mediawiki.create_page(
-                token=token, page_title=page_title, page_text=updated_text,
+                token=mediawiki.get_token(),
+                page_title=page_title,
+                page_text=updated_text,
             )
 
     def edit_page(
@@ -168,25 +187,12 @@ class ProjectPageService(PageService):
                          Organised Editing Guidelines
         """
         mediawiki = MediaWikiService()
-        token = mediawiki.get_token()
         page_title = (
             f"{self.templates.oeg_page}/Projects/"
             f'{project_page_data["project"]["name"].capitalize()}'
         )
 
-        project_page_sections = self.document_to_page_sections(document_data)
-
-        sections_text = WikiTextService().generate_text_from_dict(
-            self.templates.page_template,
-            f"=={self.templates.page_initial_section}==",
-            project_page_sections,
-        )
-        updated_text = WikiTableService().add_table_row(
-            page_text=sections_text,
-            new_row=self.get_project_users_table_rows(document_data),
-            table_section_title=self.templates.team_user_section,
-            table_template=self.templates.table_template,
-        )
+        updated_text = self.generate_page_text(document_data)
 
         if (
             "project" in update_fields.keys()
@@ -198,10 +204,11 @@ class ProjectPageService(PageService):
                 f"{self.templates.oeg_page}/Projects/"
                 f'{document_data["project"]["name"].capitalize()}'
             )
+            token = mediawiki.get_token()
             mediawiki.move_page(token=token, old_page=page_title, new_page=new_page)
-            mediawiki.edit_page(token, new_page, updated_text)
+            self.save_page(mediawiki, new_page, updated_text, token)
         else:
-            mediawiki.edit_page(token, page_title, updated_text)
+            self.save_page(mediawiki, page_title, updated_text)
 
     def parse_page_to_serializer(self, page_dictionary: dict, project_name: str):
         project_page_data = {"project": {"externalSource": {}}}
@@ -258,7 +265,9 @@ class ProjectPageService(PageService):
             ]
         )
         # validate
-        document_schema = DocumentSchema(partial=True, only=self.page_fields)
+        document_schema = schema_registry.get(
+            DocumentSchema, only=self.page_fields, partial=True
+        )
         document_schema.load(project_page_data)
         return project_page_data
 
@@ -2,12 +2,27 @@ from server.services.wiki.pages.organisation_service import OrganisationPageServ
 from server.services.wiki.pages.project_service import ProjectPageService
 from server.services.wiki.pages.overview_service import OverviewPageService
 from server.services.utils import update_document
+from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
 
 
 def generate_document_data_from_wiki_pages(
-    organisation_name: str, project_name: str, update_fields: str
+    organisation_name: str, project_name: str, update_fields: dict
 ):
     """
+    Generate the current and the updated document of a project
+    from the content of its wiki pages
+
+    Keyword arguments:
+    organisation_name -- The name of the organisation of the project
+    project_name -- The name of the project
+    update_fields -- The fields of the document being updated,
+                     already deserialised by DocumentSchema
+
+    Returns:
+    updated_document -- The deserialised updated document
+    document -- The deserialised current document
+    changed_fields -- List with the dotted paths of the changed fields
     """
     overview_page = OverviewPageService()
     overview_dictionary = overview_page.wikitext_to_dict(
@@ -15,6 +30,28 @@ def generate_document_data_from_wiki_pages(
     )
     overview_page.parse_page_to_serializer(overview_dictionary)
 
+    document = get_document_from_wiki_pages(organisation_name, project_name)
+    updated_document, changed_fields = update_document(document, update_fields)
+    return updated_document, document, changed_fields
+
+
+def get_document_from_wiki_pages(organisation_name: str, project_name: str):
+    """
+    Generate the document of a project from the content of its
+    organisation and project wiki pages
+
+    Keyword arguments:
+    organisation_name -- The name of the organisation of the project
+    project_name -- The name of the project
+
+    Raises:
+    ValueError -- Raised when the project does not belong to the organisation
+                  or a page can't be parsed
+    MediaWikiServiceError -- Raised when a page doesn't exist
+
+    Returns:
+    document -- The deserialised document
+    """
     organisation_page = OrganisationPageService()
     organisation_dictionary = organisation_page.wikitext_to_dict(
         f"{organisation_page.templates.oeg_page}/{organisation_name.capitalize()}"
@@ -52,5 +89,4 @@ def generate_document_data_from_wiki_pages(
             f"Error editing project '{project_page_data['project']['name'].capitalize()}'."
             f" Project does not belong to the organisation '{document['organisation']['name']}'."
         )
-    updated_document = update_document(document, update_fields)
-    return updated_document, document
+    return schema_registry.get(DocumentSchema, partial=True).load(document)
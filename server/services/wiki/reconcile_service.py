@@ -0,0 +1,244 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from marshmallow import ValidationError
+
+from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import schema_registry
+from server.services.git.file_service import FileService, FileServiceError
+from server.services.git.layout_service import LayoutService
+from server.services.wiki.mediawiki_service import (
+    MediaWikiService,
+    MediaWikiServiceError,
+)
+from server.services.wiki.pages.organisation_service import OrganisationPageService
+from server.services.wiki.pages.overview_service import OverviewPageService
+from server.services.wiki.pages.project_service import ProjectPageService
+from server.services.wiki.wiki_text_service import WikiTextService
+
+
+class WikiReconcileService:
+    """
+    Bring the wiki pages in line with the project documents of the report
+    repository. The overview, organisation and project pages expected from
+    the documents are generated, the current pages are fetched in batches of
+    WIKI_RECONCILE_BATCH_SIZE titles, and only the pages whose normalised
+    text differs are created or edited, by a pool of WIKI_BULK_WORKERS
+    threads.
+
+    Documents are taken in the order their projects were created. When
+    several documents generate the same row or page the first one is kept,
+    as a report doesn't add a project that is already in the wiki, and as
+    each report adds its rows at the top of the tables, the rows are listed
+    from the last created project
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = None):
+        self.yaml_files_dir = f"{current_app.config['REPORT_FILE_DIR']}/github_files"
+        self.workers = workers or current_app.config["WIKI_BULK_WORKERS"]
+        self.batch_size = batch_size or current_app.config["WIKI_RECONCILE_BATCH_SIZE"]
+        self.overview_page = OverviewPageService()
+        self.organisation_page = OrganisationPageService()
+        self.project_page = ProjectPageService()
+
+    def load_documents(self) -> tuple:
+        """
+        Load the documents of every project file of the report repository
+
+        Returns:
+        documents -- List of the deserialised documents, sorted by the
+                     creation date of their projects
+        skipped_files -- Dict with the error of each project file that
+                         couldn't be loaded, by path
+        """
+        documents = []
+        skipped_files = {}
+        document_schema = schema_registry.get(DocumentSchema)
+        for _, _, file_path in LayoutService(self.yaml_files_dir).get_project_files():
+            try:
+                documents.append(
+                    document_schema.load(
+                        FileService.yaml_to_dict(FileService.get_content(file_path))
+                    )
+                )
+            except (FileServiceError, ValidationError, TypeError) as e:
+                skipped_files[file_path] = str(e)
+        documents.sort(
+            key=lambda document: (
+                document["project"]["created"],
+                document["project"]["project_id"],
+            )
+        )
+        return documents, skipped_files
+
+    def generate_pages(self, documents: list) -> dict:
+        """
+        Generate the text of the overview, organisation and project pages
+        of the documents
+
+        Keyword arguments:
+        documents -- List of the deserialised documents, sorted by the
+                     creation date of their projects
+
+        Returns:
+        pages -- Dict with the text of each page by title
+        """
+        pages = {}
+        if not documents:
+            return pages
+
+        activities = {}
+        organisations = {}
+        projects = {}
+        for document in documents:
+            organisation_name = document["organisation"]["name"].capitalize()
+            project_name = document["project"]["name"].capitalize()
+            platform_name = document["platform"]["name"]
+            activities.setdefault((organisation_name, platform_name), document)
+            organisations.setdefault(organisation_name, {}).setdefault(
+                (project_name, platform_name), document
+            )
+            projects.setdefault(project_name, document)
+
+        oeg_page = self.overview_page.templates.oeg_page
+        pages[oeg_page] = self.overview_page.generate_page_text(
+            list(activities.values())[::-1]
+        )
+        for organisation_name, organisation_projects in organisations.items():
+            organisation_documents = list(organisation_projects.values())
+            pages[
+                f"{oeg_page}/{organisation_name}"
+            ] = self.organisation_page.generate_page_text(
+                organisation_documents[::-1], organisation_documents[0]
+            )
+        for project_name, document in projects.items():
+            pages[
+                f"{oeg_page}/Projects/{project_name}"
+            ] = self.project_page.generate_page_text(document)
+        return pages
+
+    def fetch_pages(self, page_titles: list) -> dict:
+        """
+        Fetch the current text of the pages in batches of titles
+
+        Keyword arguments:
+        page_titles -- List with the titles of the pages
+
+        Returns:
+        pages_text -- Dict with the text of each page by title, which is
+                      None for pages that don't exist
+        """
+        mediawiki = MediaWikiService()
+        pages_text = {}
+        for start in range(0, len(page_titles), self.batch_size):
+            pages_text.update(
+                mediawiki.get_pages_text(page_titles[start : start + self.batch_size])
+            )
+        return pages_text
+
+    def get_changed_pages(self, pages: dict, pages_text: dict) -> tuple:
+        """
+        Compare the expected pages with their current text
+
+        Keyword arguments:
+        pages -- Dict with the expected text of each page by title
+        pages_text -- Dict with the current text of each page by title
+
+        Returns:
+        created_pages -- List with the titles of the missing pages
+        edited_pages -- List with the titles of the pages whose text differs
+        """
+        wikitext = WikiTextService()
+        created_pages = []
+        edited_pages = []
+        for page_title, page_text in pages.items():
+            current_text = pages_text.get(page_title)
+            if current_text is None:
+                created_pages.append(page_title)
+            elif wikitext.normalise_page_text(
+                current_text
+            ) != wikitext.normalise_page_text(page_text):
+                edited_pages.append(page_title)
+        return created_pages, edited_pages
+
+    def write_pages(self, pages: dict, created_pages: list, edited_pages: list) -> dict:
+        """
+        Create and edit the pages with a pool of threads. Each thread logs in
+        to the wiki once
+
+        Keyword arguments:
+        pages -- Dict with the expected text of each page by title
+        created_pages -- List with the titles of the pages being created
+        edited_pages -- List with the titles of the pages being edited
+
+        Returns:
+        failed_pages -- Dict with the error of each page that failed, by title
+        """
+        app = current_app._get_current_object()
+        local = threading.local()
+
+        def write_page(page: tuple) -> tuple:
+            page_title, created = page
+            with app.app_context():
+                try:
+                    if not hasattr(local, "mediawiki"):
+                        local.mediawiki = MediaWikiService()
+                        local.token = local.mediawiki.get_token()
+                    if created:
+                        data = local.mediawiki.create_page(
+                            local.token, page_title, pages[page_title]
+                        )
+                    else:
+                        data = local.mediawiki.edit_page(
+                            local.token, page_title, pages[page_title]
+                        )
+                    # Most API errors are returned instead of raised
+                    if "error" in data:
+                        error = data["error"]
+                        raise MediaWikiServiceError(
+                            f"{error.get('code')}: {error.get('info', '')}"
+                        )
+                    return page_title, None
+                except Exception as e:
+                    app.logger.error(f"Error reconciling page '{page_title}': {e}")
+                    return page_title, str(e)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(
+                write_page,
+                [(page_title, True) for page_title in created_pages]
+                + [(page_title, False) for page_title in edited_pages],
+            )
+            return {page_title: error for page_title, error in results if error}
+
+    def reconcile(self, dry_run: bool = False) -> dict:
+        """
+        Create and edit the wiki pages that differ from the pages expected
+        from the documents of the report repository
+
+        Keyword arguments:
+        dry_run -- If True, the changed pages are found but not written
+
+        Returns:
+        result -- Dict with the numbers of documents and pages, the
+                  titles of the created and edited pages, and the errors
+                  of the skipped project files and of the failed pages
+        """
+        documents, skipped_files = self.load_documents()
+        pages = self.generate_pages(documents)
+        pages_text = self.fetch_pages(list(pages))
+        created_pages, edited_pages = self.get_changed_pages(pages, pages_text)
+        failed_pages = {}
+        if not dry_run:
+            failed_pages = self.write_pages(pages, created_pages, edited_pages)
+        return {
+            "documents": len(documents),
+            "skipped_files": skipped_files,
+            "pages": len(pages),
+            "unchanged_pages": len(pages) - len(created_pages) - len(edited_pages),
+            "created_pages": created_pages,
+            "edited_pages": edited_pages,
+            "failed_pages": failed_pages,
+        }
@@ -1,7 +1,13 @@
 import re
+from collections import namedtuple
 
 import wikitextparser as wtp
 
+TemplateSection = namedtuple("TemplateSection", ["title", "level"])
+
+# Sections of the compiled page templates, by template text
+compiled_templates = {}
+
 
 class WikiSectionService:
     def get_sections(self, text: str) -> list:
@@ -20,6 +26,42 @@ class WikiSectionService:
         sections = wtp_text.sections
         return sections
 
+    def compile_template(self, template_text: str) -> tuple:
+        """
+        Parse the sections of a page template once, so pages generated
+        from the template don't parse it again
+
+        Keyword arguments:
+        template_text -- The text of the page template
+
+        Returns:
+        sections -- Tuple with the title and level of each section
+        """
+        sections = compiled_templates.get(template_text)
+        if sections is None:
+            sections = tuple(
+                TemplateSection(section.title, section.level)
+                for section in self.get_sections(template_text)
+            )
+            compiled_templates[template_text] = sections
+        return sections
+
+    def get_template_sections(self, template_text: str):
+        """
+        Returns the sections of a text used as template, from the
+        compiled templates when the text is a compiled template
+
+        Keyword arguments:
+        template_text -- Text used as template
+
+        Returns:
+        sections -- list with all sections
+        """
+        sections = compiled_templates.get(template_text)
+        if sections is None:
+            return self.get_sections(template_text)
+        return sections
+
     def get_section_index(self, text, section_title: str) -> int:
         """
         Get the index of a section in a wiki page
@@ -2,6 +2,7 @@ import re
 
 import wikitextparser as wtp
 
+from server.services.metrics_service import metrics
 from server.services.wiki.wiki_section_service import WikiSectionService
 
 
@@ -24,6 +25,7 @@ class WikiTableService:
         table_column_numbers = len(table_row)
         return table_column_numbers
 
+    @metrics.timed("wiki_table")
     def add_table_row(
         self,
         page_text: str,
@@ -61,6 +63,7 @@ class WikiTableService:
         wtp_page_text.string = page_text[0:text_before_table_index] + updated_table
         return wtp_page_text.string
 
+    @metrics.timed("wiki_table")
     def edit_table(
         self,
         table: str,
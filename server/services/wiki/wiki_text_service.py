@@ -1,3 +1,4 @@
+import hashlib
 import re
 from datetime import datetime
 
@@ -22,7 +23,7 @@ class WikiTextService:
         updated_text -- Text formatted with wikitext syntax
         """
         section_obj = WikiSectionService()
-        sections = section_obj.get_sections(template_text)
+        sections = section_obj.get_template_sections(template_text)
         updated_text = f"{page_initial_section}\n"
 
         for section in sections:
@@ -114,6 +115,36 @@ class WikiTextService:
             current_app.logger.debug("Error parsing date")
             raise ValueError("Error parsing date")
 
+    def normalise_page_text(self, page_text: str) -> str:
+        """
+        Normalise the text of a page for comparison, as the pre-save
+        transform of MediaWiki does: line endings are converted to "\n" and
+        the whitespace at the end of the page is removed. Whitespace at the
+        end of the other lines is kept in the saved text
+
+        Keyword arguments:
+        page_text -- The text of the page
+
+        Returns:
+        normalised_text -- The normalised text of the page
+        """
+        return page_text.replace("\r\n", "\n").rstrip()
+
+    def get_page_text_hash(self, page_text: str) -> str:
+        """
+        Hash the normalised text of a page, which is the same for texts
+        that MediaWiki saves as the same revision text
+
+        Keyword arguments:
+        page_text -- The text of the page
+
+        Returns:
+        page_text_hash -- The hexadecimal SHA-1 of the normalised text
+        """
+        return hashlib.sha1(
+            self.normalise_page_text(page_text).encode("utf-8")
+        ).hexdigest()
+
     def get_page_link_and_text_from_external_hyperlink(self, hyperlink: str) -> tuple:
         url, name = re.search(
             r"([^\s]+)\s(.*)",
@@ -6,7 +6,7 @@ from server import create_app
 
 class BaseTestCase(TestCase):
     def setUp(self):
-        self.app = create_app()
+        self.app = create_app(background_threads=False)
         self.app.testing = True
         self.app_context = self.app.test_request_context()
         self.app_context.push()
@@ -1,7 +1,13 @@
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
 from flask import Flask
 
 import server
 from server.tests.base_test_config import BaseTestCase
+from server.services.jobs.worker_pool import job_workers
 
 
 class TestFlaskApp(BaseTestCase):
@@ -13,3 +19,48 @@ class TestFlaskApp(BaseTestCase):
 
     def test_create_app_must_return_flask_app(self):
         self.assertIsInstance(server.create_app(), Flask)
+
+    def test_background_threads_start_after_fork(self):
+        with tempfile.TemporaryDirectory() as queue_dir:
+            self.app.config.update(
+                {"JOB_QUEUE_FILE": f"{queue_dir}/jobs.sqlite", "JOB_WORKERS": 1}
+            )
+            job_workers.init_app(self.app)
+            with patch.object(self.app, "before_request"):
+                server.start_background_threads_after_fork(self.app)
+            self.assertEqual([], job_workers.threads)
+
+            # Processes forked by the workers don't start them
+            with patch("server.os.getppid", return_value=0):
+                server.start_background_threads_in_worker()
+            self.assertEqual([], job_workers.threads)
+            try:
+                with patch("server.os.getppid", return_value=os.getpid()):
+                    server.start_background_threads_in_worker()
+                    server.start_background_threads_in_worker()
+                self.assertEqual(1, len(job_workers.threads))
+                self.assertTrue(job_workers.threads[0].is_alive())
+            finally:
+                job_workers.stop()
+                server.preloaded_pid = None
+
+    def test_background_threads_start_once(self):
+        with tempfile.TemporaryDirectory() as queue_dir:
+            self.app.config.update(
+                {"JOB_QUEUE_FILE": f"{queue_dir}/jobs.sqlite", "JOB_WORKERS": 2}
+            )
+            job_workers.init_app(self.app)
+            try:
+                threads = [threading.Thread(target=job_workers.start) for _ in range(4)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                self.assertEqual(2, len(job_workers.threads))
+            finally:
+                job_workers.stop()
+
+    def test_commands_dont_start_background_threads(self):
+        with patch("server.start_background_threads") as mocked_start:
+            server.create_app(background_threads=False)
+        mocked_start.assert_not_called()
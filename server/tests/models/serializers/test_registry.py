@@ -0,0 +1,31 @@
+from server.tests.base_test_config import BaseTestCase
+from server.models.serializers.document import DocumentSchema
+from server.models.serializers.registry import SchemaRegistry
+
+
+class TestSchemaRegistry(BaseTestCase):
+    def test_schema_is_built_once(self):
+        schema_registry = SchemaRegistry()
+        schema = schema_registry.get(
+            DocumentSchema, only=["project.name", "organisation.name"]
+        )
+
+        self.assertIsInstance(schema, DocumentSchema)
+        self.assertIs(
+            schema,
+            schema_registry.get(
+                DocumentSchema, only=["organisation.name", "project.name"]
+            ),
+        )
+
+    def test_schema_options(self):
+        schema_registry = SchemaRegistry()
+        schema = schema_registry.get(DocumentSchema, only=["project.name"])
+        partial_schema = schema_registry.get(
+            DocumentSchema, only=["project.name"], partial=True
+        )
+
+        self.assertIsNot(schema, partial_schema)
+        self.assertFalse(schema.partial)
+        self.assertTrue(partial_schema.partial)
+        self.assertEqual({"project"}, set(schema.fields))
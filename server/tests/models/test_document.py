@@ -0,0 +1,64 @@
+from server.tests.base_test_config import BaseTestCase
+from server.tests.helpers import utils
+from server.models.document import Document, ExternalSource, Project
+from server.models.serializers.document import DocumentSchema
+
+
+class TestDocument(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = DocumentSchema().load(utils.document_data)
+
+    def test_document_is_loaded_as_model(self):
+        self.assertIsInstance(self.document, Document)
+        self.assertIsInstance(self.document.project, Project)
+        self.assertFalse(hasattr(self.document.project, "__dict__"))
+        self.assertEqual(
+            self.document.project.name, self.document["project"]["name"]
+        )
+
+    def test_to_json(self):
+        self.assertEqual(
+            DocumentSchema().dump(self.document), self.document.to_json()
+        )
+        self.assertEqual(utils.document_data, self.document.to_json())
+
+    def test_partial_document(self):
+        document = DocumentSchema(partial=True).load(
+            {"project": {"name": "project name"}}
+        )
+
+        self.assertEqual({"project"}, document.keys())
+        self.assertNotIn("organisation", document)
+        self.assertEqual({"project": {"name": "project name"}}, document.to_json())
+
+    def test_merge_patch_does_not_modify_document(self):
+        document = Document(
+            project=Project(name="project name", external_source=ExternalSource())
+        )
+        update_fields = Document(
+            project=Project(
+                name="updated name", external_source=ExternalSource(license="new")
+            )
+        )
+
+        updated_document, changed_fields = document.merge_patch(update_fields)
+        self.assertEqual("project name", document.project.name)
+        self.assertEqual({}, document.project.external_source)
+        self.assertEqual("updated name", updated_document.project.name)
+        self.assertEqual({"license": "new"}, updated_document.project.external_source)
+        self.assertEqual(
+            ["project.name", "project.external_source.license"], changed_fields
+        )
+
+    def test_merge_patch_shares_unchanged_fields(self):
+        updated_document, changed_fields = self.document.merge_patch(
+            Document(project=Project(name="updated name"))
+        )
+
+        self.assertIsNot(self.document.project, updated_document.project)
+        self.assertIs(self.document.organisation, updated_document.organisation)
+        self.assertIs(
+            self.document.project.external_source,
+            updated_document.project.external_source,
+        )
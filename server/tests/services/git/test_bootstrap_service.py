@@ -0,0 +1,98 @@
+import copy
+import os
+import tempfile
+from unittest.mock import patch
+
+import git
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.bootstrap_service import RepositoryBootstrapService
+from server.services.git.git_features import get_sparse_options
+from server.services.git.git_service import GitService
+from server.models.serializers.document import DocumentSchema
+from server.tests.helpers import utils
+
+
+class TestRepositoryBootstrapService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.remote_dir = f"{self.temp_dir.name}/remote"
+        self.report_file_dir = f"{self.temp_dir.name}/report_files_repository"
+
+        remote = git.Repo.init(self.remote_dir)
+        remote.git.config("uploadpack.allowFilter", "true")
+        for organisation_dir in ["github_files/TM/HOT", "github_files/TM/OSM"]:
+            os.makedirs(f"{self.remote_dir}/{organisation_dir}")
+            with open(f"{self.remote_dir}/{organisation_dir}/project_1.yaml", "w") as f:
+                f.write("project:\n  projectId: 1\n")
+        with open(f"{self.remote_dir}/github_files/layout.yaml", "w") as f:
+            f.write("layout: flat\n")
+        remote.git.add("--all")
+        remote.index.commit("Add projects")
+        self.branch = remote.active_branch.name
+
+        self.app.config.update(
+            {
+                "REPORT_FILE_DIR": self.report_file_dir,
+                "REPORT_REPOSITORY_URL": f"file://{self.remote_dir}",
+                "REPORT_REPOSITORY_BRANCH": self.branch,
+                "REPORT_CLONE_FILTER": "blob:none",
+                "REPORT_CLONE_DEPTH": 1,
+                "REPORT_SPARSE_CHECKOUT_DIRS": ["github_files/TM/HOT"],
+            }
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_bootstrap_without_repository_url(self):
+        self.app.config["REPORT_REPOSITORY_URL"] = None
+
+        self.assertFalse(RepositoryBootstrapService(self.app).bootstrap())
+        self.assertFalse(os.path.exists(self.report_file_dir))
+
+    def test_bootstrap_checks_out_sparse_dirs(self):
+        self.assertTrue(RepositoryBootstrapService(self.app).bootstrap())
+
+        repo = git.Repo(self.report_file_dir)
+        self.assertEqual(self.branch, repo.active_branch.name)
+        self.assertTrue(
+            os.path.isfile(f"{self.report_file_dir}/github_files/TM/HOT/project_1.yaml")
+        )
+        self.assertTrue(os.path.isfile(f"{self.report_file_dir}/github_files/layout.yaml"))
+        self.assertFalse(os.path.exists(f"{self.report_file_dir}/github_files/TM/OSM"))
+        self.assertEqual([], [d for d in os.listdir(self.temp_dir.name) if d.startswith(".")])
+
+    @patch(
+        "server.services.git.bootstrap_service.get_git_version",
+        return_value=(2, 20, 1),
+    )
+    def test_bootstrap_without_sparse_checkout_support(self, mocked_git_version):
+        self.assertTrue(RepositoryBootstrapService(self.app).bootstrap())
+
+        repo = git.Repo(self.report_file_dir)
+        self.assertTrue(os.path.exists(f"{self.report_file_dir}/github_files/TM/OSM"))
+        self.assertEqual([], get_sparse_options(repo))
+
+    def test_bootstrap_with_existing_clone(self):
+        self.assertTrue(RepositoryBootstrapService(self.app).bootstrap())
+        self.assertFalse(RepositoryBootstrapService(self.app).bootstrap())
+
+    @patch("server.services.git.git_service.PushService")
+    def test_create_document_outside_sparse_dirs(self, mocked_push_service):
+        self.assertTrue(RepositoryBootstrapService(self.app).bootstrap())
+        document_data = copy.deepcopy(utils.document_data)
+        document_data["organisation"]["name"] = "New"
+        document_data["project"]["projectId"] = 2
+        document = DocumentSchema().load(document_data)
+
+        GitService("TM", "New", 2).create_document(document)
+
+        repo = git.Repo(self.report_file_dir)
+        self.assertEqual(["--sparse"], get_sparse_options(repo))
+        self.assertIn(
+            "github_files/TM/New/project_2.yaml",
+            [item.path for item in repo.head.commit.tree.traverse()],
+        )
+        mocked_push_service.return_value.push.assert_called_once()
@@ -0,0 +1,169 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import git
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.bulk_service import GitBulkService
+from server.services.git.index_service import ProjectIndexService
+from server.services.git.layout_service import LayoutService
+from server.models.serializers.document import DocumentSchema
+from server.tests.helpers import utils
+
+
+@patch("server.services.git.bulk_service.git.Repo")
+class TestGitBulkService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = DocumentSchema().load(utils.document_data)
+
+    @patch("server.services.git.git_service.FileService.create_file")
+    def test_files_are_staged_when_committed(self, mocked_create_file, mocked_repo):
+        bulk_report = GitBulkService()
+        for project_id in range(1, 4):
+            self.document.project.project_id = project_id
+            bulk_report.create_document(self.document)
+
+        mocked_repo.return_value.git.add.assert_not_called()
+        pathspec_file = bulk_report.pathspec_file.name
+
+        def assert_pathspec_file(pathspec):
+            with open(pathspec_file) as f:
+                staged_files = f.read().splitlines()
+            self.assertEqual(f"--pathspec-from-file={pathspec_file}", pathspec)
+            self.assertEqual(3, len(staged_files))
+            self.assertTrue(staged_files[2].endswith("project_3.yaml"))
+
+        mocked_repo.return_value.git.add.side_effect = assert_pathspec_file
+        self.assertTrue(bulk_report.commit_documents())
+        mocked_repo.return_value.git.add.assert_called_once()
+        mocked_repo.return_value.index.commit.assert_called_once_with("Add 3 projects")
+        self.assertFalse(os.path.exists(pathspec_file))
+
+    @patch("server.services.git.bulk_service.get_git_version", return_value=(2, 20, 1))
+    @patch("server.services.git.git_service.FileService.create_file")
+    def test_files_are_staged_in_batches_with_old_git(
+        self, mocked_create_file, mocked_git_version, mocked_repo
+    ):
+        bulk_report = GitBulkService()
+        bulk_report.stage_batch_size = 2
+        for project_id in range(1, 4):
+            self.document.project.project_id = project_id
+            bulk_report.create_document(self.document)
+
+        self.assertTrue(bulk_report.commit_documents())
+        add_calls = mocked_repo.return_value.git.add.call_args_list
+        self.assertEqual([3, 2], [len(c[0]) for c in add_calls])
+        self.assertTrue(add_calls[1][0][1].endswith("project_3.yaml"))
+        mocked_repo.return_value.index.commit.assert_called_once_with("Add 3 projects")
+
+    def test_commit_without_documents(self, mocked_repo):
+        bulk_report = GitBulkService()
+
+        self.assertFalse(bulk_report.commit_documents())
+        mocked_repo.return_value.index.commit.assert_not_called()
+
+    @patch("server.services.git.bulk_service.PushService")
+    @patch("server.services.git.git_service.FileService.create_file")
+    def test_index_is_updated_after_push(
+        self, mocked_create_file, mocked_push_service, mocked_repo
+    ):
+        with tempfile.TemporaryDirectory() as index_dir:
+            self.app.config.update(
+                {
+                    "REPORT_FILE_DIR": "report_files",
+                    "REPORT_INDEX_FILE": f"{index_dir}/index.sqlite",
+                    "REPORT_FILE_LAYOUT": "flat",
+                }
+            )
+            bulk_report = GitBulkService()
+            for project_id in range(1, 4):
+                self.document.project.project_id = project_id
+                bulk_report.create_document(self.document)
+
+            # Single reports aren't blocked while the documents are written
+            project_index = ProjectIndexService()
+            project_index.update_projects(
+                [("report_files/github_files/p/o/project_9.yaml", "sha")]
+            )
+            self.assertIsNone(project_index.get_project(1))
+
+            bulk_report.commit_documents()
+            self.assertIsNotNone(project_index.get_project(1))
+            self.assertEqual(4, len(project_index.list_projects()))
+            self.assertFalse(os.path.exists(bulk_report.project_index_file.name))
+
+    def test_aborted_upload_removes_written_files(self, mocked_repo):
+        with tempfile.TemporaryDirectory() as report_file_dir:
+            self.app.config.update(
+                {"REPORT_FILE_DIR": report_file_dir, "REPORT_FILE_LAYOUT": "flat"}
+            )
+            bulk_report = GitBulkService()
+            for project_id in range(1, 3):
+                document = DocumentSchema().load(utils.document_data)
+                document.project.project_id = project_id
+                bulk_report.create_document(document)
+
+            bulk_report.abort()
+
+            self.assertEqual([], os.listdir(f"{report_file_dir}/github_files"))
+            self.assertFalse(os.path.exists(bulk_report.pathspec_file.name))
+            # The documents can be created again
+            bulk_report = GitBulkService()
+            bulk_report.create_document(document)
+            bulk_report.abort()
+
+    @patch("server.services.git.bulk_service.PushService")
+    def test_failed_commit_removes_written_files(
+        self, mocked_push_service, mocked_repo
+    ):
+        with tempfile.TemporaryDirectory() as report_file_dir:
+            self.app.config.update(
+                {"REPORT_FILE_DIR": report_file_dir, "REPORT_FILE_LAYOUT": "flat"}
+            )
+            bulk_report = GitBulkService()
+            for project_id in range(1, 3):
+                document = DocumentSchema().load(utils.document_data)
+                document.project.project_id = project_id
+                bulk_report.create_document(document)
+            mocked_repo.return_value.index.commit.side_effect = git.GitCommandError(
+                "commit", 1
+            )
+
+            with self.assertRaises(git.GitCommandError):
+                bulk_report.commit_documents()
+
+            self.assertEqual([], os.listdir(f"{report_file_dir}/github_files"))
+            self.assertFalse(os.path.exists(bulk_report.pathspec_file.name))
+            reset_args = mocked_repo.return_value.git.reset.call_args[0]
+            self.assertEqual(("-q", "--"), reset_args[:2])
+            self.assertEqual(2, len(reset_args[2:]))
+            mocked_push_service.return_value.push.assert_not_called()
+
+    @patch("server.services.git.bulk_service.PushService")
+    def test_hashed_layout_is_recorded(self, mocked_push_service, mocked_repo):
+        with tempfile.TemporaryDirectory() as report_file_dir:
+            self.app.config.update(
+                {
+                    "REPORT_FILE_DIR": report_file_dir,
+                    "REPORT_FILE_LAYOUT": "hashed",
+                    "REPORT_FILE_FAN_OUT": 2,
+                }
+            )
+            bulk_report = GitBulkService()
+            bulk_report.create_document(self.document)
+            layout_file = f"{report_file_dir}/github_files/layout.yaml"
+
+            def assert_pathspec_file(pathspec):
+                with open(bulk_report.pathspec_file.name) as f:
+                    self.assertEqual(layout_file, f.read().splitlines()[-1])
+
+            mocked_repo.return_value.git.add.side_effect = assert_pathspec_file
+            bulk_report.commit_documents()
+
+            mocked_repo.return_value.git.add.assert_called_once()
+            self.assertEqual(
+                {"layout": "hashed", "fan_out": 2},
+                LayoutService(f"{report_file_dir}/github_files").get_recorded_layout(),
+            )
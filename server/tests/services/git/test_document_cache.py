@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.document_cache import DocumentCache
+
+
+class TestDocumentCache(BaseTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_content = "project:\n  name: test name\n"
+        self.document = {"project": {"name": "test name"}}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, filename: str, file_content: str, racy=False) -> str:
+        file_path = os.path.join(self.temp_dir.name, filename)
+        with open(file_path, "w") as f:
+            f.write(file_content)
+        if not racy:
+            modified = time.time() - 10
+            os.utime(file_path, (modified, modified))
+        return file_path
+
+    def test_get_cached_document(self):
+        cache = DocumentCache()
+        file_path = self.write_file("project_1.yaml", self.file_content)
+        cache.set(file_path, self.file_content, self.document)
+
+        self.assertIs(self.document, cache.get(file_path))
+        self.assertEqual(1, cache.hits)
+
+    def test_get_fails_with_modified_file(self):
+        cache = DocumentCache()
+        file_path = self.write_file("project_1.yaml", self.file_content)
+        cache.set(file_path, self.file_content, self.document)
+        self.write_file("project_1.yaml", "project:\n  name: updated name\n")
+
+        self.assertIsNone(cache.get(file_path))
+        self.assertEqual(1, cache.misses)
+
+    def test_racily_modified_file_is_found_by_content(self):
+        cache = DocumentCache()
+        file_path = self.write_file("project_1.yaml", self.file_content, racy=True)
+        cache.set(file_path, self.file_content, self.document)
+
+        self.assertIsNone(cache.get(file_path))
+        self.assertIs(self.document, cache.get_by_content(file_path, self.file_content))
+        self.assertIsNone(cache.get(file_path))
+
+        modified = time.time() - 10
+        os.utime(file_path, (modified, modified))
+        self.assertIs(self.document, cache.get_by_content(file_path, self.file_content))
+        self.assertIs(self.document, cache.get(file_path))
+
+    def test_get_by_content(self):
+        cache = DocumentCache()
+        file_path = self.write_file("project_1.yaml", self.file_content)
+        cache.set(file_path, self.file_content, self.document)
+        other_file_path = self.write_file("project_2.yaml", self.file_content)
+
+        self.assertIs(
+            self.document, cache.get_by_content(other_file_path, self.file_content)
+        )
+        self.assertIs(self.document, cache.get(other_file_path))
+
+    def test_least_recently_used_document_is_evicted(self):
+        cache = DocumentCache(max_entries=2)
+        file_paths = []
+        for project_id in range(1, 4):
+            file_content = f"project:\n  projectId: {project_id}\n"
+            file_path = self.write_file(f"project_{project_id}.yaml", file_content)
+            cache.set(file_path, file_content, {"project": {"projectId": project_id}})
+            file_paths.append(file_path)
+
+        self.assertIsNone(cache.get(file_paths[0]))
+        self.assertIsNotNone(cache.get(file_paths[1]))
+        self.assertIsNotNone(cache.get(file_paths[2]))
+
+    def test_documents_are_evicted_over_memory_limit(self):
+        cache = DocumentCache(max_bytes=len(self.file_content) + 10)
+        first_file_path = self.write_file("project_1.yaml", self.file_content)
+        cache.set(first_file_path, self.file_content, self.document)
+        second_file_content = "project:\n  name: other name\n"
+        second_file_path = self.write_file("project_2.yaml", second_file_content)
+        cache.set(second_file_path, second_file_content, self.document)
+
+        self.assertIsNone(cache.get(first_file_path))
+        self.assertIsNotNone(cache.get(second_file_path))
+        self.assertEqual(len(second_file_content), cache.size)
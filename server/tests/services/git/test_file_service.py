@@ -1,4 +1,6 @@
 import os
+import subprocess
+import tempfile
 from unittest.mock import patch, mock_open
 
 from server.tests.base_test_config import BaseTestCase
@@ -36,48 +38,47 @@ class TestFileService(BaseTestCase):
                 FileService.get_content(self.filename)
 
     def test_update_file(self):
-        open_mock = mock_open()
-        with patch("server.services.git.file_service.open", open_mock):
-            FileService.update_file(self.file_content, self.file_path, self.filename)
+        with tempfile.TemporaryDirectory() as file_dir:
+            with open(f"{file_dir}/{self.filename}", "w") as f:
+                f.write("previous file content")
+            FileService.update_file(self.file_content, file_dir, self.filename)
 
-        open_mock.assert_called_with(f"{self.file_path}/{self.filename}", "w+")
-        open_mock.return_value.write.assert_called_once_with(self.file_content)
-        open_mock.return_value.close.assert_called_once_with()
+            self.assertEqual([self.filename], os.listdir(file_dir))
+            self.assertEqual(
+                self.file_content,
+                FileService.get_content(f"{file_dir}/{self.filename}"),
+            )
 
     def test_update_file_fails_without_file(self):
-        open_mock = mock_open()
-        open_mock.side_effect = FileNotFoundError
-
-        with patch("server.services.git.file_service.open", open_mock):
+        with tempfile.TemporaryDirectory() as temp_dir:
             with self.assertRaises(FileServiceError):
                 FileService.update_file(
-                    self.file_content, self.file_path, self.filename
+                    self.file_content, f"{temp_dir}/missing", self.filename
                 )
 
     def test_create_file_fails_with_existing_file(self):
-        open_mock = mock_open()
-        open_mock.side_effect = FileExistsError
+        with tempfile.TemporaryDirectory() as file_dir:
+            with open(f"{file_dir}/{self.filename}", "w") as f:
+                f.write("previous file content")
 
-        with patch("server.services.git.file_service.open", open_mock):
             with self.assertRaises(FileServiceError):
-                FileService.create_file(
-                    self.file_content, self.file_path, self.filename
-                )
-
-    @patch("server.services.git.file_service.os.path.exists", return_value=False)
-    @patch("server.services.git.file_service.os.makedirs", return_value=False)
-    def test_create_file(self, mocked_path, mocked_dir):
-        open_mock = mock_open()
-        non_existing_path = "~/Documents"
-
-        with patch("server.services.git.file_service.open", open_mock):
-            FileService.create_file(self.file_content, non_existing_path, self.filename)
-        open_mock.assert_called_with(f"{non_existing_path}/{self.filename}", "x")
-        open_mock.return_value.write.assert_called_once_with(self.file_content)
-        open_mock.return_value.close.assert_called_once_with()
-
-        mocked_path.assert_called_once_with(non_existing_path)
-        mocked_dir.assert_called_once_with(non_existing_path)
+                FileService.create_file(self.file_content, file_dir, self.filename)
+            self.assertEqual([self.filename], os.listdir(file_dir))
+            self.assertEqual(
+                "previous file content",
+                FileService.get_content(f"{file_dir}/{self.filename}"),
+            )
+
+    def test_create_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_dir = f"{temp_dir}/organisation"
+            FileService.create_file(self.file_content, file_dir, self.filename)
+
+            self.assertEqual([self.filename], os.listdir(file_dir))
+            self.assertEqual(
+                self.file_content,
+                FileService.get_content(f"{file_dir}/{self.filename}"),
+            )
 
     def test_dict_to_yaml(self):
         yaml_str = FileService.dict_to_yaml(self.yaml_dict)
@@ -88,3 +89,12 @@ class TestFileService(BaseTestCase):
 
         self.assertIsInstance(yaml_dict, dict)
         self.assertDictEqual(self.yaml_dict, yaml_dict)
+
+    def test_get_blob_sha(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml") as f:
+            f.write(self.yaml_str)
+            f.flush()
+            expected = subprocess.check_output(["git", "hash-object", f.name])
+
+        blob_sha = FileService.get_blob_sha(self.yaml_str)
+        self.assertEqual(expected.decode().strip(), blob_sha)
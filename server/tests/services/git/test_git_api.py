@@ -1,10 +1,14 @@
+import json
+import tempfile
+import uuid
 from unittest.mock import patch
 
 from flask import url_for
 
 from server.tests.base_test_config import BaseTestCase
 from server.tests.helpers import utils
-from server.services.git.file_service import FileServiceError
+from server.services.git.file_service import FileService, FileServiceError
+from server.services.idempotency_store import idempotency_store
 
 
 @patch("server.services.git.git_service.git.Repo")
@@ -56,6 +60,95 @@ class TestGitDocumentApi(BaseTestCase):
         expected = {"detail": self.fail_post_message}
         self.assertEqual(expected, response.json)
 
+    @patch("server.services.git.git_service.FileService.create_file")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_git_document_post_with_idempotency_key(
+        self, mocked_create_file, mocked_repo
+    ):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        store_patcher = patch.object(
+            idempotency_store, "store_file", f"{temp_dir.name}/idempotency.sqlite"
+        )
+        store_patcher.start()
+        self.addCleanup(store_patcher.stop)
+
+        headers = {
+            "Authorization": "Token secrettokenexample",
+            "Idempotency-Key": str(uuid.uuid4()),
+        }
+        response = self.client.post(
+            url_for("create_git_document"), json=self.document_data, headers=headers
+        )
+        retried_response = self.client.post(
+            url_for("create_git_document"), json=self.document_data, headers=headers
+        )
+
+        self.assertEqual(201, retried_response.status_code)
+        self.assertEqual(response.json, retried_response.json)
+        self.assertEqual("true", retried_response.headers["Idempotent-Replayed"])
+        mocked_create_file.assert_called_once()
+
+        response = self.client.post(
+            url_for("create_git_document"),
+            json={**self.document_data, "platform": {"name": "other", "url": ""}},
+            headers=headers,
+        )
+        self.assertEqual(422, response.status_code)
+        mocked_create_file.assert_called_once()
+
+    @patch("server.services.git.git_service.FileService.get_content")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_git_document_get(self, mocked_get_content, mocked_repo):
+        mocked_get_content.return_value = self.yaml_str
+        url = url_for(
+            "get_git_document",
+            platform_name=self.document_data["platform"]["name"],
+            organisation_name=self.document_data["organisation"]["name"],
+            project_id=self.document_data["project"]["projectId"],
+        )
+        headers = {"Authorization": "Token secrettokenexample"}
+
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.document_data, response.json)
+        self.assertEqual(
+            f'"{FileService.get_blob_sha(self.yaml_str)}"', response.headers["ETag"]
+        )
+
+        response = self.client.get(
+            url, headers={**headers, "If-None-Match": response.headers["ETag"]}
+        )
+        self.assertEqual(304, response.status_code)
+
+    @patch("server.services.git.git_service.FileService.get_content")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_git_document_get_fails_without_existing_file(
+        self, mocked_get_content, mocked_repo
+    ):
+        mocked_get_content.side_effect = FileServiceError(self.fail_patch_message)
+
+        response = self.client.get(
+            url_for(
+                "get_git_document",
+                platform_name=self.document_data["platform"]["name"],
+                organisation_name=self.document_data["organisation"]["name"],
+                project_id=self.document_data["project"]["projectId"],
+            ),
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+        self.assertEqual(404, response.status_code)
+        self.assertEqual({"detail": self.fail_patch_message}, response.json)
+
     @patch("server.services.git.file_service.FileService.update_file")
     @patch("server.services.git.file_service.FileService.get_content")
     @patch.dict(
@@ -106,3 +199,61 @@ class TestGitDocumentApi(BaseTestCase):
         )
         expected = {"detail": self.fail_patch_message}
         self.assertEqual(expected, response.json)
+
+    @patch("server.services.git.git_service.FileService.create_file")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_git_document_bulk_post(self, mocked_create_file, mocked_repo):
+        mocked_create_file.side_effect = [None, FileServiceError(self.fail_post_message)]
+        lines = [
+            json.dumps(self.document_data),
+            "",
+            json.dumps({"project": {"projectId": 3}}),
+            "not json",
+            json.dumps(self.document_data),
+        ]
+
+        response = self.client.post(
+            url_for("create_git_documents"),
+            data="\n".join(lines) + "\n",
+            content_type="application/x-ndjson",
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+        results = [json.loads(line) for line in response.data.splitlines()]
+
+        self.assertEqual(
+            [(1, 201), (3, 400), (4, 400), (5, 409)],
+            [(result["line"], result["status"]) for result in results[:-1]],
+        )
+        self.assertEqual(self.success_post_message, results[0]["detail"])
+        self.assertEqual({"status": 201, "detail": "1 documents created"}, results[-1])
+        mocked_repo.return_value.index.commit.assert_called_once_with(
+            "Add 1 projects"
+        )
+        mocked_repo.return_value.remote.return_value.push.assert_called_once_with()
+
+    @patch("server.api.git.resources.GitBulkService")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_git_document_bulk_post_aborted(self, mocked_bulk_service, mocked_repo):
+        mocked_bulk_service.return_value.created_documents = 1
+        mocked_bulk_service.return_value.create_document.side_effect = [
+            None,
+            OSError("No space left on device"),
+        ]
+
+        lines = [json.dumps(self.document_data), json.dumps(self.document_data)]
+
+        with self.assertRaises(OSError):
+            self.client.post(
+                url_for("create_git_documents"),
+                data="\n".join(lines) + "\n",
+                content_type="application/x-ndjson",
+                headers={"Authorization": "Token secrettokenexample"},
+            ).get_data()
+        mocked_bulk_service.return_value.abort.assert_called_once_with()
+        mocked_bulk_service.return_value.commit_documents.assert_not_called()
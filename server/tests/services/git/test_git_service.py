@@ -1,9 +1,11 @@
-from unittest.mock import patch
-import copy
+from unittest.mock import call, patch
+import sqlite3
 
 from server.tests.base_test_config import BaseTestCase
+from server.services.git.file_service import FileService, FileServiceError
 from server.services.git.git_service import GitService
 from server.tests.helpers import utils
+from server.models.document import Document, Project
 
 
 @patch("server.services.git.git_service.git.Repo")
@@ -42,7 +44,7 @@ class TestGitService(BaseTestCase):
         git_service = GitService(
             self.platform_name, self.organisation_name, self.project_id
         )
-        git_service.create_document({"project": {"name": "test name"}})
+        git_service.create_document(Document(project=Project(name="test name")))
 
         yaml_example = "project:\n  name: test name\n"
         mocked_create_file.return_value = yaml_example
@@ -51,6 +53,81 @@ class TestGitService(BaseTestCase):
             [f"{document_dir}/{filename}"]
         )
 
+    @patch("server.services.git.git_service.FileService.create_file")
+    @patch.dict(
+        "server.services.git.git_service.current_app.config",
+        {
+            "REPORT_FILE_DIR": "example",
+            "REPORT_FILE_LAYOUT": "hashed",
+            "REPORT_FILE_FAN_OUT": 2,
+        },
+    )
+    def test_create_document_with_hashed_layout(self, mocked_create_file, mocked_repo):
+        # sha1("1") starts with "35"
+        project_dir = (
+            f"{self.report_file_repo_dir}/{self.report_file_dir}/"
+            f"{self.platform_name}/{self.organisation_name}/35"
+        )
+        filename = f"project_{self.project_id}.yaml"
+        git_service = GitService(
+            self.platform_name, self.organisation_name, self.project_id
+        )
+        git_service.create_document(Document(project=Project(name="test name")))
+
+        yaml_files_dir = f"{self.report_file_repo_dir}/{self.report_file_dir}"
+        self.assertEqual(
+            [
+                call("project:\n  name: test name\n", project_dir, filename),
+                # The layout set in the configuration is recorded
+                call("fan_out: 2\nlayout: hashed\n", yaml_files_dir, "layout.yaml"),
+            ],
+            mocked_create_file.call_args_list,
+        )
+        mocked_repo.return_value.git.add.assert_called_once_with(
+            [f"{project_dir}/{filename}", f"{yaml_files_dir}/layout.yaml"]
+        )
+
+    @patch("server.services.git.git_service.FileService.create_file")
+    @patch.dict(
+        "server.services.git.git_service.current_app.config",
+        {"REPORT_FILE_DIR": "example"},
+    )
+    def test_create_committed_document(self, mocked_create_file, mocked_repo):
+        mocked_create_file.side_effect = FileServiceError("Project already reported")
+        document = Document(project=Project(name="test name"))
+        tree = mocked_repo.return_value.head.commit.tree
+        tree.__getitem__.return_value.hexsha = FileService.get_blob_sha(
+            "project:\n  name: test name\n"
+        )
+        git_service = GitService(
+            self.platform_name, self.organisation_name, self.project_id
+        )
+
+        git_service.create_document(document)
+        tree.__getitem__.assert_called_once_with(
+            f"{self.report_file_dir}/{self.platform_name}/"
+            f"{self.organisation_name}/project_{self.project_id}.yaml"
+        )
+        mocked_repo.return_value.index.commit.assert_not_called()
+
+        tree.__getitem__.return_value.hexsha = "other blob sha"
+        with self.assertRaises(FileServiceError):
+            git_service.create_document(document)
+
+    @patch("server.services.git.git_service.ProjectIndexService")
+    def test_update_index_does_not_fail_the_report(
+        self, mocked_project_index, mocked_repo
+    ):
+        mocked_project_index.return_value.update_projects.side_effect = sqlite3.Error
+        git_service = GitService(
+            self.platform_name, self.organisation_name, self.project_id
+        )
+
+        git_service.update_index("project_1.yaml", "blob sha")
+        mocked_project_index.return_value.update_projects.assert_called_once_with(
+            [("project_1.yaml", "blob sha")]
+        )
+
     def test_organisation_name_is_being_updated(self, mocked_repo):
         update_document = {
             "organisation": {"name": "updated organisation name"},
@@ -176,37 +253,19 @@ class TestGitService(BaseTestCase):
         )
         self.assertEqual(update_dir, expected_update_dir)
 
-    @patch("server.services.git.git_service.FileService.dict_to_yaml")
-    def test_update_yaml_file(self, mocked_yaml, mocked_repo):
+    @patch("server.services.git.git_service.FileService")
+    @patch("server.services.git.git_service.document_cache")
+    def test_get_document_from_cache(
+        self, mocked_document_cache, mocked_file_service, mocked_repo
+    ):
+        mocked_document_cache.get_entry.return_value = (self.document_data, "sha")
         git_service = GitService(
             self.platform_name, self.organisation_name, self.project_id
         )
-        update_organisation_name = "updated organisation name"
-        update_project_name = "updated project name"
-        update_license = "updated license"
-
-        update_users = [
-            {"userId": 1, "userName": "project author"},
-            {"userId": 2, "userName": "project manager"},
-        ]
-        update_fields = {
-            "organisation": {"name": update_organisation_name},
-            "project": {
-                "name": update_project_name,
-                "externalSource": {"license": update_license},
-                "users": update_users,
-            },
-        }
-
-        git_service.update_yaml_file(update_fields, self.yaml_str)
-
-        update_document = copy.deepcopy(self.document_data)
-        update_document["organisation"]["name"] = update_organisation_name
-        update_document["project"]["name"] = update_project_name
-        update_document["project"]["externalSource"]["license"] = update_license
-        update_document["project"]["users"] = update_users
 
-        mocked_yaml.assert_called_once_with(update_document)
+        document = git_service.get_document("project_1.yaml")
+        self.assertIs(self.document_data, document)
+        mocked_file_service.get_content.assert_not_called()
 
     @patch("server.services.git.git_service.FileService")
     @patch("server.services.git.git_service.GitService")
@@ -283,3 +342,23 @@ class TestGitService(BaseTestCase):
         mocked_repo.return_value.git.add.assert_called_once_with(
             [f"{current_dir}/{filename}"]
         )
+
+    @patch("server.services.git.git_service.FileService")
+    @patch.dict(
+        "server.services.git.git_service.current_app.config",
+        {"REPORT_FILE_DIR": "example"},
+    )
+    def test_update_document_without_changes(self, mocked_file_service, mocked_repo):
+        mocked_file_service.get_content.return_value = self.yaml_str
+        mocked_file_service.yaml_to_dict.return_value = self.document_data
+
+        git_service = GitService(
+            self.platform_name, self.organisation_name, self.project_id
+        )
+        changed_fields = git_service.update_document(
+            {"project": {"name": self.document_data["project"]["name"]}}
+        )
+
+        self.assertEqual([], changed_fields)
+        mocked_file_service.update_file.assert_not_called()
+        mocked_repo.return_value.index.commit.assert_not_called()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import git
+from flask import url_for
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.index_service import ProjectIndexService
+
+
+class TestProjectIndexService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.report_file_dir = f"{self.temp_dir.name}/repository"
+        self.index_file = f"{self.temp_dir.name}/index.sqlite"
+        self.config = patch.dict(
+            "server.services.git.index_service.current_app.config",
+            {
+                "REPORT_FILE_DIR": self.report_file_dir,
+                "REPORT_INDEX_FILE": self.index_file,
+                "AUTHORIZATION_TOKEN": "secrettokenexample",
+            },
+        )
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.temp_dir.cleanup()
+
+    def test_index_is_disabled_without_file(self):
+        with patch.dict(
+            "server.services.git.index_service.current_app.config",
+            {"REPORT_INDEX_FILE": None},
+        ):
+            project_index = ProjectIndexService()
+            self.assertFalse(project_index.is_enabled())
+            project_index.update_projects([("project_1.yaml", "sha")])
+
+    def test_update_and_get_project(self):
+        project_index = ProjectIndexService()
+        project_index.update_projects(
+            [
+                (f"{self.report_file_dir}/github_files/TM/HOT/project_1.yaml", "a"),
+                (f"{self.report_file_dir}/github_files/TM/HOT/35/project_2.yaml", "b"),
+                (f"{self.report_file_dir}/github_files/layout.yaml", "c"),
+            ]
+        )
+
+        self.assertEqual(
+            {
+                "project_id": 2,
+                "path": "github_files/TM/HOT/35/project_2.yaml",
+                "platform": "TM",
+                "organisation": "HOT",
+                "blob_sha": "b",
+            },
+            project_index.get_project(2),
+        )
+        self.assertIsNone(project_index.get_project(3))
+        self.assertEqual(2, len(project_index.list_projects()))
+
+    def test_list_projects(self):
+        project_index = ProjectIndexService()
+        project_index.update_projects(
+            [
+                (f"{self.report_file_dir}/github_files/TM/HOT/project_1.yaml", "a"),
+                (f"{self.report_file_dir}/github_files/TM/OSM/project_2.yaml", "b"),
+                (f"{self.report_file_dir}/github_files/TM/HOT/project_3.yaml", "c"),
+            ]
+        )
+
+        projects = project_index.list_projects(organisation="HOT")
+        self.assertEqual([1, 3], [project["project_id"] for project in projects])
+        projects = project_index.list_projects(limit=1, offset=1)
+        self.assertEqual([2], [project["project_id"] for project in projects])
+
+    def test_move_projects(self):
+        project_index = ProjectIndexService()
+        project_index.update_projects(
+            [
+                (f"{self.report_file_dir}/github_files/TM/HOT/project_1.yaml", "a"),
+                (f"{self.report_file_dir}/github_files/TM/HOTOSM/project_2.yaml", "b"),
+            ]
+        )
+
+        project_index.move_projects(
+            f"{self.report_file_dir}/github_files/TM/HOT",
+            f"{self.report_file_dir}/github_files/TM/New_HOT",
+        )
+        self.assertEqual(
+            "github_files/TM/New_HOT/project_1.yaml",
+            project_index.get_project(1)["path"],
+        )
+        self.assertEqual("New_HOT", project_index.get_project(1)["organisation"])
+        self.assertEqual("HOTOSM", project_index.get_project(2)["organisation"])
+
+    def test_rebuild(self):
+        repo = git.Repo.init(self.report_file_dir)
+        project_dir = f"{self.report_file_dir}/github_files/TM/HOT"
+        os.makedirs(project_dir)
+        with open(f"{project_dir}/project_1.yaml", "w") as f:
+            f.write("project:\n  projectId: 1\n")
+        repo.index.add(["github_files/TM/HOT/project_1.yaml"])
+        repo.index.commit("Add project 1")
+
+        project_index = ProjectIndexService()
+        project_index.update_projects(
+            [(f"{self.report_file_dir}/github_files/TM/HOT/project_2.yaml", "b")]
+        )
+
+        self.assertEqual(1, project_index.rebuild(repo))
+        self.assertIsNone(project_index.get_project(2))
+        self.assertEqual(
+            repo.head.commit.tree["github_files/TM/HOT/project_1.yaml"].hexsha,
+            project_index.get_project(1)["blob_sha"],
+        )
+
+    def test_get_project_api(self):
+        ProjectIndexService().update_projects(
+            [(f"{self.report_file_dir}/github_files/TM/HOT/project_1.yaml", "a")]
+        )
+        headers = {"Authorization": "Token secrettokenexample"}
+
+        response = self.client.get(url_for("get_git_project", project_id=1), headers=headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("HOT", response.json["organisation"])
+
+        response = self.client.get(url_for("get_git_project", project_id=2), headers=headers)
+        self.assertEqual(404, response.status_code)
+
+        response = self.client.get(
+            url_for("list_git_projects", platform="TM"), headers=headers
+        )
+        self.assertEqual([1], [project["project_id"] for project in response.json["projects"]])
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.layout_service import LayoutService
+
+
+class TestLayoutService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.yaml_files_dir = self.temp_dir.name
+        self.organisation_dir = f"{self.yaml_files_dir}/TM/HOT"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_project_file(self, project_dir: str, project_id: int) -> str:
+        os.makedirs(project_dir, exist_ok=True)
+        project_file = f"{project_dir}/project_{project_id}.yaml"
+        with open(project_file, "w") as f:
+            f.write("project:\n  name: test name\n")
+        return project_file
+
+    def test_flat_project_dir(self):
+        layout = LayoutService(self.yaml_files_dir)
+
+        project_dir = layout.get_project_dir(self.organisation_dir, 1)
+        self.assertEqual("flat", layout.name)
+        self.assertEqual(self.organisation_dir, project_dir)
+
+    @patch.dict(
+        "server.services.git.layout_service.current_app.config",
+        {"REPORT_FILE_LAYOUT": "hashed", "REPORT_FILE_FAN_OUT": 2},
+    )
+    def test_hashed_project_dir(self):
+        layout = LayoutService(self.yaml_files_dir)
+
+        project_dir = layout.get_project_dir(self.organisation_dir, 1)
+        # sha1("1") starts with "35"
+        self.assertEqual(f"{self.organisation_dir}/35", project_dir)
+
+    @patch.dict(
+        "server.services.git.layout_service.current_app.config",
+        {"REPORT_FILE_LAYOUT": "flat"},
+    )
+    def test_recorded_layout_takes_precedence(self):
+        with open(f"{self.yaml_files_dir}/layout.yaml", "w") as f:
+            f.write("fan_out: 3\nlayout: hashed\n")
+
+        layout = LayoutService(self.yaml_files_dir)
+        self.assertEqual("hashed", layout.name)
+        self.assertEqual(3, layout.fan_out)
+
+    @patch.dict(
+        "server.services.git.layout_service.current_app.config",
+        {"REPORT_FILE_LAYOUT": "nested"},
+    )
+    def test_invalid_layout(self):
+        with self.assertRaises(ValueError):
+            LayoutService(self.yaml_files_dir)
+
+    def test_get_project_files(self):
+        flat_file = self.create_project_file(self.organisation_dir, 1)
+        hashed_file = self.create_project_file(f"{self.organisation_dir}/ab", 2)
+
+        project_files = LayoutService(self.yaml_files_dir).get_project_files()
+        self.assertCountEqual(
+            [(self.organisation_dir, 1, flat_file), (self.organisation_dir, 2, hashed_file)],
+            project_files,
+        )
+
+    def test_migrate_to_hashed_layout(self):
+        self.create_project_file(self.organisation_dir, 1)
+        repo = MagicMock()
+
+        layout = LayoutService(self.yaml_files_dir)
+        moved_files = layout.migrate(repo, "hashed", 2)
+
+        self.assertEqual(1, moved_files)
+        self.assertTrue(os.path.isfile(f"{self.organisation_dir}/35/project_1.yaml"))
+        self.assertFalse(os.path.isfile(f"{self.organisation_dir}/project_1.yaml"))
+        self.assertEqual("hashed", LayoutService(self.yaml_files_dir).name)
+        repo.git.add.assert_called_once_with("--all", self.yaml_files_dir)
+
+    def test_migrate_back_to_flat_layout(self):
+        self.create_project_file(f"{self.organisation_dir}/35", 1)
+        repo = MagicMock()
+
+        LayoutService(self.yaml_files_dir).migrate(repo, "flat", 2)
+
+        self.assertTrue(os.path.isfile(f"{self.organisation_dir}/project_1.yaml"))
+        self.assertFalse(os.path.isdir(f"{self.organisation_dir}/35"))
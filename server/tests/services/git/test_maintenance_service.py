@@ -0,0 +1,90 @@
+import tempfile
+import time
+from unittest.mock import patch
+
+import git
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.maintenance_service import GitMaintenanceService
+from server.services.git.write_lanes import write_lanes
+
+
+@patch.object(write_lanes, "last_commit_at", None)
+class TestGitMaintenanceService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo = git.Repo.init(self.temp_dir.name)
+        for project_id in range(1, 4):
+            with open(f"{self.temp_dir.name}/project_{project_id}.yaml", "w") as f:
+                f.write(f"project:\n  projectId: {project_id}\n")
+            self.repo.index.add([f"project_{project_id}.yaml"])
+            self.repo.index.commit(f"Add project {project_id}")
+
+        self.app.config.update(
+            {
+                "REPORT_FILE_DIR": self.temp_dir.name,
+                "GIT_MAINTENANCE_INTERVAL": 0,
+                "GIT_MAINTENANCE_IDLE_SECONDS": 60,
+                "GIT_MAINTENANCE_TASKS": ["repack", "commit-graph"],
+            }
+        )
+        self.maintenance = GitMaintenanceService()
+        self.maintenance.init_app(self.app)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_maintenance_is_disabled_by_default(self):
+        self.assertIsNone(self.maintenance.thread)
+
+    def test_unknown_task(self):
+        self.app.config["GIT_MAINTENANCE_TASKS"] = ["prune"]
+
+        with self.assertRaises(ValueError):
+            GitMaintenanceService().init_app(self.app)
+
+    def test_run_when_idle(self):
+        durations = self.maintenance.run()
+
+        self.assertEqual(["repack", "commit-graph"], list(durations))
+        self.assertEqual(durations, self.maintenance.last_run)
+        self.assertEqual(1, self.maintenance.runs)
+        self.assertIn("count: 0", self.repo.git.count_objects("-v"))
+
+    @patch(
+        "server.services.git.maintenance_service.get_git_version",
+        return_value=(2, 20, 1),
+    )
+    def test_run_with_old_git(self, mocked_git_version):
+        with patch.object(git.Git, "execute", autospec=True) as mocked_execute:
+            durations = self.maintenance.run()
+
+        self.assertEqual(["repack", "commit-graph"], list(durations))
+        self.assertEqual(
+            [
+                ["git", "repack", "-d", "-l", "--quiet"],
+                ["git", "commit-graph", "write", "--reachable"],
+            ],
+            [c[0][1] for c in mocked_execute.call_args_list],
+        )
+
+    @patch(
+        "server.services.git.maintenance_service.get_git_version",
+        return_value=(2, 17, 1),
+    )
+    def test_unsupported_task_is_skipped(self, mocked_git_version):
+        durations = self.maintenance.run()
+
+        self.assertEqual(["repack"], list(durations))
+
+    def test_run_is_skipped_after_a_recent_commit(self):
+        write_lanes.last_commit_at = time.monotonic()
+
+        self.assertIsNone(self.maintenance.run())
+        self.assertEqual(1, self.maintenance.skipped_runs)
+
+    def test_run_is_skipped_during_a_commit(self):
+        with write_lanes.commit():
+            self.assertIsNone(self.maintenance.run())
+        self.assertEqual(1, self.maintenance.skipped_runs)
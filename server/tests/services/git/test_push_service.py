@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import git
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.push_service import GitPushError, PushService
+from server.services.metrics_service import metrics
+
+
+class TestPushService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.remote_dir = f"{self.temp_dir.name}/remote.git"
+        git.Repo.init(self.remote_dir, bare=True)
+
+        self.repo = self.clone("repository")
+        self.commit_file(self.repo, "layout.yaml", "layout: flat\n")
+        self.repo.git.push("origin", "HEAD")
+        self.other_repo = self.clone("other_repository")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def clone(self, name: str) -> git.Repo:
+        repo = git.Repo.clone_from(self.remote_dir, f"{self.temp_dir.name}/{name}")
+        with repo.config_writer() as config:
+            config.set_value("user", "name", "test")
+            config.set_value("user", "email", "test@example.com")
+        return repo
+
+    def commit_file(self, repo: git.Repo, filename: str, file_content: str) -> None:
+        with open(f"{repo.working_dir}/{filename}", "w") as f:
+            f.write(file_content)
+        repo.git.add(filename)
+        repo.index.commit(f"Add {filename}")
+
+    def test_push_without_rejection(self):
+        self.commit_file(self.other_repo, "project_1.yaml", "projectId: 1\n")
+
+        self.assertEqual(0, PushService(self.other_repo, 2, 0).push())
+
+    def test_rejected_push_is_rebased_and_retried(self):
+        retries = metrics.git_pushes.get(("retries",))
+        self.commit_file(self.repo, "project_1.yaml", "projectId: 1\n")
+        PushService(self.repo, 2, 0).push()
+        self.commit_file(self.other_repo, "project_2.yaml", "projectId: 2\n")
+
+        self.assertEqual(1, PushService(self.other_repo, 2, 0).push())
+        self.assertEqual(retries + 1, metrics.git_pushes.get(("retries",)))
+        remote_files = git.Repo(self.remote_dir).git.ls_tree(
+            "-r", "--name-only", "HEAD"
+        )
+        self.assertEqual(
+            ["layout.yaml", "project_1.yaml", "project_2.yaml"],
+            remote_files.splitlines(),
+        )
+
+    def test_conflicting_push_fails(self):
+        failures = metrics.git_pushes.get(("failures",))
+        self.commit_file(self.repo, "project_1.yaml", "projectId: 1\n")
+        PushService(self.repo, 2, 0).push()
+        self.commit_file(self.other_repo, "project_1.yaml", "projectId: 2\n")
+
+        with self.assertRaises(GitPushError):
+            PushService(self.other_repo, 2, 0).push()
+        self.assertEqual(failures + 1, metrics.git_pushes.get(("failures",)))
+        # The branch is reset to the remote one, with the remote file
+        self.assertEqual(self.repo.head.commit, self.other_repo.head.commit)
+        with open(f"{self.other_repo.working_dir}/project_1.yaml") as f:
+            self.assertEqual("projectId: 1\n", f.read())
+
+    def test_push_fails_after_max_retries(self):
+        failures = metrics.git_pushes.get(("failures",))
+        self.commit_file(self.repo, "project_1.yaml", "projectId: 1\n")
+        PushService(self.repo, 2, 0).push()
+        os.makedirs(f"{self.other_repo.working_dir}/organisation")
+        self.commit_file(
+            self.other_repo, "organisation/project_2.yaml", "projectId: 2\n"
+        )
+        with open(f"{self.other_repo.working_dir}/layout.yaml", "w") as f:
+            f.write("layout: hashed\n")
+
+        with self.assertRaises(GitPushError):
+            PushService(self.other_repo, 0, 0).push()
+        self.assertEqual(failures + 1, metrics.git_pushes.get(("failures",)))
+        # The unpushed file is removed, and files of other lanes are kept
+        self.assertEqual(self.repo.head.commit, self.other_repo.head.commit)
+        self.assertFalse(
+            os.path.exists(f"{self.other_repo.working_dir}/organisation")
+        )
+        with open(f"{self.other_repo.working_dir}/layout.yaml") as f:
+            self.assertEqual("layout: hashed\n", f.read())
+
+        # The report can be pushed again
+        os.makedirs(f"{self.other_repo.working_dir}/organisation")
+        self.commit_file(
+            self.other_repo, "organisation/project_2.yaml", "projectId: 2\n"
+        )
+        self.assertEqual(0, PushService(self.other_repo, 0, 0).push())
+
+    def test_fetch_error_fails_push(self):
+        failures = metrics.git_pushes.get(("failures",))
+        self.commit_file(self.repo, "project_1.yaml", "projectId: 1\n")
+        PushService(self.repo, 2, 0).push()
+        self.commit_file(self.other_repo, "project_2.yaml", "projectId: 2\n")
+        self.other_repo.remote(name="origin").set_url(f"{self.temp_dir.name}/missing")
+
+        with self.assertRaises(GitPushError):
+            PushService(self.other_repo, 2, 0).push()
+        self.assertEqual(failures + 1, metrics.git_pushes.get(("failures",)))
+        self.assertFalse(
+            os.path.exists(f"{self.other_repo.working_dir}/project_2.yaml")
+        )
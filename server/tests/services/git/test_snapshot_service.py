@@ -0,0 +1,179 @@
+import copy
+import os
+import tempfile
+from unittest.mock import patch
+
+import git
+from flask import url_for
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.file_service import FileService
+from server.services.git.snapshot_service import SnapshotService, parse_project_file
+from server.tests.helpers import utils
+
+
+class TestSnapshotService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.report_file_dir = f"{self.temp_dir.name}/repository"
+        self.snapshot_dir = f"{self.temp_dir.name}/snapshot"
+        self.config = patch.dict(
+            "server.services.git.snapshot_service.current_app.config",
+            {
+                "REPORT_FILE_DIR": self.report_file_dir,
+                "REPORT_SNAPSHOT_DIR": self.snapshot_dir,
+                "REPORT_SNAPSHOT_WORKERS": 2,
+                "AUTHORIZATION_TOKEN": "secrettokenexample",
+            },
+        )
+        self.config.start()
+        self.repo = git.Repo.init(self.report_file_dir)
+        self.write_project("HOT", 1)
+        self.write_project("HOT", 2)
+        self.repo.git.add("--all")
+        self.repo.index.commit("Add projects")
+
+    def tearDown(self):
+        self.config.stop()
+        self.temp_dir.cleanup()
+
+    def write_project(self, organisation_name: str, project_id: int, users_count=1):
+        document = copy.deepcopy(utils.document_data)
+        document["project"]["projectId"] = project_id
+        document["project"]["users"] = [
+            {"userId": user_id, "userName": f"user_{user_id}"}
+            for user_id in range(users_count)
+        ]
+        document["organisation"]["name"] = organisation_name
+        project_dir = f"{self.report_file_dir}/github_files/TM/{organisation_name}"
+        os.makedirs(project_dir, exist_ok=True)
+        with open(f"{project_dir}/project_{project_id}.yaml", "w") as f:
+            f.write(FileService.dict_to_yaml(document))
+
+    def test_parse_project_file(self):
+        project_row, user_rows, organisation_row, platform_row = parse_project_file(
+            ("github_files/TM/HOT/project_1.yaml", "sha", utils.document_yaml)
+        )
+
+        self.assertEqual(1, project_row["project_id"])
+        self.assertEqual("imagery example", project_row["imagery"])
+        self.assertEqual("github_files/TM/HOT/project_1.yaml", project_row["path"])
+        self.assertEqual(
+            [{"project_id": 1, "user_id": 1, "user_name": "user name example"}],
+            user_rows,
+        )
+        self.assertEqual("HOT", organisation_row["name"])
+        self.assertEqual("HOT tasking manager", platform_row["name"])
+
+    def test_build_full_snapshot(self):
+        snapshot = SnapshotService()
+        manifest = snapshot.build(self.repo)
+
+        self.assertEqual(self.repo.head.commit.hexsha, manifest["commit"])
+        self.assertFalse(manifest["incremental"])
+        self.assertEqual(2, manifest["parsed_files"])
+        self.assertEqual(2, manifest["tables"]["projects"]["rows"])
+        self.assertEqual(manifest, snapshot.get_manifest())
+        self.assertEqual(
+            ["1", "2"], [row["project_id"] for row in snapshot.read_table("projects")]
+        )
+        self.assertEqual(
+            ["HOT"], [row["name"] for row in snapshot.read_table("organisations")]
+        )
+
+    def test_build_incremental_snapshot(self):
+        snapshot = SnapshotService()
+        snapshot.build(self.repo)
+
+        self.write_project("HOT", 1, users_count=3)
+        self.write_project("OSM", 3)
+        self.repo.index.remove(
+            ["github_files/TM/HOT/project_2.yaml"], working_tree=True
+        )
+        self.repo.git.add("--all")
+        self.repo.index.commit("Update projects")
+        manifest = snapshot.build(self.repo)
+
+        self.assertTrue(manifest["incremental"])
+        self.assertEqual(2, manifest["parsed_files"])
+        self.assertEqual(
+            ["1", "3"], [row["project_id"] for row in snapshot.read_table("projects")]
+        )
+        self.assertEqual(
+            ["1", "1", "1", "3"],
+            [row["project_id"] for row in snapshot.read_table("users")],
+        )
+        self.assertEqual(
+            ["HOT", "OSM"],
+            [row["name"] for row in snapshot.read_table("organisations")],
+        )
+
+    def test_build_snapshot_skips_files_without_project_id(self):
+        document = copy.deepcopy(utils.document_data)
+        del document["project"]["projectId"]
+        with open(
+            f"{self.report_file_dir}/github_files/TM/HOT/project_3.yaml", "w"
+        ) as f:
+            f.write(FileService.dict_to_yaml(document))
+        self.repo.git.add("--all")
+        self.repo.index.commit("Add project without id")
+
+        manifest = SnapshotService().build(self.repo)
+
+        self.assertEqual(3, manifest["parsed_files"])
+        self.assertEqual(
+            ["github_files/TM/HOT/project_3.yaml"], manifest["skipped_files"]
+        )
+        self.assertEqual(2, manifest["tables"]["projects"]["rows"])
+
+    def test_fetch_missing_blobs_of_partial_clone(self):
+        self.repo.git.config("uploadpack.allowFilter", "true")
+        self.repo.git.config("uploadpack.allowAnySHA1InWant", "true")
+        clone = git.Repo.clone_from(
+            f"file://{self.report_file_dir}",
+            f"{self.temp_dir.name}/clone",
+            filter="blob:none",
+            no_checkout=True,
+        )
+        snapshot = SnapshotService()
+        blob_shas = {
+            item.hexsha
+            for item in clone.head.commit.tree.traverse()
+            if item.type == "blob"
+        }
+
+        with patch.object(
+            git.cmd.Git,
+            "_call_process",
+            autospec=True,
+            side_effect=git.cmd.Git._call_process,
+        ) as mocked_call_process:
+            snapshot.fetch_missing_blobs(clone, blob_shas)
+
+        git_commands = [call.args[1] for call in mocked_call_process.call_args_list]
+        self.assertEqual(["rev_list", "fetch"], git_commands)
+        objects = clone.git.rev_list(
+            "--objects", "--missing=print", "--no-walk", "HEAD"
+        )
+        self.assertNotIn("?", objects)
+        self.assertEqual(2, snapshot.build(clone)["tables"]["projects"]["rows"])
+
+    def test_build_snapshot_api(self):
+        headers = {"Authorization": "Token secrettokenexample"}
+
+        response = self.client.post(url_for("create_git_snapshot"), headers=headers)
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(self.repo.head.commit.hexsha, response.json["commit"])
+
+    def test_build_snapshot_api_without_snapshot_dir(self):
+        headers = {"Authorization": "Token secrettokenexample"}
+
+        with patch.dict(
+            "server.services.git.snapshot_service.current_app.config",
+            {"REPORT_SNAPSHOT_DIR": None},
+        ):
+            response = self.client.post(url_for("create_git_snapshot"), headers=headers)
+
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,102 @@
+import tempfile
+import threading
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.git.write_lanes import WriteLaneScheduler
+
+
+class TestWriteLaneScheduler(BaseTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def hold_lane(self, write_lanes, organisation_dir, lane_held, release):
+        with write_lanes.lane(organisation_dir):
+            lane_held.set()
+            release.wait(5)
+
+    def test_different_lanes_run_concurrently(self):
+        write_lanes = WriteLaneScheduler()
+        lane_held = threading.Event()
+        release = threading.Event()
+        thread = threading.Thread(
+            target=self.hold_lane,
+            args=(write_lanes, "github_files/platform/org_a", lane_held, release),
+        )
+        thread.start()
+        lane_held.wait(5)
+
+        with write_lanes.acquire("lane:github_files/platform/org_b", False) as acquired:
+            self.assertTrue(acquired)
+        with write_lanes.acquire("lane:github_files/platform/org_a", False) as acquired:
+            self.assertFalse(acquired)
+
+        release.set()
+        thread.join()
+        self.assertEqual({}, write_lanes.lanes)
+
+    def test_same_lane_is_serialised(self):
+        write_lanes = WriteLaneScheduler()
+        writes = []
+
+        def write(organisation_dir):
+            with write_lanes.lane(organisation_dir):
+                writes.append("start")
+                writes.append("end")
+
+        threads = [
+            threading.Thread(target=write, args=("github_files/platform/org",))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(["start", "end"] * 8, writes)
+        self.assertEqual({}, write_lanes.lanes)
+
+    def test_file_lock_is_held_by_the_lane(self):
+        write_lanes = WriteLaneScheduler(self.temp_dir.name)
+        other_process_lanes = WriteLaneScheduler(self.temp_dir.name)
+
+        with write_lanes.commit():
+            self.assertTrue(write_lanes.commit_in_progress)
+            with other_process_lanes.acquire("commit", False) as acquired:
+                self.assertFalse(acquired)
+
+        self.assertFalse(write_lanes.commit_in_progress)
+        self.assertIsNotNone(write_lanes.last_commit_at)
+        with other_process_lanes.acquire("commit", False) as acquired:
+            self.assertTrue(acquired)
+
+    def test_exclusive_worktree_waits_for_writers(self):
+        write_lanes = WriteLaneScheduler(self.temp_dir.name)
+        events = []
+        writing = threading.Event()
+        release = threading.Event()
+
+        def write():
+            with write_lanes.worktree():
+                writing.set()
+                release.wait(5)
+                events.append("write")
+
+        def rebase():
+            with write_lanes.worktree(exclusive=True):
+                events.append("rebase")
+
+        write_thread = threading.Thread(target=write)
+        write_thread.start()
+        writing.wait(5)
+        rebase_thread = threading.Thread(target=rebase)
+        rebase_thread.start()
+        rebase_thread.join(0.1)
+        self.assertEqual([], events)
+
+        release.set()
+        write_thread.join()
+        rebase_thread.join()
+        self.assertEqual(["write", "rebase"], events)
@@ -0,0 +1,29 @@
+import yaml
+
+from server.tests.base_test_config import BaseTestCase
+from server.tests.helpers import utils
+from server.services.git.yaml_codec import YamlCodec
+
+
+class TestYamlCodec(BaseTestCase):
+    def setUp(self):
+        self.document_data = utils.document_data
+
+    def test_encode_matches_pure_python_output(self):
+        yaml_str = YamlCodec.encode(self.document_data)
+
+        expected = yaml.dump(self.document_data, allow_unicode=True)
+        self.assertEqual(expected, yaml_str)
+
+    def test_encode_keeps_unicode(self):
+        yaml_str = YamlCodec.encode({"organisation": {"name": "Região Norte"}})
+        self.assertEqual("organisation:\n  name: Região Norte\n", yaml_str)
+
+    def test_decode(self):
+        yaml_dict = YamlCodec.decode(YamlCodec.encode(self.document_data))
+        self.assertDictEqual(self.document_data, yaml_dict)
+
+    def test_decode_fails_with_python_objects(self):
+        yaml_str = "project: !!python/object/apply:os.system ['echo unsafe']\n"
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            YamlCodec.decode(yaml_str)
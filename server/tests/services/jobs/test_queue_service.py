@@ -0,0 +1,123 @@
+import tempfile
+import time
+from unittest.mock import patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.jobs.queue_service import JobQueueService
+
+
+class TestJobQueueService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config = patch.dict(
+            "server.services.jobs.queue_service.current_app.config",
+            {
+                "JOB_QUEUE_FILE": f"{self.temp_dir.name}/jobs.sqlite",
+                "JOB_LEASE_SECONDS": 300,
+                "JOB_MAX_ATTEMPTS": 2,
+                "JOB_RETRY_DELAY": 0,
+            },
+        )
+        self.config.start()
+        self.job_queue = JobQueueService()
+
+    def tearDown(self):
+        self.config.stop()
+        self.temp_dir.cleanup()
+
+    def test_queue_is_disabled_without_file(self):
+        with patch.dict(
+            "server.services.jobs.queue_service.current_app.config",
+            {"JOB_QUEUE_FILE": None},
+        ):
+            self.assertFalse(JobQueueService().is_enabled())
+
+    def test_jobs_are_claimed_in_order(self):
+        first_job_id = self.job_queue.enqueue("create_git_document", {"id": 1})
+        second_job_id = self.job_queue.enqueue("update_git_document", "HOT", 1, {})
+
+        job = self.job_queue.claim()
+        self.assertEqual(first_job_id, job["job_id"])
+        self.assertEqual([{"id": 1}], job["arguments"])
+        self.assertEqual("running", job["status"])
+        self.assertEqual(1, job["attempts"])
+
+        job = self.job_queue.claim()
+        self.assertEqual(second_job_id, job["job_id"])
+        self.assertEqual(["HOT", 1, {}], job["arguments"])
+        self.assertIsNone(self.job_queue.claim())
+
+    def test_jobs_survive_a_restart(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+
+        job = JobQueueService().claim()
+        self.assertEqual(job_id, job["job_id"])
+
+    def test_finished_job(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+        job = self.job_queue.claim()
+
+        self.assertEqual("succeeded", self.job_queue.finish(job, "Created", 201))
+        job = self.job_queue.get_job(job_id)
+        self.assertEqual("succeeded", job["status"])
+        self.assertEqual(201, job["result_status"])
+        self.assertEqual("Created", job["detail"])
+        self.assertIsNone(self.job_queue.claim())
+
+    def test_client_errors_are_not_retried(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+        job = self.job_queue.claim()
+
+        self.assertEqual("failed", self.job_queue.finish(job, "Invalid", 400))
+        self.assertIsNone(self.job_queue.claim())
+        self.assertEqual("failed", self.job_queue.get_job(job_id)["status"])
+
+    def test_server_errors_are_retried(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+        job = self.job_queue.claim()
+
+        self.assertEqual("queued", self.job_queue.finish(job, "Push failed", 503))
+        job = self.job_queue.claim()
+        self.assertEqual(job_id, job["job_id"])
+        self.assertEqual(2, job["attempts"])
+        self.assertEqual("failed", self.job_queue.finish(job, "Push failed", 503))
+
+    def test_expired_lease_is_claimed_again(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+        self.job_queue.lease_seconds = 0
+        self.job_queue.claim()
+        time.sleep(0.01)
+
+        job = self.job_queue.claim()
+        self.assertEqual(job_id, job["job_id"])
+        self.assertEqual(2, job["attempts"])
+
+        time.sleep(0.01)
+        self.assertIsNone(self.job_queue.claim())
+        job = self.job_queue.get_job(job_id)
+        self.assertEqual("failed", job["status"])
+        self.assertEqual("Job stopped after 2 attempts", job["detail"])
+
+    def test_renewed_lease_is_not_claimed_again(self):
+        self.job_queue.enqueue("create_git_document", {})
+        self.job_queue.lease_seconds = 0
+        job = self.job_queue.claim()
+
+        self.job_queue.lease_seconds = 300
+        self.assertTrue(self.job_queue.renew(job))
+        self.assertIsNone(self.job_queue.claim())
+
+    def test_result_of_a_lost_claim_is_discarded(self):
+        job_id = self.job_queue.enqueue("create_git_document", {})
+        self.job_queue.lease_seconds = 0
+        first_job = self.job_queue.claim()
+        time.sleep(0.01)
+        second_job = self.job_queue.claim()
+
+        self.assertFalse(self.job_queue.renew(first_job))
+        self.assertEqual("succeeded", self.job_queue.finish(second_job, "Created", 201))
+        self.assertIsNone(self.job_queue.finish(first_job, "Push failed", 503))
+        job = self.job_queue.get_job(job_id)
+        self.assertEqual("succeeded", job["status"])
+        self.assertEqual("Created", job["detail"])
@@ -0,0 +1,105 @@
+import tempfile
+import time
+from unittest.mock import patch
+
+from flask import url_for
+
+from server.tests.base_test_config import BaseTestCase
+from server.tests.helpers import utils
+from server.services.jobs.queue_service import JobQueueService
+from server.services.jobs.worker_pool import job_workers
+
+
+class TestJobWorkerPool(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app.config.update(
+            {
+                "JOB_QUEUE_FILE": f"{self.temp_dir.name}/jobs.sqlite",
+                "JOB_RETRY_DELAY": 0,
+                "AUTHORIZATION_TOKEN": "secrettokenexample",
+            }
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_run_next_without_jobs(self):
+        self.assertFalse(job_workers.run_next())
+
+    def test_unknown_action(self):
+        job_id = JobQueueService().enqueue("unknown_action")
+
+        self.assertTrue(job_workers.run_next())
+        job = JobQueueService().get_job(job_id)
+        self.assertEqual("queued", job["status"])
+        self.assertEqual("Unknown action unknown_action", job["detail"])
+
+    def test_lease_is_renewed_while_the_job_runs(self):
+        self.app.config["JOB_LEASE_SECONDS"] = 0.3
+        claimed_jobs = []
+
+        def slow_action():
+            time.sleep(0.5)
+            claimed_jobs.append(JobQueueService().claim())
+            return {"detail": "Done"}, 201
+
+        job_workers.actions["slow_action"] = slow_action
+        try:
+            job_id = JobQueueService().enqueue("slow_action")
+            self.assertTrue(job_workers.run_next())
+        finally:
+            del job_workers.actions["slow_action"]
+
+        self.assertEqual([None], claimed_jobs)
+        job = JobQueueService().get_job(job_id)
+        self.assertEqual("succeeded", job["status"])
+        self.assertEqual(1, job["attempts"])
+
+    @patch("server.api.git.resources.GitService")
+    def test_queued_report(self, mocked_git_service):
+        response = self.client.post(
+            url_for("create_git_document"),
+            json=utils.document_data,
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+        self.assertEqual(202, response.status_code)
+        job_id = response.json["job_id"]
+        self.assertTrue(response.headers["Location"].endswith(f"/jobs/{job_id}/"))
+        mocked_git_service.return_value.create_document.assert_not_called()
+
+        job_url = url_for("get_job", job_id=job_id)
+        headers = {"Authorization": "Token secrettokenexample"}
+        self.assertEqual(
+            "queued", self.client.get(job_url, headers=headers).json["status"]
+        )
+
+        self.assertTrue(job_workers.run_next())
+        mocked_git_service.return_value.create_document.assert_called_once()
+        job = self.client.get(job_url, headers=headers).json
+        self.assertEqual("succeeded", job["status"])
+        self.assertEqual(201, job["result_status"])
+        self.assertEqual(
+            f"Document for project {utils.document_data['project']['projectId']}"
+            " created",
+            job["detail"],
+        )
+
+    def test_invalid_report_is_not_queued(self):
+        response = self.client.post(
+            url_for("create_git_document"),
+            json={"project": {"name": "project name"}},
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+
+        self.assertEqual(400, response.status_code)
+        self.assertFalse(job_workers.run_next())
+
+    def test_unknown_job(self):
+        response = self.client.get(
+            url_for("get_job", job_id="unknown"),
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,85 @@
+import tempfile
+from unittest.mock import patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.idempotency_store import IdempotencyStore
+
+
+class TestIdempotencyStore(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.store_file = f"{self.temp_dir.name}/idempotency.sqlite"
+        self.store = IdempotencyStore(self.store_file, max_entries=2, ttl=60)
+        self.response = (
+            b'{"detail": "created"}',
+            201,
+            [("Content-Type", "application/json")],
+        )
+
+    def test_stored_response_is_replayed(self):
+        self.assertEqual(
+            (self.store.started, None), self.store.begin("key", "request hash")
+        )
+        self.assertEqual(
+            (self.store.in_progress, None), self.store.begin("key", "request hash")
+        )
+
+        self.store.complete("key", self.response)
+        self.assertEqual(
+            (self.store.replayed, self.response),
+            self.store.begin("key", "request hash"),
+        )
+        self.assertEqual(
+            (self.store.mismatched, None), self.store.begin("key", "other hash")
+        )
+
+    def test_store_is_shared_between_processes(self):
+        other_store = IdempotencyStore(self.store_file, max_entries=2, ttl=60)
+        self.store.begin("key", "request hash")
+        self.assertEqual(
+            (other_store.in_progress, None), other_store.begin("key", "request hash")
+        )
+
+        self.store.complete("key", self.response)
+        self.assertEqual(
+            (other_store.replayed, self.response),
+            other_store.begin("key", "request hash"),
+        )
+
+    def test_cancelled_request_can_be_retried(self):
+        self.store.begin("key", "request hash")
+        self.store.cancel("key")
+
+        self.assertEqual(
+            (self.store.started, None), self.store.begin("key", "request hash")
+        )
+
+    def test_keys_are_evicted(self):
+        for key in ["first", "second", "third"]:
+            self.store.begin(key, "request hash")
+            self.store.complete(key, self.response)
+
+        self.assertEqual(["second", "third"], self.store.get_keys())
+
+    @patch("server.services.idempotency_store.time.time")
+    def test_keys_expire(self, mocked_time):
+        mocked_time.return_value = 0
+        self.store.begin("key", "request hash")
+        self.store.complete("key", self.response)
+
+        mocked_time.return_value = 61
+        self.assertEqual(
+            (self.store.started, None), self.store.begin("key", "request hash")
+        )
+
+    @patch("server.services.idempotency_store.time.time")
+    def test_keys_in_progress_expire(self, mocked_time):
+        mocked_time.return_value = 0
+        self.store.begin("key", "request hash")
+
+        mocked_time.return_value = self.store.in_progress_ttl + 1
+        self.assertEqual(
+            (self.store.started, None), self.store.begin("key", "request hash")
+        )
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.metrics_service import MetricsRegistry, metrics
+
+
+class TestMetricsService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.metrics = MetricsRegistry()
+        self.metrics.enabled = True
+
+    def test_disabled_metrics_are_not_recorded(self):
+        self.metrics.enabled = False
+
+        @self.metrics.timed("stage")
+        def run_stage():
+            return "result"
+
+        self.assertEqual("result", run_stage())
+        with self.metrics.time_stage("other stage"):
+            pass
+        self.assertEqual({}, self.metrics.stage_duration.values)
+
+    def test_failed_stages_are_timed(self):
+        @self.metrics.timed("stage")
+        def run_stage():
+            raise ValueError("failed")
+
+        with self.assertRaises(ValueError):
+            run_stage()
+        bucket_counts, total = self.metrics.stage_duration.values[("stage",)]
+        self.assertEqual(1, sum(bucket_counts))
+
+    def test_histogram_is_rendered(self):
+        self.metrics.observe(self.metrics.stage_duration, ("git_push",), 0.2)
+        self.metrics.observe(self.metrics.stage_duration, ("git_push",), 100)
+
+        text = self.metrics.render()
+
+        self.assertIn("# TYPE oeg_stage_duration_seconds histogram", text)
+        self.assertIn(
+            'oeg_stage_duration_seconds_bucket{stage="git_push",le="0.1"} 0', text
+        )
+        self.assertIn(
+            'oeg_stage_duration_seconds_bucket{stage="git_push",le="0.25"} 1', text
+        )
+        self.assertIn(
+            'oeg_stage_duration_seconds_bucket{stage="git_push",le="+Inf"} 2', text
+        )
+        self.assertIn('oeg_stage_duration_seconds_sum{stage="git_push"} 100.2', text)
+        self.assertIn('oeg_stage_duration_seconds_count{stage="git_push"} 2', text)
+
+    def test_mediawiki_responses_are_recorded_by_action_and_error(self):
+        response = MagicMock(
+            headers={"MediaWiki-API-Error": "articleexists"},
+            status_code=200,
+            elapsed=timedelta(milliseconds=30),
+        )
+        response.request.url = "https://wiki.test/api.php?action=edit&format=json"
+
+        self.metrics.observe_mediawiki_response(response)
+
+        self.assertIn(
+            ("edit", "articleexists"), self.metrics.mediawiki_request_duration.values
+        )
+
+    def test_counter_is_rendered(self):
+        self.metrics.increment(self.metrics.git_pushes, ("retries",))
+        self.metrics.increment(self.metrics.git_pushes, ("retries",))
+
+        text = self.metrics.render()
+
+        self.assertIn("# TYPE oeg_git_push_total counter", text)
+        self.assertIn('oeg_git_push_total{result="retries"} 2', text)
+        self.assertIn('oeg_git_push_total{result="failures"} 0', text)
+
+    def test_collected_counters_are_rendered(self):
+        self.metrics.add_collector(self.metrics.collect_service_metrics)
+
+        text = self.metrics.render()
+
+        self.assertIn(
+            'oeg_document_cache_requests_total{cache="wiki",result="hit"}', text
+        )
+
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_metrics_endpoint(self):
+        headers = {"Authorization": "Token secrettokenexample"}
+        with patch.object(metrics, "enabled", False):
+            response = self.client.get("/metrics", headers=headers)
+        self.assertEqual(404, response.status_code)
+
+        with patch.object(metrics, "enabled", True):
+            response = self.client.get("/metrics", headers=headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("text/plain", response.mimetype)
+        self.assertIn(b"oeg_stage_duration_seconds", response.data)
+
+    def test_stages_are_traced_when_metrics_are_disabled(self):
+        self.metrics.enabled = False
+        self.metrics.start_trace("request")
+
+        with self.metrics.time_stage("wiki_read_page"):
+            with self.metrics.time_stage("mediawiki_fetch"):
+                pass
+        trace = self.metrics.finish_trace()
+
+        self.assertEqual("request", trace["name"])
+        self.assertEqual(["wiki_read_page"], [s["name"] for s in trace["children"]])
+        self.assertEqual(
+            ["mediawiki_fetch"],
+            [s["name"] for s in trace["children"][0]["children"]],
+        )
+        self.assertEqual({}, self.metrics.stage_duration.values)
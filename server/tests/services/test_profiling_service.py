@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import time
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.profiling_service import RequestProfiler
+
+
+class TestProfilingService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.app.config.update(
+            {
+                "PROFILING_DIR": self.profile_dir.name,
+                "PROFILING_SECRET": "profilingsecret",
+                "PROFILING_SAMPLE_RATE": 0,
+                "AUTHORIZATION_TOKEN": "secrettokenexample",
+            }
+        )
+        self.profiler = RequestProfiler()
+        self.profiler.init_app(self.app)
+        self.headers = {"Authorization": "Token secrettokenexample"}
+
+    def tearDown(self):
+        self.profile_dir.cleanup()
+
+    def get_job(self, headers: dict):
+        return self.client.get("/jobs/job/", headers={**self.headers, **headers})
+
+    def test_signed_request_is_profiled(self):
+        signature = RequestProfiler.sign(
+            "profilingsecret", int(time.time()), "GET", "/jobs/job/"
+        )
+
+        response = self.get_job(
+            {"X-Profile-Signature": signature, "X-Request-ID": "slow-report"}
+        )
+
+        self.assertEqual("slow-report", response.headers["X-Request-ID"])
+        self.assertEqual(
+            ["get_job-slow-report.prof", "get_job-slow-report.spans.json"],
+            sorted(os.listdir(self.profile_dir.name)),
+        )
+        with open(f"{self.profile_dir.name}/get_job-slow-report.spans.json") as f:
+            spans = json.load(f)
+        self.assertEqual("GET get_job", spans["name"])
+
+    def test_unsigned_request_is_not_profiled(self):
+        for signature in [
+            None,
+            RequestProfiler.sign("wrongsecret", int(time.time()), "GET", "/jobs/job/"),
+            RequestProfiler.sign(
+                "profilingsecret", int(time.time()) - 3600, "GET", "/jobs/job/"
+            ),
+            RequestProfiler.sign(
+                "profilingsecret", int(time.time()), "GET", "/jobs/other/"
+            ),
+        ]:
+            response = self.get_job(
+                {"X-Profile-Signature": signature} if signature else {}
+            )
+            self.assertNotIn("X-Request-ID", response.headers)
+        self.assertEqual([], os.listdir(self.profile_dir.name))
+
+    def test_sampled_request_is_profiled(self):
+        self.profiler.sample_rate = 1
+
+        response = self.get_job({"X-Request-ID": "../invalid id"})
+
+        request_id = response.headers["X-Request-ID"]
+        self.assertNotEqual("../invalid id", request_id)
+        self.assertIn(f"get_job-{request_id}.prof", os.listdir(self.profile_dir.name))
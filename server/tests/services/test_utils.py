@@ -2,6 +2,7 @@ import copy
 
 from server.tests.base_test_config import BaseTestCase
 from server.tests.helpers import utils
+from server.models.serializers.document import DocumentSchema
 from server.services.utils import update_document
 
 
@@ -9,24 +10,34 @@ class TestServiceUtils(BaseTestCase):
     def setUp(self):
         super().setUp()
         self.document_data = utils.document_data
+        self.document = DocumentSchema().load(self.document_data)
+
+    def load_update_fields(self, update_fields):
+        return DocumentSchema(partial=True).load(update_fields)
 
     def test_update_document_key(self):
         update_fields = {"project": {"name": "update project name"}}
-        updated_document = update_document(self.document_data, update_fields)
+        updated_document, changed_fields = update_document(
+            self.document, self.load_update_fields(update_fields)
+        )
 
         expected_document = copy.deepcopy(self.document_data)
         expected_document["project"]["name"] = "update project name"
 
-        self.assertDictEqual(expected_document, updated_document)
+        self.assertDictEqual(expected_document, updated_document.to_json())
+        self.assertEqual(["project.name"], changed_fields)
 
     def test_update_document_nested_key(self):
         update_fields = {"project": {"externalSource": {"license": "updated license"}}}
-        updated_document = update_document(self.document_data, update_fields)
+        updated_document, changed_fields = update_document(
+            self.document, self.load_update_fields(update_fields)
+        )
 
         expected_document = copy.deepcopy(self.document_data)
         expected_document["project"]["externalSource"]["license"] = "updated license"
 
-        self.assertDictEqual(expected_document, updated_document)
+        self.assertDictEqual(expected_document, updated_document.to_json())
+        self.assertEqual(["project.external_source.license"], changed_fields)
 
     def test_update_document_list_key(self):
         updated_users_list = [
@@ -34,9 +45,30 @@ class TestServiceUtils(BaseTestCase):
             {"userName": "second user name example", "userId": 2},
         ]
         update_fields = {"project": {"users": updated_users_list}}
-        updated_document = update_document(self.document_data, update_fields)
+        updated_document, changed_fields = update_document(
+            self.document, self.load_update_fields(update_fields)
+        )
 
         expected_document = copy.deepcopy(self.document_data)
         expected_document["project"]["users"] = updated_users_list
 
-        self.assertDictEqual(expected_document, updated_document)
+        self.assertDictEqual(expected_document, updated_document.to_json())
+        self.assertEqual(["project.users"], changed_fields)
+
+    def test_update_document_without_changes(self):
+        update_fields = {"project": {"name": self.document_data["project"]["name"]}}
+        updated_document, changed_fields = update_document(
+            self.document, self.load_update_fields(update_fields)
+        )
+
+        self.assertIs(self.document, updated_document)
+        self.assertEqual([], changed_fields)
+
+    def test_update_document_removes_null_fields(self):
+        updated_document, changed_fields = update_document(
+            self.document, {"project": {"external_source": {"license": None}}}
+        )
+
+        self.assertNotIn("license", updated_document.project.external_source)
+        self.assertIn("license", self.document.project.external_source)
+        self.assertEqual(["project.external_source.license"], changed_fields)
@@ -0,0 +1,44 @@
+import gc
+
+from server.tests.base_test_config import BaseTestCase
+from server.lazy import LazyView
+from server.models.serializers.document import OverviewPageSchema
+from server.models.serializers.registry import schema_registry
+from server.services.warmup_service import WarmupService
+from server.services.wiki.pages.templates import ProjectPageTemplates
+from server.services.wiki.wiki_section_service import compiled_templates
+from server.services.wiki.wiki_text_service import WikiTextService
+
+
+class TestWarmupService(BaseTestCase):
+    def tearDown(self):
+        gc.unfreeze()
+
+    def test_warmup_builds_views_templates_and_schemas(self):
+        WarmupService(self.app).warmup()
+
+        for view_func in self.app.view_functions.values():
+            if isinstance(view_func, LazyView):
+                self.assertIn("view", view_func.__dict__)
+        self.assertIn(ProjectPageTemplates.page_template, compiled_templates)
+        self.assertIn((OverviewPageSchema, None, True), schema_registry.schemas)
+
+    def test_compiled_template_generates_same_text(self):
+        page_data = {
+            "Project": {"Short Description": "\nDescription\n", "Url": "\nUrl\n"},
+            "Team and User": {"List of Users": "\nUsers\n"},
+        }
+        template_text = ProjectPageTemplates.page_template
+        compiled_templates.pop(template_text, None)
+        expected_text = WikiTextService().generate_text_from_dict(
+            template_text, "=Project=", page_data
+        )
+
+        WarmupService(self.app).compile_templates()
+
+        self.assertEqual(
+            expected_text,
+            WikiTextService().generate_text_from_dict(
+                template_text, "=Project=", page_data
+            ),
+        )
@@ -261,3 +261,16 @@ class TestOverviewService(BaseTestCase):
         self.assertTupleEqual(
             expected_platforms_and_organisations, platforms_and_organisations
         )
+
+    @patch("server.services.wiki.pages.overview_service.MediaWikiService")
+    def test_documents_to_report(self, mocked_mediawiki):
+        mocked_mediawiki.return_value.is_existing_page.return_value = False
+        new_organisation_document = deepcopy(self.document_data)
+        new_organisation_document["organisation"]["name"] = "new organisation"
+
+        documents_to_report = OverviewPageService().documents_to_report(
+            [self.document_data, self.document_data, new_organisation_document]
+        )
+        self.assertEqual(
+            [self.document_data, new_organisation_document], documents_to_report
+        )
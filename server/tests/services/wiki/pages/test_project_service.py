@@ -3,7 +3,9 @@ from unittest.mock import patch
 
 from server.tests.base_test_config import BaseTestCase
 from server.tests.helpers import utils
+from server.services.metrics_service import metrics
 from server.services.wiki.pages.project_service import ProjectPageService
+from server.services.wiki.wiki_text_service import WikiTextService
 from server.models.serializers.document import DocumentSchema
 
 
@@ -41,12 +43,13 @@ class TestProjectService(BaseTestCase):
                 }
             },
         )
+        self.document = DocumentSchema().load(self.document_data)
         self.templates = utils.ProjectPageTemplates()
 
     def test_filter_page_data(self):
-        project_page_data = ProjectPageService().filter_page_data(self.document_data)
+        project_page_data = ProjectPageService().filter_page_data(self.document)
         project_is_subset = set(project_page_data.keys()).issubset(
-            self.document_data.keys()
+            self.document.keys()
         )
         self.assertTrue(project_is_subset)
 
@@ -94,7 +97,7 @@ class TestProjectService(BaseTestCase):
 
     def test_get_project_users_table_rows(self):
         project_users_row = ProjectPageService().get_project_users_table_rows(
-            self.document_data
+            self.document
         )
         expected_project_users_row = "\n| 1\n| user name example\n|-"
         self.assertEqual(expected_project_users_row, project_users_row)
@@ -123,7 +126,7 @@ class TestProjectService(BaseTestCase):
             f"{self.templates.oeg_page}/Projects/"
             f"{self.document_data['project']['name'].capitalize()}"
         )
-        ProjectPageService().create_page(self.document_data)
+        ProjectPageService().create_page(self.document)
         mocked_mediawiki.return_value.create_page.assert_called_with(
             token=token, page_title=page_title, page_text=text_with_table
         )
@@ -134,10 +137,28 @@ class TestProjectService(BaseTestCase):
         self, mocked_table_row, mocked_mediawiki
     ):
         token = "token example"
+        mocked_table_row.return_value = "Page text"
         mocked_mediawiki.return_value.get_token.return_value = token
         mocked_mediawiki.return_value.is_existing_page.return_value = True
+        mocked_mediawiki.return_value.get_page_text_hash.return_value = (
+            WikiTextService().get_page_text_hash("Other page text")
+        )
         with self.assertRaises(ValueError):
-            ProjectPageService().create_page(self.document_data)
+            ProjectPageService().create_page(self.document)
+
+    @patch("server.services.wiki.pages.project_service.MediaWikiService")
+    @patch("server.services.wiki.pages.project_service.WikiTableService.add_table_row")
+    def test_create_page_with_same_existing_page(
+        self, mocked_table_row, mocked_mediawiki
+    ):
+        mocked_table_row.return_value = "Page text"
+        mocked_mediawiki.return_value.is_existing_page.return_value = True
+        mocked_mediawiki.return_value.get_page_text_hash.return_value = (
+            WikiTextService().get_page_text_hash("Page text")
+        )
+
+        ProjectPageService().create_page(self.document)
+        mocked_mediawiki.return_value.create_page.assert_not_called()
 
     def test_get_project_users(self):
         user_id = 1
@@ -222,7 +243,9 @@ class TestProjectService(BaseTestCase):
         mocked_edited_page_text.return_value = updated_text
 
         ProjectPageService().edit_page(
-            updated_project_page_data, update_fields, current_project_page_data
+            DocumentSchema(partial=True).load(updated_project_page_data),
+            update_fields,
+            current_project_page_data,
         )
         mocked_mediawiki.return_value.edit_page.assert_called_once_with(
             "token example",
@@ -230,6 +253,31 @@ class TestProjectService(BaseTestCase):
             updated_text,
         )
 
+    @patch("server.services.wiki.pages.project_service." "MediaWikiService")
+    @patch(
+        "server.services.wiki.pages.project_service."
+        "ProjectPageService.generate_page_text"
+    )
+    def test_edit_page_skips_unchanged_page(
+        self, mocked_generate_page_text, mocked_mediawiki
+    ):
+        page_text = "Page text"
+        mocked_generate_page_text.return_value = page_text
+        mocked_mediawiki.return_value.get_page_text_hash.return_value = (
+            WikiTextService().get_page_text_hash(f"{page_text}\n")
+        )
+        skipped_edits = metrics.wiki_page_edits.get(("skipped",))
+
+        ProjectPageService().edit_page(
+            self.project_data,
+            {"project": {"shortDescription": "description"}},
+            {"project": {"name": self.document_data["project"]["name"]}},
+        )
+
+        mocked_mediawiki.return_value.get_token.assert_not_called()
+        mocked_mediawiki.return_value.edit_page.assert_not_called()
+        self.assertEqual(skipped_edits + 1, metrics.wiki_page_edits.get(("skipped",)))
+
     @patch("server.services.wiki.pages.project_service." "MediaWikiService")
     @patch("server.services.wiki.wiki_table_service." "WikiTableService.add_table_row")
     def test_edit_page_move_project_page(
@@ -271,7 +319,9 @@ class TestProjectService(BaseTestCase):
         mocked_edited_page_text.return_value = updated_text
 
         ProjectPageService().edit_page(
-            updated_project_page_data, update_fields, current_project_page_data
+            DocumentSchema(partial=True).load(updated_project_page_data),
+            update_fields,
+            current_project_page_data,
         )
 
         mocked_mediawiki.return_value.move_page.assert_called_once_with(
@@ -86,6 +86,7 @@ class TestWikiUtils(BaseTestCase):
         document_fields = ["organisation", "platform", "project"]
         self.assertCountEqual(list(document_data[0].keys()), document_fields)
         self.assertCountEqual(list(document_data[1].keys()), document_fields)
+        self.assertEqual(["project.name"], document_data[2])
 
     @patch("server.services.wiki.pages.utils." "ProjectPageService.wikitext_to_dict")
     @patch(
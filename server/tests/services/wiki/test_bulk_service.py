@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from requests.exceptions import ConnectionError
+
+from server.tests.base_test_config import BaseTestCase
+from server.tests.helpers import utils
+from server.models.serializers.document import DocumentSchema
+from server.services.wiki.bulk_service import WikiBulkService
+from server.services.wiki.mediawiki_service import MediaWikiServiceError
+
+
+@patch("server.services.wiki.bulk_service.ProjectPageService")
+@patch("server.services.wiki.bulk_service.OrganisationPageService")
+@patch("server.services.wiki.bulk_service.OverviewPageService")
+class TestWikiBulkService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.documents = []
+        for project_id, organisation_name in enumerate(["HOT", "HOT", "OSMF"], 1):
+            document = DocumentSchema().load(utils.document_data)
+            document.project.project_id = project_id
+            document.project.name = f"Project {project_id}"
+            document.organisation.name = organisation_name
+            self.documents.append(document)
+
+    def test_shared_pages_are_edited_once(
+        self, mocked_overview_page, mocked_organisation_page, mocked_project_page
+    ):
+        mocked_overview_page.return_value.documents_to_report.side_effect = (
+            lambda documents: documents[:1]
+        )
+        mocked_organisation_page.return_value.documents_to_report.side_effect = (
+            lambda documents: documents
+        )
+
+        results = WikiBulkService(workers=2).create_documents(self.documents)
+
+        self.assertEqual([201, 201, 201], [result["status"] for result in results])
+        mocked_overview_page.return_value.add_documents.assert_called_once_with(
+            self.documents[:1]
+        )
+        organisation_page = mocked_organisation_page.return_value
+        self.assertEqual(2, organisation_page.add_documents.call_count)
+        organisation_page.add_documents.assert_any_call(self.documents[:2])
+        organisation_page.add_documents.assert_any_call(self.documents[2:])
+        self.assertEqual(3, mocked_project_page.return_value.create_page.call_count)
+
+    def test_organisation_page_error(
+        self, mocked_overview_page, mocked_organisation_page, mocked_project_page
+    ):
+        mocked_overview_page.return_value.documents_to_report.return_value = []
+
+        def add_documents(documents):
+            if documents[0]["organisation"]["name"] == "OSMF":
+                raise MediaWikiServiceError("Invalid token")
+
+        organisation_page = mocked_organisation_page.return_value
+        organisation_page.documents_to_report.side_effect = lambda documents: documents
+        organisation_page.add_documents.side_effect = add_documents
+
+        results = WikiBulkService(workers=2).create_documents(self.documents)
+
+        self.assertEqual([201, 201, 409], [result["status"] for result in results])
+        self.assertEqual("Invalid token", results[2]["detail"])
+        mocked_overview_page.return_value.add_documents.assert_not_called()
+        self.assertEqual(2, mocked_project_page.return_value.create_page.call_count)
+
+    def test_overview_page_error(
+        self, mocked_overview_page, mocked_organisation_page, mocked_project_page
+    ):
+        mocked_overview_page.return_value.documents_to_report.side_effect = (
+            ConnectionError
+        )
+
+        results = WikiBulkService(workers=2).create_documents(self.documents)
+
+        self.assertEqual([500, 500, 500], [result["status"] for result in results])
+        mocked_organisation_page.return_value.add_documents.assert_not_called()
+        mocked_project_page.return_value.create_page.assert_not_called()
@@ -0,0 +1,80 @@
+import tempfile
+from unittest.mock import patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.services.wiki.document_cache import WikiDocumentCache
+
+
+class TestWikiDocumentCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = WikiDocumentCache(max_entries=2, ttl=60)
+        self.document_json = {"project": {"name": "Project name"}}
+
+    def test_cached_document(self):
+        self.assertIsNone(self.cache.get("HOT", "Project_name"))
+
+        etag = self.cache.set("HOT", "Project_name", self.document_json)
+        self.assertEqual(
+            (self.document_json, etag), self.cache.get("hot", "project name")
+        )
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_etag_changes_with_document(self):
+        etag = self.cache.set("HOT", "Project name", self.document_json)
+
+        self.assertEqual(etag, self.cache.get_etag({**self.document_json}))
+        self.assertNotEqual(
+            etag, self.cache.get_etag({"project": {"name": "Other name"}})
+        )
+
+    def test_invalidate_organisation(self):
+        self.cache.set("HOT", "First project", self.document_json)
+        self.cache.set("OSMF", "Second project", self.document_json)
+
+        self.cache.invalidate_organisation("hot")
+        self.assertIsNone(self.cache.get("HOT", "First project"))
+        self.assertIsNotNone(self.cache.get("OSMF", "Second project"))
+
+    def test_document_read_before_invalidation_is_not_cached(self):
+        generation = self.cache.get_generation("HOT")
+        self.cache.invalidate_organisation("hot")
+
+        self.cache.set("HOT", "Project name", self.document_json, generation)
+        self.assertIsNone(self.cache.get("HOT", "Project name"))
+
+        self.cache.set(
+            "HOT", "Project name", self.document_json, self.cache.get_generation("HOT")
+        )
+        self.assertIsNotNone(self.cache.get("HOT", "Project name"))
+
+    def test_invalidation_is_shared_by_processes(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            generations_file = f"{cache_dir}/wiki_document_cache.sqlite"
+            cache = WikiDocumentCache(generations_file=generations_file)
+            other_process_cache = WikiDocumentCache(generations_file=generations_file)
+            generation = cache.get_generation("HOT")
+            cache.set("HOT", "Project name", self.document_json, generation)
+
+            other_process_cache.invalidate_organisation("hot")
+
+            self.assertEqual(generation + 1, cache.get_generation("HOT"))
+            self.assertIsNone(cache.get("HOT", "Project name"))
+            cache.set("HOT", "Project name", self.document_json, generation)
+            self.assertIsNone(cache.get("HOT", "Project name"))
+
+    def test_documents_are_evicted(self):
+        for project_name in ["First", "Second", "Third"]:
+            self.cache.set("HOT", project_name, self.document_json)
+
+        self.assertIsNone(self.cache.get("HOT", "First"))
+        self.assertIsNotNone(self.cache.get("HOT", "Third"))
+
+    @patch("server.services.wiki.document_cache.time.monotonic")
+    def test_documents_expire(self, mocked_monotonic):
+        mocked_monotonic.return_value = 0
+        self.cache.set("HOT", "Project name", self.document_json)
+
+        mocked_monotonic.return_value = 61
+        self.assertIsNone(self.cache.get("HOT", "Project name"))
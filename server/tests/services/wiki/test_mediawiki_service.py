@@ -5,6 +5,7 @@ from server.services.wiki.mediawiki_service import (
     MediaWikiService,
     MediaWikiServiceError,
 )
+from server.services.wiki.wiki_text_service import WikiTextService
 
 
 @patch("server.services.wiki.mediawiki_service.requests.Session")
@@ -45,6 +46,149 @@ class TestMediaWikiService(BaseTestCase):
         with self.assertRaises(MediaWikiServiceError):
             mediawiki.get_page_text(page_title)
 
+    @patch.dict(
+        "server.services.wiki.mediawiki_service.current_app.config",
+        {"WIKI_API_ENDPOINT": "https://your-wiki.org/api.php"},
+    )
+    def test_page_text_hash_is_kept_for_the_request(self, mocked_session):
+        mediawiki = MediaWikiService()
+        mocked_session.return_value.get.reset_mock()
+        mocked_session.return_value.get.return_value.json.return_value = {
+            "parse": {"wikitext": {"*": "page text"}}
+        }
+        mocked_session.return_value.post.return_value.json.return_value = {
+            "edit": {"result": "Success"}
+        }
+        page_text_hash = WikiTextService().get_page_text_hash("page text")
+
+        self.assertEqual(page_text_hash, mediawiki.get_page_text_hash("example page"))
+        self.assertEqual(page_text_hash, mediawiki.get_page_text_hash("example page"))
+        self.assertEqual(1, mocked_session.return_value.get.call_count)
+
+        mediawiki.edit_page("token", "example page", "updated text")
+        self.assertEqual(
+            WikiTextService().get_page_text_hash("updated text"),
+            mediawiki.get_page_text_hash("example page"),
+        )
+
+        mocked_session.return_value.post.return_value.json.return_value = {
+            "move": {"from": "example page", "to": "moved page"}
+        }
+        mediawiki.move_page("token", "example page", "moved page")
+        self.assertEqual(
+            WikiTextService().get_page_text_hash("updated text"),
+            mediawiki.get_page_text_hash("moved page"),
+        )
+        self.assertEqual(1, mocked_session.return_value.get.call_count)
+
+    @patch.dict(
+        "server.services.wiki.mediawiki_service.current_app.config",
+        {"WIKI_API_ENDPOINT": "https://your-wiki.org/api.php"},
+    )
+    def test_get_pages_text(self, mocked_session):
+        mediawiki = MediaWikiService()
+        mocked_session.return_value.post.return_value.json.return_value = {
+            "query": {
+                "normalized": [{"from": "example_page", "to": "Example page"}],
+                "pages": [
+                    {
+                        "title": "Example page",
+                        "revisions": [{"slots": {"main": {"content": "page text"}}}],
+                    },
+                    {"title": "Missing page", "missing": True},
+                ],
+            }
+        }
+        pages_text = mediawiki.get_pages_text(["example_page", "Missing page"])
+        mocked_session.return_value.post.assert_called_with(
+            url="https://your-wiki.org/api.php",
+            params={
+                "action": "query",
+                "maxlag": "5",
+                "prop": "revisions",
+                "rvprop": "content",
+                "rvslots": "main",
+                "format": "json",
+                "formatversion": "2",
+            },
+            data={"titles": "example_page|Missing page"},
+        )
+        self.assertEqual(
+            {"example_page": "page text", "Missing page": None}, pages_text
+        )
+
+    @patch.dict(
+        "server.services.wiki.mediawiki_service.current_app.config",
+        {"WIKI_API_ENDPOINT": "https://your-wiki.org/api.php"},
+    )
+    def test_get_pages_text_follows_continue(self, mocked_session):
+        mediawiki = MediaWikiService()
+        mocked_session.return_value.post.return_value.json.side_effect = [
+            {
+                "continue": {"rvcontinue": "2|2", "continue": "||"},
+                "query": {
+                    "pages": [
+                        {
+                            "title": "First page",
+                            "revisions": [{"slots": {"main": {"content": "first"}}}],
+                        },
+                        {"title": "Second page"},
+                    ]
+                },
+            },
+            {
+                "query": {
+                    "pages": [
+                        {"title": "First page"},
+                        {
+                            "title": "Second page",
+                            "revisions": [{"slots": {"main": {"content": "second"}}}],
+                        },
+                    ]
+                }
+            },
+        ]
+
+        pages_text = mediawiki.get_pages_text(["First page", "Second page"])
+
+        self.assertEqual({"First page": "first", "Second page": "second"}, pages_text)
+        self.assertEqual(
+            {"rvcontinue": "2|2", "continue": "||"},
+            {
+                key: value
+                for key, value in mocked_session.return_value.post.call_args.kwargs[
+                    "params"
+                ].items()
+                if "continue" in key
+            },
+        )
+
+    @patch("server.services.wiki.mediawiki_service.time.sleep")
+    @patch.dict(
+        "server.services.wiki.mediawiki_service.current_app.config",
+        {"WIKI_API_ENDPOINT": "https://your-wiki.org/api.php"},
+    )
+    def test_get_pages_text_retries_maxlag(self, mocked_sleep, mocked_session):
+        mediawiki = MediaWikiService()
+        mocked_session.return_value.post.return_value.headers = {"Retry-After": "2"}
+        mocked_session.return_value.post.return_value.json.side_effect = [
+            {"error": {"code": "maxlag"}},
+            {"query": {"pages": [{"title": "Missing page", "missing": True}]}},
+        ]
+
+        pages_text = mediawiki.get_pages_text(["Missing page"])
+
+        self.assertEqual({"Missing page": None}, pages_text)
+        mocked_sleep.assert_called_once_with(2.0)
+
+        mocked_session.return_value.post.return_value.json.side_effect = None
+        mocked_session.return_value.post.return_value.json.return_value = {
+            "error": {"code": "maxlag"}
+        }
+        with self.assertRaises(MediaWikiServiceError):
+            mediawiki.get_pages_text(["Missing page"])
+        self.assertEqual(1 + mediawiki.maxlag_retries, mocked_sleep.call_count)
+
     @patch.dict(
         "server.services.wiki.mediawiki_service.current_app.config",
         {"WIKI_API_ENDPOINT": "https://your-wiki.org/api.php"},
@@ -0,0 +1,161 @@
+import copy
+import os
+import tempfile
+from unittest.mock import patch
+
+from server.tests.base_test_config import BaseTestCase
+from server.tests.helpers import utils
+from server.services.git.file_service import FileService
+from server.services.wiki.reconcile_service import WikiReconcileService
+
+OEG_PAGE = "Organised_Editing/Activities/Auto_report"
+
+
+@patch("server.services.wiki.reconcile_service.MediaWikiService")
+class TestWikiReconcileService(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.report_file_dir = tempfile.TemporaryDirectory()
+        self.app.config.update(
+            {
+                "REPORT_FILE_DIR": self.report_file_dir.name,
+                "REPORT_FILE_LAYOUT": "flat",
+                "WIKI_RECONCILE_BATCH_SIZE": 2,
+            }
+        )
+        for project_id, organisation_name, day in [
+            (1, "HOT", "01"),
+            (2, "HOT", "03"),
+            (3, "OSMF", "02"),
+        ]:
+            document = copy.deepcopy(utils.document_data)
+            document["project"]["projectId"] = project_id
+            document["project"]["name"] = f"Project {project_id}"
+            document["project"]["created"] = f"2020-01-{day}T00:00:00.000000Z"
+            document["organisation"]["name"] = organisation_name
+            self.write_project_file(organisation_name, project_id, document)
+
+    def tearDown(self):
+        self.report_file_dir.cleanup()
+
+    def write_project_file(self, organisation_name, project_id, document):
+        organisation_dir = (
+            f"{self.report_file_dir.name}/github_files/"
+            f"HOT_tasking_manager/{organisation_name}"
+        )
+        os.makedirs(organisation_dir, exist_ok=True)
+        with open(f"{organisation_dir}/project_{project_id}.yaml", "w") as f:
+            f.write(FileService.dict_to_yaml(document))
+
+    def mock_wiki(self, mocked_mediawiki, wiki_pages: dict):
+        mocked_mediawiki.return_value.get_pages_text.side_effect = lambda titles: {
+            title: wiki_pages.get(title) for title in titles
+        }
+
+    def test_pages_are_generated_from_documents(self, mocked_mediawiki):
+        reconcile = WikiReconcileService()
+        documents, skipped_files = reconcile.load_documents()
+
+        pages = reconcile.generate_pages(documents)
+
+        self.assertEqual({}, skipped_files)
+        self.assertEqual([1, 3, 2], [doc.project.project_id for doc in documents])
+        self.assertEqual(
+            [
+                OEG_PAGE,
+                f"{OEG_PAGE}/Hot",
+                f"{OEG_PAGE}/Osmf",
+                f"{OEG_PAGE}/Projects/Project 1",
+                f"{OEG_PAGE}/Projects/Project 3",
+                f"{OEG_PAGE}/Projects/Project 2",
+            ],
+            list(pages),
+        )
+        # Each report adds its rows at the top of the table
+        organisation_page = pages[f"{OEG_PAGE}/Hot"]
+        self.assertLess(
+            organisation_page.index("Project 2"), organisation_page.index("Project 1")
+        )
+
+    def test_only_changed_pages_are_written(self, mocked_mediawiki):
+        reconcile = WikiReconcileService()
+        pages = reconcile.generate_pages(reconcile.load_documents()[0])
+        wiki_pages = {
+            OEG_PAGE: pages[OEG_PAGE] + "\n\n",
+            f"{OEG_PAGE}/Hot": pages[f"{OEG_PAGE}/Hot"].replace("Project 1", "Old"),
+            f"{OEG_PAGE}/Osmf": pages[f"{OEG_PAGE}/Osmf"],
+            f"{OEG_PAGE}/Projects/Project 1": pages[f"{OEG_PAGE}/Projects/Project 1"],
+            f"{OEG_PAGE}/Projects/Project 3": pages[f"{OEG_PAGE}/Projects/Project 3"],
+        }
+        self.mock_wiki(mocked_mediawiki, wiki_pages)
+        mediawiki = mocked_mediawiki.return_value
+        mediawiki.get_token.return_value = "token"
+
+        result = reconcile.reconcile()
+
+        self.assertEqual(3, mediawiki.get_pages_text.call_count)
+        self.assertEqual(4, result["unchanged_pages"])
+        self.assertEqual([f"{OEG_PAGE}/Projects/Project 2"], result["created_pages"])
+        self.assertEqual([f"{OEG_PAGE}/Hot"], result["edited_pages"])
+        mediawiki.create_page.assert_called_once_with(
+            "token",
+            f"{OEG_PAGE}/Projects/Project 2",
+            pages[f"{OEG_PAGE}/Projects/Project 2"],
+        )
+        mediawiki.edit_page.assert_called_once_with(
+            "token", f"{OEG_PAGE}/Hot", pages[f"{OEG_PAGE}/Hot"]
+        )
+
+    def test_dry_run_doesnt_write_pages(self, mocked_mediawiki):
+        self.mock_wiki(mocked_mediawiki, {})
+
+        result = WikiReconcileService().reconcile(dry_run=True)
+
+        self.assertEqual(6, len(result["created_pages"]))
+        mocked_mediawiki.return_value.create_page.assert_not_called()
+        mocked_mediawiki.return_value.edit_page.assert_not_called()
+
+    def test_failed_page_doesnt_stop_reconcile(self, mocked_mediawiki):
+        self.mock_wiki(mocked_mediawiki, {})
+        mediawiki = mocked_mediawiki.return_value
+
+        def create_page(token, page_title, page_text):
+            if page_title == f"{OEG_PAGE}/Osmf":
+                raise ValueError("Page failed")
+            return {"edit": {"result": "Success"}}
+
+        mediawiki.create_page.side_effect = create_page
+
+        result = WikiReconcileService(workers=2).reconcile()
+
+        self.assertEqual(6, mediawiki.create_page.call_count)
+        self.assertEqual([f"{OEG_PAGE}/Osmf"], list(result["failed_pages"]))
+
+    def test_page_with_api_error_is_failed(self, mocked_mediawiki):
+        self.mock_wiki(mocked_mediawiki, {})
+        mediawiki = mocked_mediawiki.return_value
+
+        def create_page(token, page_title, page_text):
+            if page_title == f"{OEG_PAGE}/Hot":
+                return {"error": {"code": "protectedpage", "info": "Protected"}}
+            return {"edit": {"result": "Success"}}
+
+        mediawiki.create_page.side_effect = create_page
+
+        result = WikiReconcileService(workers=2).reconcile()
+
+        self.assertEqual(
+            {f"{OEG_PAGE}/Hot": "protectedpage: Protected"}, result["failed_pages"]
+        )
+
+    def test_invalid_project_files_are_skipped(self, mocked_mediawiki):
+        document = copy.deepcopy(utils.document_data)
+        document["project"]["projectId"] = 4
+        del document["project"]["name"]
+        self.write_project_file("HOT", 4, document)
+
+        documents, skipped_files = WikiReconcileService().load_documents()
+
+        self.assertEqual(3, len(documents))
+        self.assertEqual(1, len(skipped_files))
+        self.assertTrue(list(skipped_files)[0].endswith("project_4.yaml"))
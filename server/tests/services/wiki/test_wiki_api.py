@@ -4,7 +4,9 @@ from flask import url_for
 
 from server.tests.base_test_config import BaseTestCase
 from server.tests.helpers import utils
+from server.services.wiki.document_cache import wiki_document_cache
 from server.services.wiki.mediawiki_service import MediaWikiServiceError
+from server.models.serializers.document import DocumentSchema
 
 
 class TestWikiDocumentApi(BaseTestCase):
@@ -37,15 +39,10 @@ class TestWikiDocumentApi(BaseTestCase):
         expected = {"detail": self.success_post_message}
         self.assertEqual(expected, response.json)
 
-        mocked_overview_page.return_value.create_page.assert_called_with(
-            self.document_data
-        )
-        mocked_organisation_page.return_value.create_page.assert_called_with(
-            self.document_data
-        )
-        mocked_project_page.return_value.create_page.assert_called_with(
-            self.document_data
-        )
+        document = DocumentSchema().load(self.document_data)
+        mocked_overview_page.return_value.create_page.assert_called_with(document)
+        mocked_organisation_page.return_value.create_page.assert_called_with(document)
+        mocked_project_page.return_value.create_page.assert_called_with(document)
 
     @patch("server.api.wiki.resources.ProjectPageService")
     @patch("server.api.wiki.resources.OrganisationPageService")
@@ -130,6 +127,7 @@ class TestWikiDocumentApi(BaseTestCase):
             mocked_generate_document_data.return_value = (
                 {"project": {"name": "updated project name"}},
                 {"project": {"name": "project name"}},
+                ["project.name"],
             )
             self.client.patch(
                 url_for(
@@ -140,28 +138,34 @@ class TestWikiDocumentApi(BaseTestCase):
                 json=self.document_data,
                 headers={"Authorization": "Token secrettokenexample"},
             )
-            mocked_overview_page.assert_called_with(
-                updated_document, self.document_data, current_document
-            )
+            update_fields = DocumentSchema(partial=True).load(self.document_data)
+            # The overview page doesn't show the project name
+            mocked_overview_page.assert_not_called()
             mocked_organisation_page.assert_called_with(
-                updated_document, self.document_data, current_document
+                updated_document, update_fields, current_document
             )
             mocked_project_page.assert_called_with(
-                updated_document, self.document_data, current_document
+                updated_document, update_fields, current_document
             )
 
     @patch("server.services.wiki.pages.overview_service.MediaWikiService")
+    @patch(
+        "server.services.wiki.pages.overview_service.OverviewPageService."
+        "edit_page_text",
+        return_value="Updated text",
+    )
     @patch("server.api.wiki.resources.generate_document_data_from_wiki_pages")
     @patch.dict(
         "server.services.utils.current_app.config",
         {"AUTHORIZATION_TOKEN": "secrettokenexample"},
     )
     def test_wiki_document_patch_fails_with_invalid_mediawiki_token(
-        self, mocked_generate_document_data, mocked_mediawiki
+        self, mocked_generate_document_data, mocked_edit_page_text, mocked_mediawiki
     ):
         mocked_generate_document_data.return_value = (
-            {"project": {"name": "updated project name"}},
-            {"project": {"name": "project name"}},
+            {"organisation": {"name": "updated organisation name"}},
+            {"organisation": {"name": "organisation name"}},
+            ["organisation.name"],
         )
         mocked_mediawiki.return_value.get_token.side_effect = MediaWikiServiceError(
             "Invalid token"
@@ -177,3 +181,95 @@ class TestWikiDocumentApi(BaseTestCase):
         )
         expected_response = {"detail": "Invalid token"}
         self.assertEqual(expected_response, response.json)
+
+    @patch("server.api.wiki.resources.WikiBulkService")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_wiki_bulk_document_post(self, mocked_bulk_service):
+        mocked_bulk_service.return_value.create_documents.return_value = [
+            {"status": 201, "detail": self.success_post_message}
+        ]
+
+        response = self.client.post(
+            url_for("create_wiki_documents"),
+            json=[self.document_data, {"project": {"name": "project name"}}],
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+
+        self.assertEqual(200, response.status_code)
+        results = response.json["results"]
+        self.assertEqual(
+            {"index": 0, "status": 201, "detail": self.success_post_message},
+            results[0],
+        )
+        self.assertEqual(1, results[1]["index"])
+        self.assertEqual(400, results[1]["status"])
+        documents = mocked_bulk_service.return_value.create_documents.call_args[0][0]
+        self.assertEqual(1, len(documents))
+
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_wiki_bulk_document_post_fails_without_list(self):
+        response = self.client.post(
+            url_for("create_wiki_documents"),
+            json=self.document_data,
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+
+        self.assertEqual(400, response.status_code)
+
+    @patch("server.api.wiki.resources.get_document_from_wiki_pages")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_wiki_document_get(self, mocked_get_document):
+        wiki_document_cache.clear()
+        mocked_get_document.return_value = DocumentSchema().load(self.document_data)
+        url = url_for(
+            "get_wiki_document",
+            organisation_name=self.document_data["organisation"]["name"],
+            project_name=self.document_data["project"]["name"],
+        )
+        headers = {"Authorization": "Token secrettokenexample"}
+
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.document_data, response.json)
+
+        cached_response = self.client.get(
+            url, headers={**headers, "If-None-Match": response.headers["ETag"]}
+        )
+        self.assertEqual(304, cached_response.status_code)
+        mocked_get_document.assert_called_once()
+
+        wiki_document_cache.invalidate_organisation(
+            self.document_data["organisation"]["name"]
+        )
+        self.client.get(url, headers=headers)
+        self.assertEqual(2, mocked_get_document.call_count)
+
+    @patch("server.api.wiki.resources.get_document_from_wiki_pages")
+    @patch.dict(
+        "server.services.utils.current_app.config",
+        {"AUTHORIZATION_TOKEN": "secrettokenexample"},
+    )
+    def test_wiki_document_get_fails_with_unknown_project(self, mocked_get_document):
+        wiki_document_cache.clear()
+        mocked_get_document.side_effect = MediaWikiServiceError(
+            "Error getting text from the page. Page does not exist."
+        )
+
+        response = self.client.get(
+            url_for(
+                "get_wiki_document",
+                organisation_name="organisation",
+                project_name="unknown project",
+            ),
+            headers={"Authorization": "Token secrettokenexample"},
+        )
+        self.assertEqual(404, response.status_code)
@@ -47,3 +47,24 @@ class TestWikiTextService(BaseTestCase):
             wiki_hyperlink
         )
         self.assertTupleEqual(expected_data, hyperlink_data)
+
+    def test_get_page_text_hash_ignores_trailing_whitespace(self):
+        wikitext = WikiTextService()
+        page_text = "==Section==\nText\n"
+
+        self.assertEqual(
+            wikitext.get_page_text_hash(page_text),
+            wikitext.get_page_text_hash("==Section==\r\nText \n\n"),
+        )
+        self.assertNotEqual(
+            wikitext.get_page_text_hash(page_text),
+            wikitext.get_page_text_hash("==Section==  \nText\n"),
+        )
+        self.assertNotEqual(
+            wikitext.get_page_text_hash(page_text),
+            wikitext.get_page_text_hash("\n==Section==\nText\n"),
+        )
+        self.assertNotEqual(
+            wikitext.get_page_text_hash(page_text),
+            wikitext.get_page_text_hash("==Section==\nOther text\n"),
+        )
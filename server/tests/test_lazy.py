@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from server.tests.base_test_config import BaseTestCase
+
+
+class TestLazyLoading(BaseTestCase):
+    def test_startup_doesnt_import_heavy_dependencies(self):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from server import create_app; create_app();"
+                " print(sorted(module for module in ['flasgger', 'git',"
+                " 'wikitextparser', 'server.api.wiki.resources']"
+                " if module in sys.modules))",
+            ],
+            cwd=os.path.join(os.path.dirname(__file__), "..", ".."),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual("[]", output.strip().splitlines()[-1])
+
+    def test_swagger_docs_are_served(self):
+        self.assertEqual(200, self.client.get("/apidocs/").status_code)
+        response = self.client.get("/apispec_1.json")
+        self.assertEqual(200, response.status_code)
+        self.assertIn("paths", response.json)
+
+    def test_lazy_view_is_routed(self):
+        response = self.client.get("/jobs/job/")
+        self.assertEqual(401, response.status_code)